@@ -0,0 +1,59 @@
+import io
+import sys
+import time
+from pathlib import Path
+from web3 import Web3
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_compiled_abi import ROUTER_ABI, TOKEN_A, TOKEN_B  # noqa: E402
+from src.utils.calldata_encoder import CalldataEncoder, encode_rows, read_rows  # noqa: E402
+
+
+ROWS = 100_000
+
+
+def build_rows():
+    recipients = [Web3.to_checksum_address(f"0x{i:040x}") for i in range(1, ROWS + 1)]
+    return {
+        "transfer": [[recipient, str(10**18 + i)] for i, recipient in enumerate(recipients)],
+        "swapExactTokensForTokens": [
+            [str(10**18 + i), "1", f'["{TOKEN_A}","{TOKEN_B}"]', recipient, str(2**32)]
+            for i, recipient in enumerate(recipients[:ROWS // 10])],
+    }
+
+
+def contract_path(function: str, rows: list):
+    # The ad-hoc script approach: typed values through a contract per row.
+    encoder = CalldataEncoder.from_abi(ROUTER_ABI, function)
+    return [
+        Web3().eth.contract(abi=ROUTER_ABI).encode_abi(function, [
+            parse(value) if type_str != "address" else value
+            for parse, value, type_str in zip(encoder.parsers, row, encoder.input_types)])
+        for row in rows]
+
+
+def compiled_path(function: str, rows: list):
+    encoder = CalldataEncoder.from_abi(ROUTER_ABI, function)
+    csv_text = "\n".join(",".join('"' + v.replace('"', '""') + '"' for v in row) for row in rows)
+    return list(encode_rows(encoder, read_rows(io.StringIO(csv_text), "csv")))
+
+
+def rows_per_second(func, function: str, rows: list) -> float:
+    start = time.perf_counter()
+    func(function, rows)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    for function, rows in build_rows().items():
+        sample = rows[:200]
+        assert contract_path(function, sample) == compiled_path(function, sample), function
+        contract_rate = rows_per_second(contract_path, function, sample * 5)
+        compiled_rate = rows_per_second(compiled_path, function, rows)
+        print(f"{function:<26} contract: {contract_rate:>10,.0f} rows/s  compiled: {compiled_rate:>10,.0f} rows/s  "
+              f"speedup: {compiled_rate / contract_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import sys
+import time
+from pathlib import Path
+from web3 import Web3
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.compiled_abi import get_compiled_abi  # noqa: E402
+
+
+ROUTER_ABI = [
+    {"type": "function", "name": "swapExactTokensForTokens", "stateMutability": "nonpayable",
+     "inputs": [{"name": "amountIn", "type": "uint256"}, {"name": "amountOutMin", "type": "uint256"},
+                {"name": "path", "type": "address[]"}, {"name": "to", "type": "address"},
+                {"name": "deadline", "type": "uint256"}],
+     "outputs": [{"name": "amounts", "type": "uint256[]"}]},
+    {"type": "function", "name": "aggregate3", "stateMutability": "payable",
+     "inputs": [{"name": "calls", "type": "tuple[]", "components": [
+         {"name": "target", "type": "address"}, {"name": "allowFailure", "type": "bool"},
+         {"name": "callData", "type": "bytes"}]}],
+     "outputs": []},
+    {"type": "function", "name": "transfer", "stateMutability": "nonpayable",
+     "inputs": [{"name": "to", "type": "address"}, {"name": "amount", "type": "uint256"}],
+     "outputs": [{"name": "", "type": "bool"}]},
+]
+
+TOKEN_A = Web3.to_checksum_address("0x" + "aa" * 20)
+TOKEN_B = Web3.to_checksum_address("0x" + "bb" * 20)
+RECIPIENT = Web3.to_checksum_address("0x" + "cc" * 20)
+
+
+def build_calldata():
+    contract = Web3().eth.contract(abi=ROUTER_ABI)
+    return {
+        "transfer": contract.encode_abi("transfer", [RECIPIENT, 10**18]),
+        "swapExactTokensForTokens": contract.encode_abi(
+            "swapExactTokensForTokens", [10**18, 1, [TOKEN_A, TOKEN_B], RECIPIENT, 2**32]),
+        "aggregate3": contract.encode_abi(
+            "aggregate3", [[(TOKEN_A, False, b"\x12" * 68), (TOKEN_B, True, b"\x34" * 100)]]),
+    }
+
+
+def contract_path(calldata: str):
+    contract = Web3().eth.contract(abi=ROUTER_ABI)
+    return contract.decode_function_input(calldata)
+
+
+def compiled_path(calldata: str):
+    return get_compiled_abi(ROUTER_ABI).decode(calldata)
+
+
+def calls_per_second(func, calldata: str, seconds: float = 1.0) -> float:
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(50):
+            func(calldata)
+        calls += 50
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    for name, calldata in build_calldata().items():
+        assert contract_path(calldata)[1] == compiled_path(calldata)[1], name
+        contract_rate = calls_per_second(contract_path, calldata)
+        compiled_rate = calls_per_second(compiled_path, calldata)
+        print(f"{name:<26} contract: {contract_rate:>10,.0f}/s  compiled: {compiled_rate:>10,.0f}/s  "
+              f"speedup: {compiled_rate / contract_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
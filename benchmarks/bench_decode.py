@@ -0,0 +1,173 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_node import FakeNode, load_fixtures, tx_hash  # noqa: E402
+
+
+CHAIN = "ethereum"
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def reset_caches():
+    # Everything a decode can reuse across runs, so every cold scenario
+    # starts from the same state: ABIs, proxy mappings (and the shared head
+    # block), and the selector index built from fetched ABIs.
+    from src.utils import proxy_resolver
+    from src.utils.abi_cache import abi_cache
+    from src.utils.selector_index import selector_index
+    abi_cache.clear()
+    proxy_resolver.proxy_cache.clear()
+    proxy_resolver._head_blocks.clear()
+    selector_index.clear()
+
+
+def run_single(hashes: list) -> dict:
+    from src.utils.calldata_decoder import decode_using_transaction_hash
+
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for tx in hashes:
+        t0 = time.perf_counter()
+        try:
+            decode_using_transaction_hash(tx, CHAIN)
+        except RuntimeError:
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+    return {"elapsed": time.perf_counter() - start, "latencies": latencies, "errors": errors}
+
+
+def run_batch(hashes: list, workers: int) -> dict:
+    from src.utils.batch_decoder import decode_batch
+
+    # decode_batch yields in input order, so a row's latency is the time from
+    # the start of the run until it is handed back to the caller.
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for result in decode_batch(iter(hashes), CHAIN, workers=workers):
+        latencies.append(time.perf_counter() - start)
+        errors += "error" in result
+    return {"elapsed": time.perf_counter() - start, "latencies": latencies, "errors": errors}
+
+
+def scenario(node: FakeNode, name: str, run, hashes: list, cold: bool, memory: bool) -> dict:
+    if cold:
+        reset_caches()
+    node.reset_counters()
+    result = run(hashes)
+    counters = dict(node.counters)
+
+    latencies_ms = [latency * 1000 for latency in result["latencies"]]
+    report = {
+        "scenario": name,
+        "decodes": len(hashes),
+        "errors": result["errors"],
+        "decodes_per_second": round(len(hashes) / result["elapsed"], 1),
+        "p50_ms": round(statistics.median(latencies_ms), 3),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 3),
+        **counters,
+    }
+
+    if memory:
+        # Measured in a second pass: tracemalloc slows allocation-heavy code
+        # down enough to distort the timings above.
+        if cold:
+            reset_caches()
+        tracemalloc.start()
+        run(hashes)
+        report["peak_memory_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode throughput and latency against a local RPC/Etherscan stand-in")
+    parser.add_argument("--transactions", type=int, default=500, help="Number of transaction hashes decoded per scenario")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial latency added to every fake endpoint response")
+    parser.add_argument("--workers", type=int, default=8, help="Worker threads for the batch scenarios")
+    parser.add_argument("--abi-rate-limit", type=int, default=0, help="getabi calls per second per key the fake Etherscan allows, and the client is sized to (0: unlimited)")
+    parser.add_argument("--api-keys", type=int, default=1, help="Number of Etherscan API keys the client rotates through")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    node = FakeNode(fixtures, latency=args.latency_ms / 1000, abi_rate_limit=args.abi_rate_limit).start()
+
+    # src.utils.config reads the environment at import time, so the endpoints
+    # and a throwaway cache directory must be set before anything from src is
+    # imported.
+    cache_dir = tempfile.TemporaryDirectory(prefix="axe-bench-")
+    os.environ["ETHEREUM_RPC_URL"] = node.url
+    os.environ["ETHERSCAN_API_URL"] = f"{node.url}/api"
+    os.environ["ETHERSCAN_API_KEYS"] = ",".join(f"bench-{i}" for i in range(args.api_keys))
+    os.environ["AXE_ETHERSCAN_RATE_LIMIT"] = str(args.abi_rate_limit)
+    os.environ["AXE_CACHE_DIR"] = cache_dir.name
+
+    hashes = [tx_hash(i) for i in range(args.transactions)]
+    memory = not args.no_memory
+    try:
+        scenarios = [
+            scenario(node, "single_cold", run_single, hashes, cold=True, memory=memory),
+            scenario(node, "single_cached", run_single, hashes, cold=False, memory=memory),
+            scenario(node, "batch_cold", lambda h: run_batch(h, args.workers), hashes, cold=True, memory=memory),
+            scenario(node, "batch_cached", lambda h: run_batch(h, args.workers), hashes, cold=False, memory=memory),
+        ]
+    finally:
+        node.stop()
+        cache_dir.cleanup()
+
+    report = {
+        "benchmark": "decode",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "transactions": args.transactions,
+            "fixture_calls": len(fixtures["transactions"]),
+            "fixture_contracts": len(fixtures["abis"]),
+            "latency_ms": args.latency_ms,
+            "workers": args.workers,
+            "abi_rate_limit": args.abi_rate_limit,
+            "api_keys": args.api_keys,
+        },
+        "scenarios": scenarios,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
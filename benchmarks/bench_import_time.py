@@ -0,0 +1,81 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Commands that must start without touching the network stack.
+COMMANDS = [
+    ["--help"],
+    ["constants", "uint"],
+    ["constants", "--help"],
+    ["calldata", "--help"],
+    ["serve", "--help"],
+]
+
+HEAVY_MODULES = ("web3", "eth_abi", "requests", "aiohttp", "dotenv")
+
+
+def parse_importtime(stderr: str):
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two spaces per level.
+        modules[name[1:].rstrip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(command: list, runs: int):
+    wall = []
+    stderr = ""
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(ROOT / "main.py"), *command],
+            cwd=ROOT, capture_output=True, text=True)
+        wall.append((time.perf_counter() - start) * 1000)
+        stderr = result.stderr
+
+    modules = parse_importtime(stderr)
+    top_level = {name: cumulative for name, (_, cumulative) in modules.items() if not name.startswith(" ")}
+    heavy = sorted({name.split(".")[0] for name in modules if name.split(".")[0] in HEAVY_MODULES})
+    return {
+        "command": " ".join(command),
+        "wall_ms": round(min(wall), 1),
+        "import_ms": round(sum(top_level.values()) / 1000, 1),
+        "heavy_modules": heavy,
+        "slowest_imports": [
+            {"module": name, "cumulative_ms": round(cumulative / 1000, 1)}
+            for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:5]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track CLI import time with python -X importtime")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per command; the fastest wall time is reported")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if any command's import time exceeds this")
+    args = parser.parse_args()
+
+    results = [measure(command, args.runs) for command in COMMANDS]
+    print(json.dumps(results, indent=2))
+
+    failed = False
+    for result in results:
+        if result["heavy_modules"]:
+            print(f"{result['command']}: imports {', '.join(result['heavy_modules'])}", file=sys.stderr)
+            failed = True
+        if args.budget_ms is not None and result["import_ms"] > args.budget_ms:
+            print(f"{result['command']}: {result['import_ms']} ms of imports exceeds {args.budget_ms} ms", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "mainnet_calls.json"
+
+
+def load_fixtures(path: Path = FIXTURES) -> dict:
+    with path.open("r") as f:
+        return json.load(f)
+
+
+def tx_hash(index: int) -> str:
+    return f"0x{index + 1:064x}"
+
+
+class FakeNode:
+    # A local stand-in for a JSON-RPC node and Etherscan's getabi endpoint,
+    # serving recorded fixtures. Transaction i is fixture i modulo the number
+    # of recorded calls, so any number of distinct hashes can be decoded.
+    def __init__(self, fixtures: dict = None, latency: float = 0.0, abi_rate_limit: int = 0, max_logs: int = 10_000,
+                 trace_depth: int = 2, trace_width: int = 2):
+        self.fixtures = fixtures or load_fixtures()
+        self.transactions = self.fixtures["transactions"]
+        self.abis = self.fixtures["abis"]
+        self.storage = {address: {int(slot, 16): word for slot, word in slots.items()}
+                        for address, slots in self.fixtures.get("storage", {}).items()}
+        self.code = {address.lower(): code for address, code in self.fixtures.get("code", {}).items()}
+        # address -> (block, {slot: word}): the slots held those words before
+        # `block`, e.g. a proxy's implementation before an upgrade.
+        self.storage_history = {}
+        # Like a pruned node: state reads at blocks before this one fail.
+        self.archive_from = None
+        self.latency = latency
+        self.max_logs = max_logs
+        # Traced transactions call trace_width other fixture calls (plus the
+        # ecrecover precompile) per level, trace_depth levels deep.
+        self.trace_depth = trace_depth
+        self.trace_width = trace_width
+        # Like Etherscan: at most abi_rate_limit getabi calls per key within
+        # any one-second window (0 disables the limit).
+        self.abi_rate_limit = abi_rate_limit
+        self.abi_calls = {}
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.reset_counters()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        # Clients that cancel a request (e.g. a multi-chain lookup that was
+        # already answered elsewhere) hang up mid-response; that is expected.
+        self.server.handle_error = lambda request, client_address: None
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counters(self):
+        with self.lock:
+            self.counters = {"rpc_requests": 0, "rpc_calls": 0, "abi_fetches": 0, "abi_rate_limited": 0}
+
+    def count(self, name: str, n: int = 1):
+        with self.lock:
+            self.counters[name] += n
+
+    def transaction(self, tx: str):
+        index = int(tx, 16) - 1
+        if index < 0:
+            return None
+        recorded = self.transactions[index % len(self.transactions)]
+        return {
+            "hash": tx, "blockHash": "0x" + "00" * 32, "blockNumber": hex(20_000_000 + index // 100),
+            "transactionIndex": hex(index % 100), "type": "0x2", "chainId": hex(self.fixtures["chain_id"]),
+            "nonce": hex(index), "gas": "0x30d40", "gasPrice": "0x3b9aca00", "maxFeePerGas": "0x3b9aca00",
+            "maxPriorityFeePerGas": "0x1", "v": "0x0", "r": "0x1", "s": "0x1", "accessList": [],
+            **recorded,
+        }
+
+    def block(self, number: str, full_transactions: bool):
+        # Block 20_000_000 + k holds transactions 100k to 100k + 99; earlier
+        # blocks are empty.
+        first = (int(number, 16) - 20_000_000) * 100
+        hashes = [tx_hash(index) for index in range(first, first + 100)] if first >= 0 else []
+        return {"number": number, "hash": "0x" + "00" * 32,
+                "transactions": [self.transaction(tx) for tx in hashes] if full_transactions else hashes}
+
+    def logs(self, index: int, tx: str = None) -> list:
+        recorded = self.transactions[index % len(self.transactions)]
+        tx = tx or tx_hash(index)
+        return [
+            {"address": log["address"], "topics": log["topics"], "data": log["data"],
+             "blockNumber": hex(20_000_000 + index // 100), "transactionHash": tx,
+             "transactionIndex": hex(index % 100), "blockHash": "0x" + "00" * 32,
+             "logIndex": hex(n), "removed": False}
+            for n, log in enumerate(recorded.get("logs", []))
+        ]
+
+    def receipt(self, tx: str):
+        transaction = self.transaction(tx)
+        if transaction is None:
+            return None
+        index = int(tx, 16) - 1
+        return {
+            "transactionHash": tx, "blockNumber": transaction["blockNumber"], "blockHash": transaction["blockHash"],
+            "transactionIndex": transaction["transactionIndex"], "from": transaction["from"], "to": transaction["to"],
+            "status": "0x1", "gasUsed": "0xc350", "cumulativeGasUsed": "0xc350", "effectiveGasPrice": "0x3b9aca00",
+            "contractAddress": None, "type": "0x2", "logsBloom": "0x" + "00" * 256, "logs": self.logs(index, tx),
+        }
+
+    def call_frame(self, index: int, sender: str, depth: int) -> dict:
+        recorded = self.transactions[index % len(self.transactions)]
+        frame = {"from": sender, "gas": hex(1_000_000 >> depth), "gasUsed": hex(50_000 >> depth),
+                 "to": recorded["to"], "input": recorded["input"]}
+        if depth < self.trace_depth:
+            frame["calls"] = [self.call_frame(index + n + 1, recorded["to"], depth + 1) for n in range(self.trace_width)]
+            frame["calls"].append({"from": recorded["to"], "gas": "0xbb8", "gasUsed": "0xbb8",
+                                   "to": "0x0000000000000000000000000000000000000001",
+                                   "input": "0x" + "00" * 128, "output": "0x" + "00" * 32, "type": "STATICCALL"})
+        # Geth writes value and type after the nested calls.
+        frame["value"] = recorded.get("value", "0x0")
+        frame["type"] = "CALL"
+        return frame
+
+    def call_trace(self, tx: str):
+        transaction = self.transaction(tx)
+        if transaction is None:
+            return None
+        return self.call_frame(int(tx, 16) - 1, transaction["from"], 0)
+
+    def parity_trace(self, tx: str):
+        root = self.call_trace(tx)
+        if root is None:
+            return None
+        traces = []
+
+        def flatten(frame, address):
+            calls = frame.get("calls", [])
+            traces.append({
+                "action": {"callType": frame["type"].lower(), "from": frame["from"], "to": frame["to"],
+                           "gas": frame["gas"], "input": frame["input"], "value": frame.get("value", "0x0")},
+                "result": {"gasUsed": frame["gasUsed"], "output": frame.get("output", "0x")},
+                "subtraces": len(calls), "traceAddress": address, "transactionHash": tx, "type": "call",
+            })
+            for n, call in enumerate(calls):
+                flatten(call, address + [n])
+
+        flatten(root, [])
+        return traces
+
+    def get_logs(self, log_filter: dict):
+        # Every fake block holds 100 transactions; like most providers, ranges
+        # with too many results are refused.
+        first = int(log_filter["fromBlock"], 16) - 20_000_000
+        last = int(log_filter["toBlock"], 16) - 20_000_000
+        address = log_filter.get("address")
+        topic0s = (log_filter.get("topics") or [None])[0]
+        if isinstance(topic0s, str):
+            topic0s = [topic0s]
+        logs = []
+        for index in range(max(first, 0) * 100, (last + 1) * 100):
+            for log in self.logs(index):
+                if address and log["address"].lower() != address.lower():
+                    continue
+                if topic0s and log["topics"][0] not in topic0s:
+                    continue
+                logs.append(log)
+                if len(logs) > self.max_logs:
+                    return None
+        return logs
+
+    def storage_at(self, address: str, slot: int, block: str):
+        upgraded_at, before = self.storage_history.get(address, (None, {}))
+        if upgraded_at is not None and block.startswith("0x") and int(block, 16) < upgraded_at and slot in before:
+            return before[slot]
+        return self.storage.get(address, {}).get(slot, "0x" + "00" * 32)
+
+    def rpc(self, request: dict) -> dict:
+        method, params = request.get("method"), request.get("params", [])
+        if method == "eth_getTransactionByHash":
+            result = self.transaction(params[0])
+        elif method == "eth_chainId":
+            result = hex(self.fixtures["chain_id"])
+        elif method == "eth_blockNumber":
+            result = hex(20_000_000)
+        elif method == "eth_getBlockByNumber":
+            result = self.block(params[0], params[1])
+        elif method == "eth_getTransactionReceipt":
+            result = self.receipt(params[0])
+        elif method == "eth_getLogs":
+            result = self.get_logs(params[0])
+            if result is None:
+                return {"jsonrpc": "2.0", "id": request.get("id"),
+                        "error": {"code": -32005, "message": f"query returned more than {self.max_logs} results"}}
+        elif method == "eth_getStorageAt":
+            block = params[2] if len(params) > 2 else "latest"
+            if block.startswith("0x") and self.archive_from is not None and int(block, 16) < self.archive_from:
+                return {"jsonrpc": "2.0", "id": request.get("id"),
+                        "error": {"code": -32000, "message": f"missing trie node {block} (path )"}}
+            result = self.storage_at(params[0].lower(), int(params[1], 16), block)
+        elif method == "debug_traceTransaction":
+            result = self.call_trace(params[0])
+        elif method == "trace_transaction":
+            result = self.parity_trace(params[0])
+        elif method == "eth_getCode":
+            result = self.code.get(params[0].lower(), "0x")
+        elif method == "eth_call":
+            result = "0x"
+        else:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": f"Method {method} not supported"}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    def rate_limited(self, key: str) -> bool:
+        if not self.abi_rate_limit:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            calls = [t for t in self.abi_calls.get(key, []) if now - t < 1.0]
+            limited = len(calls) >= self.abi_rate_limit
+            if not limited:
+                calls.append(now)
+            self.abi_calls[key] = calls
+            return limited
+
+    def getabi(self, address: str, key: str) -> dict:
+        if self.rate_limited(key):
+            self.count("abi_rate_limited")
+            return {"status": "0", "message": "NOTOK",
+                    "result": f"Max calls per sec rate limit reached ({self.abi_rate_limit}/sec)"}
+        self.count("abi_fetches")
+        abi = self.abis.get(address.lower())
+        if abi is None:
+            return {"status": "0", "message": "NOTOK", "result": "Contract source code not verified"}
+        return {"status": "1", "message": "OK", "result": json.dumps(abi)}
+
+    def _handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.count("rpc_requests")
+                node.count("rpc_calls", len(body) if isinstance(body, list) else 1)
+                if node.latency:
+                    time.sleep(node.latency)
+                self._send([node.rpc(request) for request in body] if isinstance(body, list) else node.rpc(body))
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                if node.latency:
+                    time.sleep(node.latency)
+                self._send(node.getabi(query.get("address", [""])[0], query.get("apikey", [""])[0]))
+
+        return Handler
@@ -1,9 +1,44 @@
 import typer
+from src.commands.bytecode.bytecode_command import bytecode_app
 from src.commands.calldata.calldata_command import calldata_app
 from src.commands.constants.constants_command import constants_app
+from src.commands.gas.gas_command import gas_app
+from src.commands.logs.logs_command import logs_app
+from src.commands.serve.serve_command import serve_app
+from src.commands.trace.trace_command import trace_app
+from src.utils import output, profiling
 
 app = typer.Typer(
     help="Axe is a python based EVM CLI Tool for working with blockchain")
 
+
+@app.callback()
+def main(
+        ctx: typer.Context,
+        output_format: str = typer.Option(
+            None, "--output-format", "-O",
+            help="Machine-readable output for every command: json, jsonl or msgpack. Given before the command "
+                 "(axe -O json calldata decode ...); a command's own --format is a different option"),
+        profile: bool = typer.Option(False, "--profile", help="Print a per-stage timing and HTTP breakdown to stderr"),
+        profile_export: str = typer.Option(None, "--profile-export", help="Also write the recorded spans to this file (implies --profile)"),
+        profile_format: str = typer.Option("json", "--profile-format", help="Span export format: json or otlp (OpenTelemetry OTLP/JSON)")):
+    if output_format is not None:
+        try:
+            output.set_format(output_format)
+        except ValueError as e:
+            raise typer.BadParameter(str(e))
+
+    if profile or profile_export:
+        if profile_format not in profiling.EXPORT_FORMATS:
+            raise typer.BadParameter(f"Unsupported profile format: {profile_format} (expected one of {', '.join(profiling.EXPORT_FORMATS)})")
+        profiling.enable()
+        ctx.call_on_close(lambda: profiling.report(profile_export, profile_format))
+
+
+app.add_typer(bytecode_app, name="bytecode")
 app.add_typer(calldata_app, name="calldata")
 app.add_typer(constants_app, name="constants")
+app.add_typer(gas_app, name="gas")
+app.add_typer(logs_app, name="logs")
+app.add_typer(serve_app, name="serve")
+app.add_typer(trace_app, name="trace")
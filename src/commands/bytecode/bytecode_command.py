@@ -0,0 +1,120 @@
+import typer
+import json
+import sys
+from pathlib import Path
+from src.utils.output import emit, emit_rows, structured
+
+bytecode_app = typer.Typer(help="Disassemble contract bytecode and recover dispatcher selectors")
+
+
+def load_code(address, code, code_file, chain, offline) -> bytes:
+    if sum(bool(source) for source in (address, code, code_file)) != 1:
+        typer.echo("Please provide exactly one of --address, --code or --code-file", err=True)
+        raise typer.Exit(code=1)
+    if address and not chain:
+        raise typer.BadParameter("--chain is required when using --address")
+
+    try:
+        if address:
+            from src.utils.bytecode import fetch_code
+            return fetch_code(address, chain, offline)
+        if code_file:
+            if code_file == "-":
+                code = sys.stdin.read()
+            else:
+                code = Path(code_file).expanduser().resolve().read_text()
+        code = code.strip()
+        return bytes.fromhex(code[2:] if code.startswith("0x") else code)
+    except (OSError, ValueError, RuntimeError) as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+
+
+@bytecode_app.command("disassemble", help="Disassemble bytecode in the format gas estimate --disassembly reads")
+def disassemble(
+        address: str = typer.Option(None, "--address", help="Contract whose deployed code is disassembled"),
+        code: str = typer.Option(None, "--code", help="Raw bytecode (hex)"),
+        code_file: str = typer.Option(None, "--code-file", help="File with hex bytecode ('-' for stdin)"),
+        chain: str = typer.Option(None, "--chain", help="Chain name (with --address)"),
+        offline: bool = typer.Option(False, "--offline", help="Only use cached code, never query the node")):
+    import src.utils.bytecode as bytecode
+
+    data = load_code(address, code, code_file, chain, offline)
+    end = len(data) - bytecode.metadata_length(data)
+
+    if structured():
+        emit_rows({
+            "pc": pc,
+            "op": bytecode.MNEMONICS[op],
+            "push": None if immediate is None else "0x" + immediate.hex(),
+        } for pc, op, immediate in bytecode.disassemble(data, end))
+        return
+
+    write = sys.stdout.write
+    chunk = []
+    for line in bytecode.format_instructions(data, end):
+        chunk.append(line)
+        if len(chunk) >= 4096:
+            write("\n".join(chunk) + "\n")
+            chunk.clear()
+    if end < len(data):
+        chunk.append(f"# metadata ({len(data) - end} bytes): 0x{data[end:].hex()}")
+    if chunk:
+        write("\n".join(chunk) + "\n")
+    sys.stdout.flush()
+
+
+@bytecode_app.command("selectors", help="Recover function selectors and a partial ABI from contract dispatchers")
+def selectors(
+        address: list[str] = typer.Option(None, "--address", help="Contract to analyze (repeatable)"),
+        input_file: str = typer.Option(None, "--input", help="File with one address per line ('-' for stdin)"),
+        code: str = typer.Option(None, "--code", help="Raw bytecode (hex)"),
+        chain: str = typer.Option(None, "--chain", help="Chain name (with --address/--input)"),
+        abi_only: bool = typer.Option(False, "--abi", help="Print the recovered ABI of a single contract, usable with calldata decode --abi"),
+        offline: bool = typer.Option(False, "--offline", help="Only use cached code, never query the node")):
+    import src.utils.bytecode as bytecode
+    from src.utils.selector_index import selector_index
+
+    if sum(bool(source) for source in (address, input_file, code)) != 1:
+        typer.echo("Please provide exactly one of --address, --input or --code", err=True)
+        raise typer.Exit(code=1)
+    if not code and not chain:
+        raise typer.BadParameter("--chain is required when using --address or --input")
+
+    lines = None
+    if code:
+        rows = iter([bytecode.analyze(None, load_code(None, code, None, None, offline), selector_index)])
+    else:
+        addresses = address
+        if input_file:
+            try:
+                lines = sys.stdin if input_file == "-" else Path(input_file).expanduser().resolve().open("r")
+            except OSError as e:
+                typer.echo(e, err=True)
+                raise typer.Exit(code=1)
+            addresses = (line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#"))
+        rows = (bytecode.analyze(contract, data, selector_index)
+                for contract, data in bytecode.fetch_codes(addresses, chain, offline))
+
+    try:
+        if abi_only:
+            results = list(rows)
+            if len(results) != 1:
+                raise typer.BadParameter("--abi needs exactly one contract")
+            abi = results[0]["abi"]
+            if structured():
+                emit(abi)
+            else:
+                typer.echo(json.dumps(abi, indent=2))
+        elif structured():
+            emit_rows(rows)
+        else:
+            for row in rows:
+                sys.stdout.write(json.dumps(row) + "\n")
+    except RuntimeError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    finally:
+        sys.stdout.flush()
+        if lines is not None and lines is not sys.stdin:
+            lines.close()
@@ -1,28 +1,71 @@
 import typer
-import src.utils.calldata_decoder as calldata_decoder
 import json
+import sys
 from pathlib import Path
+from src.utils.output import RowWriter, emit, emit_rows, structured
+from src.utils.serialization import json_default
+
+# The decoder modules pull in web3 and load the .env file, so they are
+# imported inside each command rather than at module level. That keeps
+# `axe --help` and `axe constants ...` from paying for them.
 
 calldata_app = typer.Typer(help="Work with calldata")
 
-@calldata_app.command("decode", help="Decode calldata using transaction, abi or address")
+
+def echo_decoded(title, func_obj, params, chain=None):
+    if structured():
+        emit({"function": func_obj.signature, "params": params, **({"chain": chain} if chain else {})})
+        return
+    typer.echo(f"\n{title}\n")
+    typer.echo(func_obj)
+    typer.echo(json.dumps(params,indent=2,default=json_default))
+
+
+@calldata_app.command("decode", help="Decode calldata using transaction, abi, address or the local selector index")
 def decode_calldata(
         tx_hash: str = typer.Option(None, "--tx", help="Transaction hash"),
         abi_file: str = typer.Option(None, "--abi", help="Contract ABI"),
         address: str = typer.Option(None, "--address", help="Contract address"),
         calldata: str = typer.Option(None, "--calldata", help="Raw Calldata"),
-        chain: str = typer.Option(..., "--chain", help="Chain name")):
+        selectors: bool = typer.Option(False, "--selectors", help="Decode using the local selector index only"),
+        chain: str = typer.Option(None, "--chain", help="Chain name, or 'all' to look for --tx on every configured chain. "
+                                                        "Not needed with --abi or --selectors; with --offline and no chain, "
+                                                        "calls are decoded with the local selector index"),
+        chains: str = typer.Option(None, "--chains", help="Comma-separated chains to look for --tx on concurrently"),
+        offline: bool = typer.Option(False, "--offline", help="Only use cached ABIs, never query Etherscan"),
+        recursive: bool = typer.Option(False, "--recursive", help="Also decode nested calls (multicall, Safe, Universal Router) as a tree"),
+        max_depth: int = typer.Option(5, "--max-depth", help="Maximum nesting depth for --recursive")):
+    import src.utils.calldata_decoder as calldata_decoder
 
-    if sum([bool(tx_hash),bool(abi_file),bool(address)]) !=1:
-        typer.echo("Please provide exactly one argument: --tx, --abi, or --address", err=True)                                                  
+    if sum([bool(tx_hash),bool(abi_file),bool(address),selectors]) !=1:
+        typer.echo("Please provide exactly one argument: --tx, --abi, --address or --selectors", err=True)                                                
         raise typer.Exit(code=1)
+
+    if chain and chains:
+        raise typer.BadParameter("Please provide only one of --chain or --chains")
+    # A chain is needed to fetch --tx, and to look up ABIs and proxy
+    # implementations for --address and nested calls unless --offline.
+    if not (chain or chains) and (tx_hash or ((address or recursive) and not offline)):
+        raise typer.BadParameter("Please provide --chain (or --chains with --tx)")
+
+    tx = None
+    if chains or (chain and chain.lower() == "all"):
+        if not tx_hash:
+            raise typer.BadParameter("--chain all and --chains only work with --tx")
+        chain, tx = find_transaction_chain(tx_hash, chains or chain)
+
+    if recursive:
+        decode_recursive(tx_hash, abi_file, address, calldata, chain, offline, max_depth, tx)
+        return
     
     if tx_hash:
         try:
-            func_obj, params = calldata_decoder.decode_using_transaction_hash(tx_hash, chain)
-            typer.echo("\nDecoded Calldata using Transaction Hash\n")
-            typer.echo(func_obj)
-            typer.echo(json.dumps(params,indent=2))
+            if tx is not None:
+                func_obj, params = calldata_decoder.decode_transaction(tx, chain, offline)
+                echo_decoded(f"Decoded Calldata using Transaction Hash (found on {chain})", func_obj, params, chain)
+                return
+            func_obj, params = calldata_decoder.decode_using_transaction_hash(tx_hash, chain, offline)
+            echo_decoded("Decoded Calldata using Transaction Hash", func_obj, params)
             return
         except RuntimeError as e:
             typer.echo(e,err=True)
@@ -39,9 +82,7 @@ def decode_calldata(
             with abi_file.open("r") as f:
                 abi = json.load(f)
             func_obj, params = calldata_decoder.decode_using_abi(calldata, abi, chain)
-            typer.echo("\nDecoded Calldata using Contract ABI\n")
-            typer.echo(func_obj)
-            typer.echo(json.dumps(params,indent=2))
+            echo_decoded("Decoded Calldata using Contract ABI", func_obj, params)
             return
         except  RuntimeError as e:
             typer.echo(e,err=True)
@@ -52,16 +93,257 @@ def decode_calldata(
             raise typer.BadParameter("--calldata is required when using --address")
         
         try:
-            func_obj, params = calldata_decoder.decode_using_address(calldata, address, chain)
-            typer.echo("\nDecoded Calldata using Contract Address\n")
-            typer.echo(func_obj)
-            typer.echo(json.dumps(params,indent=2))
+            func_obj, params = calldata_decoder.decode_using_address(calldata, address, chain, offline)
+            echo_decoded("Decoded Calldata using Contract Address", func_obj, params)
             return
         except  RuntimeError as e:
             typer.echo(e,err=True)
             raise typer.Exit(code=1)
 
+    elif selectors:
+        if not calldata:
+            raise typer.BadParameter("--calldata is required when using --selectors")
+
+        from src.utils.selector_index import selector_index
+
+        candidates = selector_index.decode(calldata)
+        if not candidates:
+            typer.echo(f"No signature in the local selector index matches {calldata[:10]}", err=True)
+            raise typer.Exit(code=1)
+
+        func_obj, params = candidates[0]
+        if structured():
+            emit({"function": func_obj.signature, "params": params,
+                         "candidates": [{"function": candidate.signature, "seen": candidate.seen} for candidate, _ in candidates[1:]]})
+            return
+        echo_decoded("Decoded Calldata using Selector Index", func_obj, params)
+        if len(candidates) > 1:
+            typer.echo("\nOther candidates:")
+            for candidate, _ in candidates[1:]:
+                typer.echo(f"  {candidate.signature} (seen in {candidate.seen} ABIs)")
+
+
+def find_transaction_chain(tx_hash, chains):
+    from src.utils.chain_search import find_transaction, parse_chains
+
+    try:
+        return find_transaction(tx_hash, parse_chains(chains))
+    except ValueError as e:
+        raise typer.BadParameter(str(e))
+    except RuntimeError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+
+
+def decode_recursive(tx_hash, abi_file, address, calldata, chain, offline, max_depth, tx=None):
+    import src.utils.nested_decoder as nested_decoder
+
+    if not tx_hash and not calldata:
+        raise typer.BadParameter("--calldata is required unless using --tx")
+
+    try:
+        if tx_hash:
+            tree = nested_decoder.decode_transaction_recursive(tx_hash, chain, offline, max_depth, tx=tx)
+            if tx is not None:
+                tree["chain"] = chain
+        elif abi_file:
+            with Path(abi_file).expanduser().resolve().open("r") as f:
+                abi = json.load(f)
+            tree = nested_decoder.decode_recursive(calldata, None, chain, offline, abi, max_depth)
+        else:
+            tree = nested_decoder.decode_recursive(calldata, address, chain, offline, max_depth=max_depth)
+    except RuntimeError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+
+    if structured():
+        emit(tree)
+        return
+    typer.echo("\nDecoded Calldata Tree\n")
+    typer.echo(json.dumps(tree, indent=2, default=json_default))
+
+
+@calldata_app.command("decode-batch", help="Decode many tx hashes or address,calldata pairs and stream JSON lines")
+def decode_batch(
+        input_file: str = typer.Option("-", "--input", help="File with one tx hash or address,calldata pair per line ('-' for stdin)"),
+        chain: str = typer.Option(..., "--chain", help="Chain name"),
+        workers: int = typer.Option(8, "--workers", help="Number of concurrent fetches"),
+        offline: bool = typer.Option(False, "--offline", help="Only use cached ABIs, never query Etherscan")):
+    import src.utils.batch_decoder as batch_decoder
+
+    if input_file == "-":
+        lines = sys.stdin
+    else:
+        try:
+            lines = Path(input_file).expanduser().resolve().open("r")
+        except OSError as e:
+            typer.echo(e, err=True)
+            raise typer.Exit(code=1)
+
+    with lines:
+        results = batch_decoder.decode_batch(lines, chain, workers, offline)
+        if structured():
+            emit_rows(results)
+            return
+        for result in results:
+            typer.echo(json.dumps(result, default=json_default))
+
+
+@calldata_app.command("scan", help="Decode every call to a contract over a block range")
+def scan(
+        address: str = typer.Option(..., "--address", help="Contract address"),
+        from_block: int = typer.Option(..., "--from-block", help="First block to scan"),
+        to_block: int = typer.Option(..., "--to-block", help="Last block to scan (inclusive)"),
+        chain: str = typer.Option(..., "--chain", help="Chain name"),
+        output: str = typer.Option("-", "--output", help="Output file ('-' for stdout)"),
+        output_format: str = typer.Option("jsonl", "--format", help="Format of the rows written to --output: jsonl or columnar (the global --output-format replaces it on stdout)"),
+        chunk_size: int = typer.Option(1000, "--chunk-size", help="Rows per chunk for columnar output"),
+        batch_size: int = typer.Option(50, "--batch-size", help="Blocks fetched per batched RPC request"),
+        checkpoint: str = typer.Option(None, "--checkpoint", help="Checkpoint file used to resume an interrupted scan"),
+        offline: bool = typer.Option(False, "--offline", help="Only use cached ABIs, never query Etherscan")):
+    import src.utils.block_scanner as block_scanner
 
-@calldata_app.command("encode", help="Encode calldata")
-def encode(func: str = typer.Option(..., "--function", help="Function name")):
-    typer.echo(f"Encoding for function {func} coming soon...")
+    if output_format not in ("jsonl", "columnar"):
+        raise typer.BadParameter("--format must be jsonl or columnar")
+
+    checkpoint_path = Path(checkpoint).expanduser().resolve() if checkpoint else None
+    last_block = block_scanner.load_checkpoint(checkpoint_path)
+    start = from_block if last_block is None else max(from_block, last_block + 1)
+    if start > to_block:
+        typer.echo(f"Nothing to scan, checkpoint is already at block {last_block}", err=True)
+        return
+
+    if output == "-":
+        out = sys.stdout
+    else:
+        # Resuming from a checkpoint appends to what the previous run wrote.
+        out = Path(output).expanduser().resolve().open("a" if last_block is not None else "w")
+
+    if structured() and out is sys.stdout:
+        # The global --output-format takes over rows written to stdout.
+        writer = block_scanner.RowStreamWriter(RowWriter())
+    elif output_format == "columnar":
+        writer = block_scanner.ColumnarWriter(out, chunk_size)
+    else:
+        writer = block_scanner.JSONLWriter(out)
+
+    try:
+        block_scanner.run_scan(writer, checkpoint_path, address, chain, start, to_block, batch_size, offline)
+    except RuntimeError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    finally:
+        if isinstance(writer, block_scanner.RowStreamWriter):
+            writer.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+@calldata_app.command("index-abi", help="Add function selectors from ABI files to the local selector index")
+def index_abi(
+        abi_files: list[str] = typer.Argument(None, help="ABI files to index"),
+        from_cache: bool = typer.Option(False, "--from-cache", help="Also index every ABI in the local ABI cache")):
+    from src.utils.abi_cache import abi_cache
+    from src.utils.selector_index import selector_index
+
+    abis = []
+    for abi_file in abi_files or []:
+        try:
+            with Path(abi_file).expanduser().resolve().open("r") as f:
+                abis.append(json.load(f))
+        except (OSError, ValueError) as e:
+            typer.echo(f"Error reading {abi_file}! \n{e}", err=True)
+            raise typer.Exit(code=1)
+
+    if from_cache:
+        abis.extend(abi_cache.iter_abis())
+
+    added = sum(selector_index.add_abi(abi) for abi in abis)
+    if structured():
+        emit({"indexed": added, "abis": len(abis)})
+        return
+    typer.echo(f"Indexed {added} function signatures from {len(abis)} ABIs")
+
+
+def load_encoder(signature, abi_file, function, check_checksums=True):
+    from src.utils.calldata_encoder import CalldataEncoder
+
+    if bool(signature) == bool(abi_file):
+        typer.echo("Please provide exactly one of --signature or --abi", err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        if signature:
+            return CalldataEncoder.from_signature(signature, check_checksums)
+        if not function:
+            raise typer.BadParameter("--function is required when using --abi")
+        with Path(abi_file).expanduser().resolve().open("r") as f:
+            return CalldataEncoder.from_abi(json.load(f), function, check_checksums)
+    except (OSError, ValueError) as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+
+
+@calldata_app.command("encode", help="Encode calldata from a function signature or ABI and arguments")
+def encode(
+        args: list[str] = typer.Argument(None, help="Function arguments; arrays and tuples as JSON"),
+        signature: str = typer.Option(None, "--signature", help="Function signature, e.g. 'transfer(address,uint256)'"),
+        abi_file: str = typer.Option(None, "--abi", help="Contract ABI"),
+        function: str = typer.Option(None, "--function", help="Function name, or full signature for overloaded functions")):
+    encoder = load_encoder(signature, abi_file, function)
+    try:
+        calldata = encoder.encode_hex(args or [])
+    except (ValueError, TypeError, OverflowError) as e:
+        typer.echo(f"Error encoding calldata for {encoder.signature}! \n{e}", err=True)
+        raise typer.Exit(code=1)
+
+    if structured():
+        emit({"function": encoder.signature, "calldata": calldata})
+        return
+    typer.echo(calldata)
+
+
+@calldata_app.command("encode-batch", help="Encode one call per CSV/JSONL row and stream hex calldata lines")
+def encode_batch(
+        input_file: str = typer.Option("-", "--input", help="File with one row of arguments per line ('-' for stdin)"),
+        input_format: str = typer.Option(None, "--format", help="Format of the --input rows: csv or jsonl (default: from the file extension, csv for stdin)"),
+        header: bool = typer.Option(False, "--header", help="The first CSV row is a header"),
+        signature: str = typer.Option(None, "--signature", help="Function signature, e.g. 'transfer(address,uint256)'"),
+        abi_file: str = typer.Option(None, "--abi", help="Contract ABI"),
+        function: str = typer.Option(None, "--function", help="Function name, or full signature for overloaded functions"),
+        output: str = typer.Option("-", "--output", help="Output file ('-' for stdout)"),
+        skip_checksums: bool = typer.Option(False, "--skip-checksums", help="Do not verify EIP-55 checksums of mixed-case addresses")):
+    import src.utils.calldata_encoder as calldata_encoder
+
+    if input_format is None:
+        input_format = "jsonl" if Path(input_file).suffix in (".jsonl", ".ndjson", ".json") else "csv"
+    if input_format not in ("csv", "jsonl"):
+        raise typer.BadParameter("--format must be csv or jsonl")
+
+    encoder = load_encoder(signature, abi_file, function, not skip_checksums)
+
+    try:
+        lines = sys.stdin if input_file == "-" else Path(input_file).expanduser().resolve().open("r", newline="")
+        out = sys.stdout if output == "-" else Path(output).expanduser().resolve().open("w")
+    except OSError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+
+    rows = calldata_encoder.read_rows(lines, input_format, encoder.input_names, header)
+    try:
+        # One write per line through the file's own buffer; typer.echo would
+        # flush on every row.
+        if structured() and out is sys.stdout:
+            emit_rows({"calldata": calldata} for calldata in calldata_encoder.encode_rows(encoder, rows))
+        else:
+            for calldata in calldata_encoder.encode_rows(encoder, rows):
+                out.write(calldata + "\n")
+    except (RuntimeError, ValueError) as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    finally:
+        out.flush()
+        if lines is not sys.stdin:
+            lines.close()
+        if out is not sys.stdout:
+            out.close()
@@ -0,0 +1,140 @@
+import typer
+import json
+import sys
+from pathlib import Path
+from src.utils.output import RowWriter, emit, emit_rows, structured
+
+gas_app = typer.Typer(help="Estimate gas costs of calldata and transactions")
+
+
+def load_compiled_abi(abi_file, address, chain, offline):
+    if abi_file and address:
+        raise typer.BadParameter("Use either --abi or --address, not both")
+    if address and not chain:
+        raise typer.BadParameter("--chain is required when using --address")
+    if not abi_file and not address:
+        return None
+
+    from src.utils.compiled_abi import get_compiled_abi
+
+    try:
+        if abi_file:
+            with Path(abi_file).expanduser().resolve().open("r") as f:
+                abi = json.load(f)
+        else:
+            from src.utils.calldata_decoder import fetch_contract_abi
+            abi = fetch_contract_abi(address, chain, offline)
+    except (OSError, ValueError, RuntimeError) as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    return get_compiled_abi(abi)
+
+
+@gas_app.command("calldata", help="Intrinsic gas, EIP-7623 floor and per-argument cost of calldata payloads")
+def calldata_gas(
+        calldata: str = typer.Option(None, "--calldata", help="Raw calldata"),
+        input_file: str = typer.Option(None, "--input", help="File with one payload (hex or JSON with an 'input' field) per line ('-' for stdin)"),
+        abi_file: str = typer.Option(None, "--abi", help="Contract ABI, for a per-argument breakdown"),
+        address: str = typer.Option(None, "--address", help="Contract address whose ABI is used for the breakdown"),
+        chain: str = typer.Option(None, "--chain", help="Chain name (with --address)"),
+        offline: bool = typer.Option(False, "--offline", help="Only use cached ABIs, never query Etherscan"),
+        top: int = typer.Option(None, "--top", help="Only report the N most expensive payloads")):
+    import src.utils.calldata_gas as gas
+
+    if bool(calldata) == bool(input_file):
+        typer.echo("Please provide exactly one of --calldata or --input", err=True)
+        raise typer.Exit(code=1)
+
+    compiled_abi = load_compiled_abi(abi_file, address, chain, offline)
+
+    if calldata:
+        try:
+            _, data = gas.parse_payload(calldata)
+        except ValueError as e:
+            typer.echo(f"Invalid calldata! \n{e}", err=True)
+            raise typer.Exit(code=1)
+        result = gas.analyze_calldata(data, compiled_abi)
+        if structured():
+            emit(result)
+        else:
+            typer.echo(json.dumps(result, indent=2))
+        return
+
+    try:
+        lines = sys.stdin if input_file == "-" else Path(input_file).expanduser().resolve().open("r")
+    except OSError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        results = gas.analyze_payloads(lines, compiled_abi)
+        if top is not None:
+            results = gas.top_payloads(results, top)
+        if structured():
+            emit_rows(results)
+        else:
+            for result in results:
+                sys.stdout.write(json.dumps(result) + "\n")
+    except RuntimeError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    finally:
+        sys.stdout.flush()
+        if lines is not sys.stdin:
+            lines.close()
+
+
+@gas_app.command("estimate", help="Estimate static and dynamic gas offline from an opcode trace or disassembly")
+def estimate(
+        trace: str = typer.Option(None, "--trace", help="Opcode trace: EIP-3155 JSON lines or a debug_traceTransaction result ('-' for stdin)"),
+        disassembly: str = typer.Option(None, "--disassembly", help="Disassembled bytecode, one opcode per line ('-' for stdin)"),
+        to: str = typer.Option(None, "--to", help="Called contract, pre-warmed and used as the root storage context"),
+        origin: str = typer.Option(None, "--from", help="Transaction sender, pre-warmed"),
+        steps: bool = typer.Option(False, "--steps", help="Also stream the estimated gas of every trace step as JSON lines"),
+        top: int = typer.Option(20, "--top", help="Number of opcodes listed in the summary")):
+    import src.utils.gas_estimator as gas_estimator
+
+    if bool(trace) == bool(disassembly):
+        typer.echo("Please provide exactly one of --trace or --disassembly", err=True)
+        raise typer.Exit(code=1)
+
+    path = trace or disassembly
+    try:
+        lines = sys.stdin if path == "-" else Path(path).expanduser().resolve().open("r")
+    except OSError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+
+    # With --steps under the global --output-format, the steps and then the
+    # summary are all rows of the same stream.
+    rows = RowWriter() if steps and structured() else None
+
+    def write_step(step, gas):
+        row = {"pc": step.get("pc"), "op": step.get("opName") or step["op"], "depth": step.get("depth", 1), "gas": gas}
+        if rows is not None:
+            rows.write(row)
+        else:
+            sys.stdout.write(json.dumps(row) + "\n")
+
+    try:
+        if disassembly:
+            result = gas_estimator.estimate_disassembly(gas_estimator.parse_disassembly(lines))
+        else:
+            estimator = gas_estimator.GasEstimator(to, origin)
+            result = gas_estimator.estimate_trace(
+                gas_estimator.iter_trace_steps(lines), estimator, write_step if steps else None, top)
+    except (RuntimeError, ValueError) as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+    result["opcodes"] = result["opcodes"][:top]
+    if rows is not None:
+        rows.write(result)
+        rows.close()
+    elif structured():
+        emit(result)
+    else:
+        typer.echo(json.dumps(result, indent=2))
@@ -0,0 +1,96 @@
+import typer
+import json
+import sys
+from pathlib import Path
+from src.utils.output import emit_rows, structured
+from src.utils.serialization import json_default
+
+logs_app = typer.Typer(help="Decode event logs from receipts or block ranges")
+
+
+def load_event_index(abi_file, address, chain, offline):
+    import src.utils.log_decoder as log_decoder
+    from src.utils.calldata_decoder import fetch_contract_abi
+
+    if not abi_file and not address:
+        return None
+
+    index = log_decoder.EventIndex()
+    try:
+        if abi_file:
+            with Path(abi_file).expanduser().resolve().open("r") as f:
+                index.add_abi(json.load(f))
+        else:
+            index.add_abi(fetch_contract_abi(address, chain, offline), address)
+    except (OSError, ValueError, RuntimeError) as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    return index
+
+
+@logs_app.command("decode", help="Decode the logs of transactions, or every log of a contract over a block range")
+def decode_logs(
+        tx_hashes: list[str] = typer.Option(None, "--tx", help="Transaction hash whose receipt logs are decoded (repeatable)"),
+        input_file: str = typer.Option(None, "--input", help="File with one transaction hash per line ('-' for stdin)"),
+        address: str = typer.Option(None, "--address", help="Contract whose ABI is used; with a block range, only its logs are fetched"),
+        abi_file: str = typer.Option(None, "--abi", help="ABI file with the events to decode"),
+        from_block: int = typer.Option(None, "--from-block", help="First block of the range"),
+        to_block: int = typer.Option(None, "--to-block", help="Last block of the range (inclusive)"),
+        event: list[str] = typer.Option(None, "--event", help="Only fetch logs of this event name or signature (repeatable, block ranges only)"),
+        chain: str = typer.Option(..., "--chain", help="Chain name"),
+        window: int = typer.Option(2000, "--window", help="Initial eth_getLogs block window; adapts to the provider's limits"),
+        workers: int = typer.Option(8, "--workers", help="Concurrent ABI fetches for receipts"),
+        offline: bool = typer.Option(False, "--offline", help="Only use cached ABIs, never query Etherscan")):
+    import src.utils.log_decoder as log_decoder
+
+    receipts = bool(tx_hashes) or bool(input_file)
+    block_range = from_block is not None or to_block is not None
+    if receipts == block_range:
+        typer.echo("Please provide either --tx/--input or --from-block/--to-block", err=True)
+        raise typer.Exit(code=1)
+    if block_range and (from_block is None or to_block is None):
+        raise typer.BadParameter("--from-block and --to-block are both required")
+    if abi_file and address and receipts:
+        raise typer.BadParameter("Use either --abi or --address with --tx/--input, not both")
+
+    index = load_event_index(abi_file, address, chain, offline)
+    lines = None
+
+    if receipts:
+        if input_file:
+            try:
+                lines = sys.stdin if input_file == "-" else Path(input_file).expanduser().resolve().open("r")
+            except OSError as e:
+                typer.echo(e, err=True)
+                raise typer.Exit(code=1)
+        rows = log_decoder.decode_receipts(chain, lines if lines is not None else tx_hashes, index, offline, workers)
+    else:
+        if index is None:
+            raise typer.BadParameter("--abi or --address is required with a block range")
+        topics = None
+        if event:
+            wanted = set(event)
+            topic0s = sorted({"0x" + compiled.topic0.hex() for compiled in index.events.values()
+                              if compiled.name in wanted or compiled.signature in wanted})
+            if not topic0s:
+                raise typer.BadParameter(f"No event named {', '.join(event)} in the ABI")
+            topics = [topic0s]
+        elif not address:
+            # Without an address filter, at least restrict the range to the
+            # events the ABI knows about.
+            topics = [index.topics()]
+        rows = log_decoder.decode_range(chain, index, from_block, to_block, address, topics, window)
+
+    try:
+        if structured():
+            emit_rows(rows)
+        else:
+            for row in rows:
+                sys.stdout.write(json.dumps(row, default=json_default) + "\n")
+    except RuntimeError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    finally:
+        sys.stdout.flush()
+        if lines is not None and lines is not sys.stdin:
+            lines.close()
@@ -0,0 +1,27 @@
+import typer
+
+serve_app = typer.Typer(
+    help="Run a long-lived decode server that keeps providers, ABIs and caches warm")
+
+
+@serve_app.callback(invoke_without_command=True)
+def serve(
+        host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind"),
+        port: int = typer.Option(8765, "--port", help="Port to listen on"),
+        socket_path: str = typer.Option(None, "--socket", help="Listen on a Unix socket instead of TCP")):
+    import src.utils.decode_server as decode_server
+
+    try:
+        server = decode_server.make_server(host, port, socket_path)
+    except OSError as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+
+    address = f"unix:{socket_path}" if socket_path else f"http://{host}:{port}"
+    typer.echo(f"axe decode server listening on {address}", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,53 @@
+import typer
+import json
+import sys
+from pathlib import Path
+from src.utils.output import emit_rows, structured
+from src.utils.serialization import json_default
+
+trace_app = typer.Typer(help="Trace transactions and decode their internal calls")
+
+
+@trace_app.command("decode", help="Decode every internal call of a transaction as a flat stream of frames")
+def decode_trace(
+        tx_hash: str = typer.Option(None, "--tx", help="Transaction hash to trace through the chain's RPC"),
+        input_file: str = typer.Option(None, "--input", help="Saved debug_traceTransaction or trace_transaction output ('-' for stdin)"),
+        chain: str = typer.Option(..., "--chain", help="Chain name"),
+        tracer: str = typer.Option("call", "--tracer", help="call (debug_traceTransaction with callTracer; frames come children first, "
+                                                            "sort by trace_address for call order) or parity (trace_transaction, in call order)"),
+        workers: int = typer.Option(8, "--workers", help="Concurrent frame decodes (ABI fetches)"),
+        offline: bool = typer.Option(False, "--offline", help="Only use cached ABIs, never query Etherscan")):
+    import src.utils.json_stream as json_stream
+    import src.utils.trace_decoder as trace_decoder
+
+    if bool(tx_hash) == bool(input_file):
+        typer.echo("Please provide exactly one of --tx or --input", err=True)
+        raise typer.Exit(code=1)
+    if tracer not in trace_decoder.TRACERS:
+        raise typer.BadParameter(f"Unsupported tracer: {tracer} (expected one of {', '.join(trace_decoder.TRACERS)})")
+
+    source = None
+    if input_file:
+        try:
+            source = sys.stdin if input_file == "-" else Path(input_file).expanduser().resolve().open("r")
+        except OSError as e:
+            typer.echo(e, err=True)
+            raise typer.Exit(code=1)
+        chunks = json_stream.iter_chunks(source)
+    else:
+        chunks = trace_decoder.stream_trace(chain, tx_hash, tracer)
+
+    rows = trace_decoder.decode_trace(chunks, chain, tracer, offline, workers)
+    try:
+        if structured():
+            emit_rows(rows)
+        else:
+            for row in rows:
+                sys.stdout.write(json.dumps(row, default=json_default) + "\n")
+    except (RuntimeError, ValueError) as e:
+        typer.echo(e, err=True)
+        raise typer.Exit(code=1)
+    finally:
+        sys.stdout.flush()
+        if source is not None and source is not sys.stdin:
+            source.close()
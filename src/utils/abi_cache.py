@@ -0,0 +1,136 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from src.utils.config import AXE_CACHE_DIR, ABI_CACHE_TTL, ABI_CACHE_MAX_ENTRIES, ABI_NEGATIVE_TTL
+
+
+# ABIs are stored once per content hash, so the same ABI served for many
+# addresses (clones, the same contract on several chains) takes one row.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS abis (
+    abi_hash TEXT PRIMARY KEY,
+    abi TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contracts (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    abi_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (chain_id, address)
+);
+CREATE INDEX IF NOT EXISTS contracts_last_used ON contracts (last_used);
+CREATE TABLE IF NOT EXISTS unverified (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (chain_id, address)
+);
+"""
+
+
+def abi_hash(abi: list) -> str:
+    canonical = json.dumps(abi, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ABICache:
+    def __init__(self, path: Path, ttl: int = ABI_CACHE_TTL, max_entries: int = ABI_CACHE_MAX_ENTRIES,
+                 negative_ttl: int = ABI_NEGATIVE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def get(self, chain_id: int, address: str):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT a.abi, c.fetched_at FROM contracts c JOIN abis a ON a.abi_hash = c.abi_hash "
+                "WHERE c.chain_id = ? AND c.address = ?",
+                (chain_id, address.lower())).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                return None
+            conn.execute(
+                "UPDATE contracts SET last_used = ? WHERE chain_id = ? AND address = ?",
+                (now, chain_id, address.lower()))
+            conn.commit()
+        return json.loads(row[0])
+
+    def put(self, chain_id: int, address: str, abi: list):
+        digest = abi_hash(abi)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR IGNORE INTO abis (abi_hash, abi) VALUES (?, ?)",
+                (digest, json.dumps(abi, separators=(",", ":"))))
+            conn.execute(
+                "INSERT OR REPLACE INTO contracts (chain_id, address, abi_hash, fetched_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (chain_id, address.lower(), digest, now, now))
+            conn.execute("DELETE FROM unverified WHERE chain_id = ? AND address = ?", (chain_id, address.lower()))
+            self._evict(conn, now)
+            conn.commit()
+
+    def get_unverified(self, chain_id: int, address: str):
+        # The reason a recent lookup found no ABI, or None.
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT reason, checked_at FROM unverified WHERE chain_id = ? AND address = ?",
+                (chain_id, address.lower())).fetchone()
+        if row is None or time.time() - row[1] > self.negative_ttl:
+            return None
+        return row[0]
+
+    def put_unverified(self, chain_id: int, address: str, reason: str):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO unverified (chain_id, address, reason, checked_at) VALUES (?, ?, ?, ?)",
+                (chain_id, address.lower(), reason, now))
+            conn.execute("DELETE FROM unverified WHERE checked_at < ?", (now - self.negative_ttl,))
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM contracts WHERE fetched_at < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM contracts WHERE rowid IN ("
+            "SELECT rowid FROM contracts ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,))
+        conn.execute(
+            "DELETE FROM abis WHERE abi_hash NOT IN (SELECT abi_hash FROM contracts)")
+
+    def iter_abis(self):
+        with self._lock:
+            rows = self._connect().execute("SELECT abi FROM abis").fetchall()
+        for (abi,) in rows:
+            yield json.loads(abi)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM contracts")
+            conn.execute("DELETE FROM abis")
+            conn.execute("DELETE FROM unverified")
+            conn.commit()
+
+
+abi_cache = ABICache(AXE_CACHE_DIR / "abi_cache.sqlite")
@@ -0,0 +1,119 @@
+import json
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.utils import calldata_decoder
+from src.utils.config import RPC_BATCH_SIZE
+from src.utils.rpc_batcher import get_batch_client
+
+
+TX_HASH_PATTERN = re.compile(r"^0x[0-9a-fA-F]{64}$")
+
+
+def parse_batch_line(line: str):
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    if line.startswith("{"):
+        item = json.loads(line)
+        if "tx" in item:
+            return {"tx": item["tx"]}
+        return {"address": item["address"], "calldata": item["calldata"]}
+
+    if TX_HASH_PATTERN.match(line):
+        return {"tx": line}
+
+    parts = re.split(r"[,\s]+", line)
+    if len(parts) != 2:
+        raise ValueError(f"Expected a tx hash or 'address,calldata', got: {line}")
+    return {"address": parts[0], "calldata": parts[1]}
+
+
+class ABIResolver:
+    # Single-flight ABI lookups: the first worker asking for an address fetches
+    # it, every other worker asking for the same address waits on that result.
+    def __init__(self, chain: str, offline: bool = False, fetch=None):
+        self.chain = chain
+        self.offline = offline
+        self.fetch = fetch or calldata_decoder.fetch_abi
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def get(self, address: str):
+        key = address.lower()
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+
+        if owner:
+            try:
+                future.set_result(self.fetch(address, self.chain, self.offline))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def decode_item(item: dict, chain: str, resolver: ABIResolver):
+    if "tx" in item:
+        try:
+            tx = item["pending_tx"].result()
+        except Exception as e:
+            raise RuntimeError(f"Error fetching transaction!  \n{e}")
+        if tx is None:
+            raise RuntimeError(f"Transaction {item['tx']} not found")
+        address, calldata = tx["to"], tx["input"]
+        block = int(tx["blockNumber"], 16) if tx.get("blockNumber") else None
+    else:
+        address, calldata = item["address"], item["calldata"]
+        block = None
+
+    func_obj, params = calldata_decoder.decode_with_fallback(
+        calldata, address, chain, resolver.get, block, resolver.offline)
+    return {"function": func_obj.signature, "address": address, "params": params}
+
+
+def decode_batch(lines, chain: str, workers: int = 8, offline: bool = False):
+    chain = chain.lower()
+    resolver = ABIResolver(chain, offline)
+    rpc = get_batch_client(chain)
+
+    def prepare(line):
+        # Transaction lookups are queued as soon as a line is read so the RPC
+        # batcher can coalesce the whole window into a few batch requests.
+        try:
+            item = parse_batch_line(line)
+            if item is not None and "tx" in item:
+                item["pending_tx"] = rpc.get_transaction(item["tx"])
+            return item
+        except Exception as e:
+            return e
+
+    def run(line, item):
+        result = {"input": line.strip()}
+        try:
+            if isinstance(item, Exception):
+                raise item
+            result.update(decode_item(item, chain, resolver))
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    # Keep a bounded window of in-flight work so memory stays flat no matter
+    # how long the input is, and yield strictly in input order.
+    window = max(max(1, workers) * 4, RPC_BATCH_SIZE)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = deque()
+        for line in lines:
+            item = prepare(line)
+            if item is None:
+                continue
+            pending.append(pool.submit(run, line, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
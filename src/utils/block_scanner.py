@@ -0,0 +1,170 @@
+import json
+from pathlib import Path
+from src.utils import calldata_decoder
+from src.utils.batch_decoder import ABIResolver
+from src.utils.rpc_batcher import get_batch_client
+from src.utils.serialization import json_default
+
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_CHUNK_SIZE = 1000
+COLUMNS = ("block", "tx", "from", "value", "function", "params", "error")
+
+
+def load_checkpoint(path: Path):
+    if path is None or not path.exists():
+        return None
+    with path.open("r") as f:
+        return json.load(f)["last_block"]
+
+
+def save_checkpoint(path: Path, last_block: int):
+    if path is None:
+        return
+    # Write then rename so an interrupted run never leaves a torn checkpoint.
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("w") as f:
+        json.dump({"last_block": last_block}, f)
+    tmp_path.replace(path)
+
+
+def fetch_blocks(chain: str, block_numbers: range):
+    client = get_batch_client(chain)
+    pending = [client.get_block_by_number(number, True) for number in block_numbers]
+    try:
+        blocks = [future.result() for future in pending]
+    except Exception as e:
+        raise RuntimeError(f"Error fetching blocks {block_numbers.start}-{block_numbers.stop - 1}! \n{e}")
+
+    for number, block in zip(block_numbers, blocks):
+        if block is None:
+            raise RuntimeError(f"Block {number} not found")
+    return blocks
+
+
+def iter_block_batches(chain: str, start: int, end: int, batch_size: int = DEFAULT_BATCH_SIZE):
+    for batch_start in range(start, end + 1, batch_size):
+        numbers = range(batch_start, min(batch_start + batch_size, end + 1))
+        yield numbers[-1], fetch_blocks(chain, numbers)
+
+
+def iter_calls(blocks, address: str):
+    address = address.lower()
+    for block in blocks:
+        for tx in block["transactions"]:
+            if tx["to"] and tx["to"].lower() == address:
+                yield int(block["number"], 16), tx
+
+
+def decode_calls(calls, address: str, chain: str, abi: list, resolver: ABIResolver):
+    # The scanned contract's ABI is fetched once per scan. Implementations a
+    # proxy pointed at over the range are resolved at each call's block (see
+    # proxy_resolver.resolve_implementation) and their ABIs fetched through
+    # the resolver, once each.
+    def get_abi(target: str):
+        return abi if target.lower() == address.lower() else resolver.get(target)
+
+    for block_number, tx in calls:
+        row = {"block": block_number, "tx": tx["hash"], "from": tx["from"], "value": int(tx["value"], 16)}
+        try:
+            func_obj, params = calldata_decoder.decode_with_fallback(
+                tx["input"], address, chain, get_abi, block_number, resolver.offline)
+            row["function"] = func_obj.signature
+            row["params"] = params
+        except RuntimeError as e:
+            row["error"] = str(e)
+        yield row
+
+
+def scan(address: str, chain: str, start: int, end: int, batch_size: int = DEFAULT_BATCH_SIZE, offline: bool = False):
+    # Generator pipeline: blocks are fetched one batched RPC round at a time and each batch
+    # is filtered and decoded before the next is requested, so memory is
+    # bounded by the batch size rather than the range.
+    chain = chain.lower()
+    # Only the contract's own ABI: calls into a proxy are decoded with the
+    # implementation it pointed at in each call's block. Unverified contracts
+    # (or, offline, uncached ones) are decoded call by call from the selector
+    # index instead of failing the scan.
+    try:
+        abi = calldata_decoder.fetch_abi(address, chain, offline)
+    except RuntimeError:
+        abi = []
+    resolver = ABIResolver(chain, offline)
+    for last_block, blocks in iter_block_batches(chain, start, end, batch_size):
+        yield last_block, list(decode_calls(iter_calls(blocks, address), address, chain, abi, resolver))
+
+
+class JSONLWriter:
+    def __init__(self, out):
+        self.out = out
+        self.pending = 0
+
+    def write(self, rows):
+        for row in rows:
+            self.out.write(json.dumps(row, default=json_default) + "\n")
+
+    def flush(self):
+        self.out.flush()
+
+
+class ColumnarWriter:
+    # Emits one JSON object of column arrays per chunk, which downstream tools
+    # can load straight into a dataframe without per-row parsing. Chunks are
+    # only cut between block batches so they line up with checkpoints.
+    def __init__(self, out, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.out = out
+        self.chunk_size = chunk_size
+        self.columns = {column: [] for column in COLUMNS}
+        self.pending = 0
+
+    def write(self, rows):
+        for row in rows:
+            for column in COLUMNS:
+                self.columns[column].append(row.get(column))
+            self.pending += 1
+        if self.pending >= self.chunk_size:
+            self._write_chunk()
+
+    def _write_chunk(self):
+        if self.pending:
+            self.out.write(json.dumps(self.columns, default=json_default) + "\n")
+            self.columns = {column: [] for column in COLUMNS}
+            self.pending = 0
+
+    def flush(self):
+        self._write_chunk()
+        self.out.flush()
+
+
+class RowStreamWriter:
+    # Adapts an output.RowWriter (the global --output-format) to the writer
+    # interface above; rows go out as soon as each batch is decoded.
+    def __init__(self, rows_writer):
+        self.rows_writer = rows_writer
+        self.pending = 0
+
+    def write(self, rows):
+        for row in rows:
+            self.rows_writer.write(row)
+
+    def flush(self):
+        self.rows_writer.flush()
+
+    def close(self):
+        self.rows_writer.close()
+
+
+def run_scan(writer, checkpoint_path: Path, address: str, chain: str, start: int, end: int,
+             batch_size: int = DEFAULT_BATCH_SIZE, offline: bool = False):
+    # The checkpoint only advances once every row up to that block has been
+    # written out, so a resumed scan never skips rows held in a partial chunk.
+    last_block = None
+    for last_block, rows in scan(address, chain, start, end, batch_size, offline):
+        writer.write(rows)
+        if not writer.pending:
+            writer.flush()
+            save_checkpoint(checkpoint_path, last_block)
+
+    writer.flush()
+    if last_block is not None:
+        save_checkpoint(checkpoint_path, last_block)
@@ -0,0 +1,214 @@
+import sqlite3
+import threading
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from eth_hash.auto import keccak
+from src.utils.config import AXE_CACHE_DIR, CHAIN_CONFIG, RPC_BATCH_SIZE
+from src.utils.gas_estimator import OPCODE_NAMES
+from src.utils.profiling import span
+from src.utils.rpc_batcher import get_batch_client
+
+
+# Immediate size of every opcode (PUSH1..PUSH32), and the mnemonic printed for
+# it. Bytes that are not opcodes disassemble as INVALID, which is what the
+# EVM executes them as.
+PUSH_SIZES = bytes(n - 0x5f if 0x60 <= n <= 0x7f else 0 for n in range(256))
+MNEMONICS = [name or "INVALID" for name in OPCODE_NAMES]
+
+PUSH4 = 0x63
+EQ = 0x14
+DUP1, SWAP16 = 0x80, 0x9f
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS code (
+    codehash BLOB PRIMARY KEY,
+    code BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS contracts (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    codehash BLOB NOT NULL,
+    PRIMARY KEY (chain_id, address)
+) WITHOUT ROWID;
+"""
+
+
+class CodeCache:
+    # Runtime code is stored once per codehash, so the thousands of clones
+    # and minimal proxies a sweep runs into take a single row. Empty code is
+    # never stored.
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def get(self, chain_id: int, address: str):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT c.code FROM contracts a JOIN code c ON c.codehash = a.codehash "
+                "WHERE a.chain_id = ? AND a.address = ?",
+                (chain_id, address.lower())).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def put(self, chain_id: int, address: str, code: bytes) -> bytes:
+        codehash = keccak(code)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR IGNORE INTO code (codehash, code) VALUES (?, ?)", (codehash, code))
+            conn.execute(
+                "INSERT OR REPLACE INTO contracts (chain_id, address, codehash) VALUES (?, ?, ?)",
+                (chain_id, address.lower(), codehash))
+            conn.commit()
+        return codehash
+
+
+code_cache = CodeCache(AXE_CACHE_DIR / "code.sqlite")
+
+
+def fetch_codes(addresses, chain: str, offline: bool = False):
+    # Yields (address, code) in input order. Cache misses are requested a
+    # window at a time so the RPC batcher sends them as batch requests.
+    chain = chain.lower()
+    chain_id = CHAIN_CONFIG[chain]['chain_id']
+    client = None
+    pending = deque()
+
+    def take():
+        address, code, future = pending.popleft()
+        if future is not None:
+            try:
+                code = bytes.fromhex(future.result()[2:])
+            except Exception as e:
+                raise RuntimeError(f"Error fetching code of {address}! \n{e}")
+            # An address without code may still be deployed to (CREATE2,
+            # counterfactual wallets), so only runtime code is cached.
+            if code:
+                code_cache.put(chain_id, address, code)
+        return address, code
+
+    for address in addresses:
+        code = code_cache.get(chain_id, address)
+        future = None
+        if code is None:
+            if offline:
+                raise RuntimeError(f"Code of {address} on {chain} is not cached and offline mode is enabled")
+            if client is None:
+                client = get_batch_client(chain)
+            future = client.get_code(address)
+        pending.append((address, code, future))
+        if len(pending) >= RPC_BATCH_SIZE:
+            yield take()
+    while pending:
+        yield take()
+
+
+def fetch_code(address: str, chain: str, offline: bool = False) -> bytes:
+    with span("bytecode.fetch_code", address=address):
+        return next(fetch_codes([address], chain, offline))[1]
+
+
+def metadata_length(code: bytes) -> int:
+    # Solidity and Vyper append CBOR metadata whose length is stored in the
+    # last two bytes; it is data, not code.
+    if len(code) < 2:
+        return 0
+    length = int.from_bytes(code[-2:], "big") + 2
+    if length > len(code) or code[-length] not in (0xa1, 0xa2, 0xa3, 0xa4, 0xa5):
+        return 0
+    return length
+
+
+def disassemble(code: bytes, end: int = None):
+    # One pass over a memoryview: the opcode indexes the size table and
+    # immediates are zero-copy slices. Yields (pc, opcode, immediate).
+    view = memoryview(code)
+    sizes = PUSH_SIZES
+    end = len(code) if end is None else end
+    pc = 0
+    while pc < end:
+        op = view[pc]
+        size = sizes[op]
+        if size:
+            yield pc, op, view[pc + 1:pc + 1 + size]
+            pc += size + 1
+        else:
+            yield pc, op, None
+            pc += 1
+
+
+def format_instructions(code: bytes, end: int = None):
+    # Lines in the "0x0004: MSTORE" form gas estimate --disassembly reads.
+    mnemonics = MNEMONICS
+    for pc, op, immediate in disassemble(code, end):
+        if immediate is None:
+            yield f"0x{pc:04x}: {mnemonics[op]}"
+        else:
+            yield f"0x{pc:04x}: {mnemonics[op]} 0x{immediate.hex()}"
+
+
+@lru_cache(maxsize=4096)
+def extract_selectors(code: bytes) -> tuple:
+    # Function dispatchers compare the calldata selector against each
+    # PUSH4 constant: PUSH4 <selector> [DUPn|SWAPn] EQ. Cached per code, so
+    # clones seen again in a sweep cost a dict lookup.
+    view = memoryview(code)
+    sizes = PUSH_SIZES
+    end = len(code) - metadata_length(code)
+    selectors = {}
+    candidate = None
+    between = 0
+    pc = 0
+    while pc < end:
+        op = view[pc]
+        if op == PUSH4 and pc + 5 <= end:
+            candidate = bytes(view[pc + 1:pc + 5])
+            between = 0
+        elif candidate is not None:
+            if op == EQ:
+                if candidate != b"\xff\xff\xff\xff":
+                    selectors[candidate] = None
+                candidate = None
+            elif DUP1 <= op <= SWAP16 and between < 2:
+                between += 1
+            else:
+                candidate = None
+        pc += sizes[op] + 1
+    return tuple(selectors)
+
+
+def recover_abi(selectors, index) -> list:
+    # A partial ABI: the best-ranked local selector-index signature for every
+    # dispatcher selector that has one.
+    rows = []
+    abi = []
+    for selector in selectors:
+        candidates = index.lookup(selector)
+        rows.append({
+            "selector": "0x" + selector.hex(),
+            "signature": candidates[0].signature if candidates else None,
+            "candidates": [candidate.signature for candidate in candidates[1:]],
+        })
+        if candidates:
+            abi.append(dict(candidates[0].abi, stateMutability="nonpayable", outputs=[]))
+    return rows, abi
+
+
+def analyze(address: str, code: bytes, index) -> dict:
+    selectors = extract_selectors(code)
+    rows, abi = recover_abi(selectors, index)
+    return {
+        "address": address,
+        "codehash": "0x" + keccak(code).hex(),
+        "size": len(code),
+        "metadata_size": metadata_length(code),
+        "selectors": rows,
+        "abi": abi,
+    }
@@ -1,78 +1,157 @@
-import requests
 import json
-from src.utils.config import ETHERSCAN_API_KEY, CHAIN_CONFIG, get_web3
+from src.utils.config import CHAIN_CONFIG
+from src.utils.etherscan import NotVerified, get_etherscan_client
+from src.utils.profiling import span
+from src.utils.providers import get_web3
+from src.utils.proxy_resolver import resolve_implementation
+from src.utils.abi_cache import abi_cache
+from src.utils.compiled_abi import get_compiled_abi
+from src.utils.selector_index import selector_index
 
 
-def decode_using_transaction_hash(tx_hash: str, chain: str):
+def fetch_abi(address: str, chain: str, offline: bool = False):
+    # Without a chain (an offline decode that did not name one) no ABI can
+    # be looked up; decode_with_fallback goes on to the selector index.
+    if chain is None:
+        raise RuntimeError(f"No chain given to look up the ABI of {address}")
     chain = chain.lower()
-    web3 = get_web3(chain)
+    chain_id = CHAIN_CONFIG[chain]['chain_id']
+
+    with span("abi_cache.get"):
+        abi = abi_cache.get(chain_id, address)
+    if abi is not None:
+        return abi
+
+    # Unverified contracts are remembered for a while, so decoding calls to
+    # them does not ask Etherscan every time.
+    reason = abi_cache.get_unverified(chain_id, address)
+    if reason is not None:
+        raise NotVerified(reason)
+
+    if offline:
+        raise RuntimeError(f"ABI for {address} on {chain} is not cached and offline mode is enabled")
 
     try:
-        tx = web3.eth.get_transaction(tx_hash)
-    except Exception as e:
-        raise RuntimeError(f"Error fetching transaction!  \n{e}")
+        abi = get_etherscan_client().get_abi(chain_id, address)
+    except NotVerified as e:
+        abi_cache.put_unverified(chain_id, address, str(e))
+        raise
 
-    abi_endpoint = f"https://api.etherscan.io/v2/api?chainid={CHAIN_CONFIG[chain]['chain_id']}&module=contract&action=getabi&address={tx['to']}&apikey={ETHERSCAN_API_KEY}"
+    with span("abi_cache.put"):
+        abi_cache.put(chain_id, address, abi)
+    with span("selector_index.add_abi"):
+        selector_index.add_abi(abi)
+    return abi
 
+
+def merge_abis(*abis) -> list:
+    # Earlier ABIs win when an entry appears in more than one.
+    seen = set()
+    merged = []
+    for abi in abis:
+        for entry in abi:
+            key = (entry.get("type"), entry.get("name"), json.dumps(entry.get("inputs", []), sort_keys=True))
+            if key not in seen:
+                seen.add(key)
+                merged.append(entry)
+    return merged
+
+
+def fetch_contract_abi(address: str, chain: str, offline: bool = False):
+    # The contract's ABI, merged with its implementation's when it is a proxy.
+    abi = fetch_abi(address, chain, offline)
     try:
-        response = requests.get(abi_endpoint)
-        response_data = response.json()
+        implementation, _ = resolve_implementation(address, chain, offline=offline)
+        if implementation is None:
+            return abi
+        return merge_abis(fetch_abi(implementation, chain, offline), abi)
+    except RuntimeError:
+        return abi
+
+
+def fetch_transaction(tx_hash: str, chain: str):
+    web3 = get_web3(chain.lower())
+
+    try:
+        with span("eth.get_transaction", chain=chain):
+            return web3.eth.get_transaction(tx_hash)
     except Exception as e:
-        raise RuntimeError(f"Error fetching ABI! \n{e}")
-    
-    if response_data['status'] != '1' or not response_data['result']:
-        raise RuntimeError(f"ABI Messsage: {response_data['message']} \nABI Result: {response_data['result']}")
+        raise RuntimeError(f"Error fetching transaction!  \n{e}")
 
 
-    if isinstance(response_data['result'], str):                                                                                               
-        abi = json.loads(response_data['result'])
-    else:
-        abi = response_data['result']
-    
+def decode_with_abi(calldata, abi: list):
     try:
-        contract = web3.eth.contract(address=tx['to'], abi=abi)
-        func_obj, func_params = contract.decode_function_input(tx['input'])
-        return (func_obj, func_params)
+        with span("compile_abi"):
+            compiled_abi = get_compiled_abi(abi)
+        with span("decode_function_input"):
+            return compiled_abi.decode(calldata)
     except Exception as e:
         raise RuntimeError(f"Error decoding Calldata! \n{e}")
 
 
-def decode_using_abi(calldata: str, abi: list, chain: str):
-    chain = chain.lower()
+def decode_using_selector(calldata: str):
+    if isinstance(calldata, (bytes, bytearray)):
+        calldata = "0x" + bytes(calldata).hex()
+    with span("selector_index.decode"):
+        candidates = selector_index.decode(calldata)
+    if not candidates:
+        raise RuntimeError(f"No signature in the local selector index matches {calldata[:10]}")
+    return candidates[0]
+
+
+def decode_with_implementation(calldata: str, address: str, chain: str, get_abi, block: int = None, offline: bool = False):
+    if not address:
+        raise RuntimeError("No contract address to resolve")
+    if chain is None:
+        raise RuntimeError(f"No chain given to resolve the implementation of {address}")
+    with span("proxy.resolve"):
+        implementation, kind = resolve_implementation(address, chain, block, offline)
+    if implementation is None:
+        raise RuntimeError(f"{address} is not a proxy")
+    return decode_with_abi(calldata, get_abi(implementation))
 
+
+def decode_with_fallback(calldata: str, address: str, chain: str, get_abi, block: int = None, offline: bool = False):
+    # Calldata the contract's own ABI cannot decode (typically a call into a
+    # proxy, whose verified ABI only has the proxy functions) is decoded with
+    # the implementation's ABI, and failing that with the offline selector
+    # index.
     try:
-        web3 = get_web3(chain)
-        contract = web3.eth.contract(abi=abi)
-        func_obj, func_params = contract.decode_function_input(calldata)
-        return (func_obj, func_params)
-    except Exception as e:
-        raise RuntimeError(f"Error decoding Calldata! \n{e}")
+        abi = get_abi(address)
+        return decode_with_abi(calldata, abi)
+    except RuntimeError as e:
+        try:
+            return decode_with_implementation(calldata, address, chain, get_abi, block, offline)
+        except RuntimeError:
+            pass
+        try:
+            return decode_using_selector(calldata)
+        except RuntimeError:
+            raise e
 
 
-def decode_using_address(calldata: str, address: str, chain: str):
+def decode_transaction(tx, chain: str, offline: bool = False):
     chain = chain.lower()
 
-    abi_endpoint = f"https://api.etherscan.io/v2/api?chainid={CHAIN_CONFIG[chain]['chain_id']}&module=contract&action=getabi&address={address}&apikey={ETHERSCAN_API_KEY}"
+    return decode_with_fallback(
+        tx['input'], tx['to'], chain, lambda address: fetch_abi(address, chain, offline), tx.get('blockNumber'), offline)
 
-    try:
-        response = requests.get(abi_endpoint)
-        response_data = response.json()
-        
-    except Exception as e:
-        raise RuntimeError(f"Error decoding Calldata! \n{e}")
-    
-    if response_data['status'] != '1' or not response_data['result']:
-        raise RuntimeError(f"ABI Messsage: {response_data['message']} \nABI Result: {response_data['result']}")
-    
-    if isinstance(response_data['result'], str):                                                                                               
-        abi = json.loads(response_data['result'])
-    else:
-        abi = response_data['result']
 
-    try:
-        web3 = get_web3(chain)
-        contract = web3.eth.contract(address=address, abi=abi)
-        func_obj, func_params = contract.decode_function_input(calldata)
-        return (func_obj, func_params)
-    except Exception as e:
-        raise RuntimeError(f"Error Decoding Calldata! \n{e}")
+def decode_using_transaction_hash(tx_hash: str, chain: str, offline: bool = False):
+    chain = chain.lower()
+
+    with span("decode_using_transaction_hash"):
+        tx = fetch_transaction(tx_hash, chain)
+        return decode_transaction(tx, chain, offline)
+
+
+def decode_using_abi(calldata: str, abi: list, chain: str):
+    return decode_with_abi(calldata, abi)
+
+
+def decode_using_address(calldata: str, address: str, chain: str, offline: bool = False):
+    chain = chain.lower() if chain else None
+
+    with span("decode_using_address"):
+        return decode_with_fallback(
+            calldata, address, chain, lambda address: fetch_abi(address, chain, offline), offline=offline)
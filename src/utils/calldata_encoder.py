@@ -0,0 +1,343 @@
+import csv
+import json
+import re
+from functools import lru_cache
+from eth_hash.auto import keccak
+from eth_utils import function_signature_to_4byte_selector
+from src.utils.compiled_abi import get_compiled_abi
+
+
+_INT_TYPE = re.compile(r"^(u?)int(\d*)$")
+_BYTES_TYPE = re.compile(r"^bytes(\d+)$")
+_ARRAY_SUFFIX = re.compile(r"^(?:\[\d*\])*$")
+_IDENTIFIER = re.compile(r"^[A-Za-z_$][A-Za-z0-9_$]*$")
+_ELEMENTARY_TYPES = ("address", "bool", "string", "bytes")
+
+
+def split_types(types: str) -> list:
+    # Splits "address,(uint256,bytes)[],bool" on top-level commas only.
+    if not types.strip():
+        return []
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(types):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(types[start:i])
+            start = i + 1
+    parts.append(types[start:])
+    return parts
+
+
+def _check_base_type(base: str):
+    match = _INT_TYPE.match(base)
+    if match:
+        bits = int(match.group(2) or 256)
+        if bits % 8 or not 8 <= bits <= 256:
+            raise ValueError(f"Invalid type: {base} (the size must be a multiple of 8 up to 256)")
+        return
+    match = _BYTES_TYPE.match(base)
+    if match:
+        if not 1 <= int(match.group(1)) <= 32:
+            raise ValueError(f"Invalid type: {base} (the size must be between 1 and 32)")
+        return
+    if base not in _ELEMENTARY_TYPES:
+        raise ValueError(f"Unsupported type: {base}")
+
+
+def _canonical_type(param: str) -> str:
+    # A parameter as written in a Solidity signature, with an optional data
+    # location and name ("uint[] memory amounts"), to its canonical type
+    # ("uint256[]").
+    param = param.strip()
+    if param.startswith("("):
+        end = param.rindex(")")
+        inner = ",".join(_canonical_type(part) for part in split_types(param[1:end]))
+        head, rest = f"({inner})", param[end + 1:]
+        words = rest.split()
+        suffix = words.pop(0) if rest and not rest[0].isspace() else ""
+    else:
+        words = param.split()
+        if not words:
+            raise ValueError("Empty parameter type")
+        base, bracket, suffix = words.pop(0).partition("[")
+        _check_base_type(base)
+        head = base + "256" if base in ("uint", "int") else base
+        suffix = bracket + suffix
+    if not _ARRAY_SUFFIX.match(suffix) or len(words) > 2 or not all(_IDENTIFIER.match(word) for word in words):
+        raise ValueError(f"Invalid parameter: {param}")
+    return head + suffix
+
+
+def parse_signature(signature: str):
+    match = re.match(r"^\s*([A-Za-z_$][A-Za-z0-9_$]*)\s*\((.*)\)\s*$", signature, re.S)
+    if match is None:
+        raise ValueError(f"Invalid function signature: {signature}")
+    name, types = match.groups()
+    input_types = [_canonical_type(param) for param in split_types(types)]
+    return name, input_types
+
+
+def _parse_int(value) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    value = str(value).strip()
+    if value.lower().startswith(("0x", "-0x")):
+        return int(value, 16)
+    return int(value)
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in ("true", "1"):
+        return True
+    if value in ("false", "0"):
+        return False
+    raise ValueError(f"Invalid bool: {value}")
+
+
+def _parse_hex_bytes(value) -> bytes:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    value = value.strip()
+    if value.startswith(("0x", "0X")):
+        value = value[2:]
+    return bytes.fromhex(value)
+
+
+@lru_cache(maxsize=65536)
+def _checksum_matches(body: str) -> bool:
+    # EIP-55 without eth_utils' validation layers, which cost more than the
+    # keccak itself when checking every row of a large file.
+    lower = body.lower()
+    digest = keccak(lower.encode()).hex()
+    return body == "".join([c.upper() if h in "89abcdef" else c for c, h in zip(lower, digest)])
+
+
+def _parse_address(value, check_checksum: bool = True) -> bytes:
+    if isinstance(value, (bytes, bytearray)) and len(value) == 20:
+        return bytes(value)
+    value = value.strip()
+    raw = _parse_hex_bytes(value)
+    if len(raw) != 20:
+        raise ValueError(f"Invalid address: {value}")
+    # Mixed case means the address carries a checksum, so hold it to it.
+    body = value[2:] if value.startswith(("0x", "0X")) else value
+    if check_checksum and body != body.lower() and body != body.upper() and not _checksum_matches(body):
+        raise ValueError(f"Invalid address checksum: {value}")
+    return raw
+
+
+def _parse_address_unchecked(value) -> bytes:
+    return _parse_address(value, False)
+
+
+def _build_parser(type_str: str, check_checksums: bool = True):
+    # Turns a CLI/CSV string (or an already typed JSON value) into what the
+    # eth-abi encoders accept. Arrays and tuples are given as JSON.
+    if type_str.endswith("]"):
+        item = _build_parser(type_str[:type_str.rindex("[")], check_checksums)
+        return lambda value: [item(v) for v in (json.loads(value) if isinstance(value, str) else value)]
+
+    if type_str.startswith("("):
+        components = [_build_parser(part, check_checksums) for part in split_types(type_str[1:-1])]
+        return lambda value: tuple(
+            parse(v) for parse, v in zip(components, json.loads(value) if isinstance(value, str) else value))
+
+    if _INT_TYPE.match(type_str):
+        return _parse_int
+    if type_str == "bool":
+        return _parse_bool
+    if type_str == "address":
+        return _parse_address if check_checksums else _parse_address_unchecked
+    if type_str == "bytes" or _BYTES_TYPE.match(type_str):
+        return _parse_hex_bytes
+    if type_str == "string":
+        return lambda value: value
+    raise ValueError(f"Unsupported type: {type_str}")
+
+
+def _build_word_encoder(type_str: str):
+    # Static elementary types are a single 32-byte word, which is much
+    # cheaper to build by hand than through eth-abi's validating encoders.
+    # Returns None for anything that is not a single word.
+    match = _INT_TYPE.match(type_str)
+    if match:
+        signed, bits = match.group(1) != "u", int(match.group(2) or 256)
+        low, high = (-(1 << (bits - 1)), 1 << (bits - 1)) if signed else (0, 1 << bits)
+
+        def encode_int(value: int) -> bytes:
+            if not low <= value < high:
+                raise ValueError(f"Value {value} out of range for {type_str}")
+            return value.to_bytes(32, "big", signed=signed)
+        return encode_int
+
+    if type_str == "address":
+        return lambda value: b"\x00" * 12 + value
+
+    if type_str == "bool":
+        return lambda value: b"\x00" * 31 + (b"\x01" if value else b"\x00")
+
+    match = _BYTES_TYPE.match(type_str)
+    if match:
+        size = int(match.group(1))
+
+        def encode_fixed_bytes(value: bytes) -> bytes:
+            if len(value) > size:
+                raise ValueError(f"Value 0x{value.hex()} is too long for {type_str}")
+            return value.ljust(32, b"\x00")
+        return encode_fixed_bytes
+
+    return None
+
+
+def _encode_sequence(parts: list, values) -> bytes:
+    # Head/tail layout: static values inline, dynamic ones as offsets into
+    # the tail that follows the head.
+    encoded = [(dynamic, encode(value)) for (dynamic, encode), value in zip(parts, values)]
+    if not any(dynamic for dynamic, _ in encoded):
+        return b"".join([data for _, data in encoded])
+
+    offset = sum(32 if dynamic else len(data) for dynamic, data in encoded)
+    heads, tails = [], []
+    for dynamic, data in encoded:
+        if dynamic:
+            heads.append(offset.to_bytes(32, "big"))
+            tails.append(data)
+            offset += len(data)
+        else:
+            heads.append(data)
+    return b"".join(heads) + b"".join(tails)
+
+
+def _encode_bytes(value) -> bytes:
+    if isinstance(value, str):
+        value = value.encode()
+    return len(value).to_bytes(32, "big") + value + b"\x00" * (-len(value) % 32)
+
+
+def _build_encoder(type_str: str):
+    # Returns (is_dynamic, encode) for any ABI type, composed once per
+    # function from the word encoders above.
+    word = _build_word_encoder(type_str)
+    if word is not None:
+        return False, word
+
+    if type_str in ("bytes", "string"):
+        return True, _encode_bytes
+
+    if type_str.endswith("]"):
+        base, size = type_str[:type_str.rindex("[")], type_str[type_str.rindex("[") + 1:-1]
+        item = _build_encoder(base)
+        if not size:
+            return True, lambda values: len(values).to_bytes(32, "big") + _encode_sequence([item] * len(values), values)
+
+        size = int(size)
+
+        def encode_fixed_array(values):
+            if len(values) != size:
+                raise ValueError(f"Expected {size} items for {type_str}, got {len(values)}")
+            return _encode_sequence([item] * size, values)
+        return item[0], encode_fixed_array
+
+    if type_str.startswith("("):
+        components = [_build_encoder(part) for part in split_types(type_str[1:-1])]
+
+        def encode_tuple(values):
+            if len(values) != len(components):
+                raise ValueError(f"Expected {len(components)} components for {type_str}, got {len(values)}")
+            return _encode_sequence(components, values)
+        return any(dynamic for dynamic, _ in components), encode_tuple
+
+    raise ValueError(f"Unsupported type: {type_str}")
+
+
+class CalldataEncoder:
+    # Everything that depends only on the function (selector, argument
+    # parsers, type layout) is built once, so encoding a row is just parsing
+    # its values and joining bytes.
+    def __init__(self, selector: bytes, input_types: list, input_names: list = None, signature: str = None,
+                 check_checksums: bool = True):
+        self.selector = selector
+        self.input_types = input_types
+        self.input_names = input_names or [""] * len(input_types)
+        self.signature = signature
+        self.parsers = [_build_parser(type_str, check_checksums) for type_str in input_types]
+        self.parts = [_build_encoder(type_str) for type_str in input_types]
+        # All-static signatures (transfers, approvals, mints) are just a
+        # run of 32-byte words, so skip the head/tail bookkeeping.
+        self.words = None if any(dynamic for dynamic, _ in self.parts) else [encode for _, encode in self.parts]
+
+    def __repr__(self):
+        return f"<Encoder {self.signature}>"
+
+    @classmethod
+    def from_signature(cls, signature: str, check_checksums: bool = True) -> "CalldataEncoder":
+        name, input_types = parse_signature(signature)
+        canonical = f"{name}({','.join(input_types)})"
+        return cls(function_signature_to_4byte_selector(canonical), input_types, signature=canonical,
+                   check_checksums=check_checksums)
+
+    @classmethod
+    def from_abi(cls, abi: list, function: str, check_checksums: bool = True) -> "CalldataEncoder":
+        # `function` is either a bare name or a full signature for overloads.
+        matches = [
+            fn for fn in get_compiled_abi(abi).functions.values()
+            if function in (fn.fn_name, fn.signature)]
+        if not matches:
+            raise ValueError(f"Function {function} not found in ABI")
+        if len(matches) > 1:
+            raise ValueError(f"Function {function} is overloaded, use one of: {', '.join(fn.signature for fn in matches)}")
+        fn = matches[0]
+        return cls(fn.selector, fn.input_types, fn.input_names, fn.signature, check_checksums)
+
+    def _values(self, row):
+        if isinstance(row, dict):
+            try:
+                row = [row[name] for name in self.input_names]
+            except KeyError as e:
+                raise ValueError(f"Missing argument {e}")
+        if len(row) != len(self.parsers):
+            raise ValueError(f"Expected {len(self.parsers)} arguments, got {len(row)}")
+        return [parse(value) for parse, value in zip(self.parsers, row)]
+
+    def encode(self, row) -> bytes:
+        values = self._values(row)
+        if self.words is not None:
+            return self.selector + b"".join([encode(value) for encode, value in zip(self.words, values)])
+        return self.selector + _encode_sequence(self.parts, values)
+
+    def encode_hex(self, row) -> str:
+        return "0x" + self.encode(row).hex()
+
+
+def read_rows(lines, input_format: str, input_names: list = None, header: bool = False):
+    if input_format == "jsonl":
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    reader = csv.reader(lines)
+    columns = None
+    for i, row in enumerate(reader):
+        if i == 0 and (header or (input_names and row == input_names)):
+            # Map columns by name when the header names every input, so the
+            # CSV can list them in any order; otherwise just skip it.
+            if input_names and all(input_names) and set(input_names) <= set(row):
+                columns = row
+            continue
+        if row:
+            yield dict(zip(columns, row)) if columns else row
+
+
+def encode_rows(encoder: CalldataEncoder, rows):
+    for n, row in enumerate(rows, 1):
+        try:
+            yield encoder.encode_hex(row)
+        except (ValueError, TypeError, OverflowError) as e:
+            raise RuntimeError(f"Error encoding row {n}! \n{e}")
@@ -0,0 +1,145 @@
+import heapq
+import json
+from functools import lru_cache
+from src.utils.calldata_encoder import split_types
+from src.utils.constants import gas_constant
+
+
+TX_BASE_GAS = gas_constant("TX_BASE_GAS")
+GAS_PER_ZERO_BYTE = gas_constant("GAS_PER_ZERO_BYTE")
+GAS_PER_NON_ZERO_BYTE = gas_constant("GAS_PER_NON_ZERO_BYTE")
+TOTAL_COST_FLOOR_PER_TOKEN = gas_constant("TOTAL_COST_FLOOR_PER_TOKEN")
+
+
+def _costs(size: int, zero: int) -> dict:
+    nonzero = size - zero
+    return {
+        "bytes": size,
+        "zero_bytes": zero,
+        "nonzero_bytes": nonzero,
+        "gas": zero * GAS_PER_ZERO_BYTE + nonzero * GAS_PER_NON_ZERO_BYTE,
+    }
+
+
+def byte_costs(data: bytes, start: int = 0, end: int = None) -> dict:
+    # bytes.count runs in C over the buffer (and takes a range, so argument
+    # slices are never copied); there is no per-byte Python loop anywhere.
+    end = len(data) if end is None else end
+    return _costs(max(end - start, 0), data.count(0, start, end))
+
+
+def _static_size(type_str: str):
+    # Size of a type's inline encoding, or None when it lives in the tail.
+    if type_str in ("bytes", "string"):
+        return None
+    if type_str.endswith("]"):
+        base, size = type_str[:type_str.rindex("[")], type_str[type_str.rindex("[") + 1:-1]
+        item = _static_size(base)
+        return None if not size or item is None else item * int(size)
+    if type_str.startswith("("):
+        sizes = [_static_size(part) for part in split_types(type_str[1:-1])]
+        return None if None in sizes else sum(sizes)
+    return 32
+
+
+@lru_cache(maxsize=1024)
+def _head_layout(function) -> tuple:
+    return tuple(
+        (name, type_str, _static_size(type_str))
+        for name, type_str in zip(function.input_names, function.input_types))
+
+
+def argument_breakdown(data: bytes, function) -> list:
+    # Attributes every byte after the selector to a top-level argument: its
+    # head slot plus, for dynamic arguments, the tail region its offset
+    # points at (up to the next argument's tail).
+    length = len(data)
+    regions = []
+    tails = []
+    head = 4
+    for name, type_str, size in _head_layout(function):
+        if size is None:
+            offset = int.from_bytes(data[head:head + 32], "big")
+            tails.append((min(4 + offset, length), len(regions)))
+            size = 32
+        end = min(head + size, length)
+        regions.append([name, type_str, max(end - head, 0), data.count(0, head, end)])
+        head += size
+
+    covered = min(head, length)
+    tails.sort()
+    for i, (start, index) in enumerate(tails):
+        end = tails[i + 1][0] if i + 1 < len(tails) else length
+        regions[index][2] += max(end - start, 0)
+        regions[index][3] += data.count(0, start, end)
+        covered = max(covered, end)
+
+    if covered < length:
+        regions.append(["(trailing)", None, length - covered, data.count(0, covered, length)])
+
+    breakdown = [{"name": "(selector)", "type": "bytes4", **byte_costs(data, 0, min(4, length))}]
+    for name, type_str, size, zero in regions:
+        breakdown.append({"name": name, "type": type_str, **_costs(size, zero)})
+    return breakdown
+
+
+def analyze_calldata(data: bytes, compiled_abi=None) -> dict:
+    costs = byte_costs(data)
+    tokens = costs["zero_bytes"] + 4 * costs["nonzero_bytes"]
+    intrinsic = TX_BASE_GAS + costs["gas"]
+    floor = TX_BASE_GAS + TOTAL_COST_FLOOR_PER_TOKEN * tokens
+    result = {
+        "bytes": costs["bytes"],
+        "zero_bytes": costs["zero_bytes"],
+        "nonzero_bytes": costs["nonzero_bytes"],
+        "tokens": tokens,
+        "calldata_gas": costs["gas"],
+        "intrinsic_gas": intrinsic,
+        "floor_gas": floor,
+        # Under EIP-7623 the floor is charged whenever execution uses less
+        # than this much gas.
+        "floor_applies_below": floor - intrinsic,
+    }
+
+    if compiled_abi is not None and len(data) >= 4:
+        try:
+            function = compiled_abi.get_function(data)
+        except ValueError:
+            result["function"] = None
+        else:
+            result["function"] = function.signature
+            result["arguments"] = argument_breakdown(data, function)
+    return result
+
+
+def parse_payload(line: str):
+    # Accepts raw hex or a JSON object carrying the calldata as "input" or
+    # "calldata" (e.g. transactions dumped from an RPC node).
+    line = line.strip()
+    label = None
+    if line.startswith("{"):
+        payload = json.loads(line)
+        label = payload.get("hash") or payload.get("tx")
+        line = payload.get("input") or payload.get("calldata") or ""
+    if line.startswith(("0x", "0X")):
+        line = line[2:]
+    return label, bytes.fromhex(line)
+
+
+def analyze_payloads(lines, compiled_abi=None):
+    for n, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            label, data = parse_payload(line)
+        except ValueError as e:
+            raise RuntimeError(f"Error parsing payload on line {n}! \n{e}")
+        result = {"line": n, **analyze_calldata(data, compiled_abi)}
+        if label:
+            result["tx"] = label
+        yield result
+
+
+def top_payloads(results, top: int, key: str = "floor_gas") -> list:
+    # Bounded heap, so a large corpus is streamed rather than held in memory.
+    return heapq.nlargest(top, results, key=lambda result: result[key])
@@ -0,0 +1,68 @@
+import asyncio
+from web3.exceptions import TransactionNotFound
+from src.utils.config import CHAIN_CONFIG
+from src.utils.profiling import span
+from src.utils.providers import close_async_web3, get_async_web3
+
+
+def configured_chains() -> list:
+    return [chain for chain, config in CHAIN_CONFIG.items() if config["rpc_url"]]
+
+
+def parse_chains(value: str) -> list:
+    # "all" means every chain with an RPC URL configured; otherwise a
+    # comma-separated list of chain names.
+    if value.strip().lower() == "all":
+        chains = configured_chains()
+        if not chains:
+            raise ValueError("No chain has an RPC URL configured")
+        return chains
+
+    chains = [chain.strip().lower() for chain in value.split(",") if chain.strip()]
+    unknown = [chain for chain in chains if chain not in CHAIN_CONFIG]
+    if unknown:
+        raise ValueError(f"Unsupported Chain: {', '.join(unknown)}")
+    if not chains:
+        raise ValueError("No chains given")
+    return chains
+
+
+async def _lookup(chain: str, tx_hash: str):
+    web3 = await get_async_web3(chain)
+    return chain, await web3.eth.get_transaction(tx_hash)
+
+
+async def find_transaction_async(tx_hash: str, chains: list):
+    # Every chain is asked at once; the first one that has the transaction
+    # wins and the lookups still in flight are cancelled.
+    tasks = {asyncio.create_task(_lookup(chain, tx_hash)): chain for chain in chains}
+    errors = {}
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                chain = tasks.pop(task)
+                try:
+                    return task.result()
+                except TransactionNotFound:
+                    errors[chain] = "not found"
+                except Exception as e:
+                    errors[chain] = str(e) or type(e).__name__
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    details = "\n".join(f"  {chain}: {error}" for chain, error in errors.items())
+    raise RuntimeError(f"Transaction {tx_hash} was not found on any of {len(chains)} chains! \n{details}")
+
+
+def find_transaction(tx_hash: str, chains: list):
+    async def run():
+        try:
+            return await find_transaction_async(tx_hash, chains)
+        finally:
+            await close_async_web3()
+
+    with span("chain_search.find_transaction", chains=len(chains)):
+        return asyncio.run(run())
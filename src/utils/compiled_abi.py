@@ -0,0 +1,198 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from eth_abi.abi import default_codec
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_utils import to_bytes, to_checksum_address
+from eth_utils.abi import abi_to_signature, event_abi_to_log_topic, function_abi_to_4byte_selector, get_abi_input_types
+from src.utils.abi_cache import abi_hash
+
+
+COMPILED_ABI_CACHE_SIZE = 128
+
+_lock = threading.Lock()
+_compiled = OrderedDict()
+_hashes = OrderedDict()
+
+# Checksumming costs a keccak per address and hot contracts see the same
+# handful of addresses over and over.
+checksum_address = lru_cache(maxsize=65536)(to_checksum_address)
+
+
+def _build_normalizer(param: dict):
+    # Mirrors web3's decode_function_input output: checksummed addresses,
+    # arrays as lists and tuples as dicts keyed by component name. Returns
+    # None when the value can be passed through untouched.
+    type_str = param["type"]
+
+    if type_str.endswith("]"):
+        item = _build_normalizer(dict(param, type=type_str[:type_str.rindex("[")]))
+        if item is None:
+            return list
+        return lambda values: [item(value) for value in values]
+
+    if type_str == "tuple":
+        components = [(component["name"], _build_normalizer(component)) for component in param["components"]]
+        return lambda values: {
+            name: value if normalize is None else normalize(value)
+            for (name, normalize), value in zip(components, values)}
+
+    if type_str == "address":
+        return checksum_address
+
+    return None
+
+
+class CompiledFunction:
+    def __init__(self, fn_abi: dict):
+        self.abi = fn_abi
+        self.fn_name = fn_abi["name"]
+        self.signature = abi_to_signature(fn_abi)
+        self.selector = function_abi_to_4byte_selector(fn_abi)
+        self.input_types = get_abi_input_types(fn_abi)
+        self.input_names = [param["name"] for param in fn_abi.get("inputs", [])]
+        self.decoder = TupleDecoder(decoders=[
+            default_codec._registry.get_decoder(type_str) for type_str in self.input_types])
+        self.normalizers = [_build_normalizer(param) for param in fn_abi.get("inputs", [])]
+
+    def __repr__(self):
+        return f"<Function {self.signature}>"
+
+    def decode_raw(self, args: bytes) -> tuple:
+        return self.decoder(ContextFramesBytesIO(args))
+
+    def normalize(self, raw: tuple) -> dict:
+        return {
+            name: value if normalize is None else normalize(value)
+            for name, normalize, value in zip(self.input_names, self.normalizers, raw)}
+
+    def decode(self, args: bytes) -> dict:
+        return self.normalize(self.decode_raw(args))
+
+
+def _is_hashed_topic(type_str: str) -> bool:
+    # Indexed arguments that are not value types are logged as the keccak
+    # hash of their encoding and cannot be recovered.
+    return type_str in ("string", "bytes") or type_str.endswith("]") or type_str.startswith("tuple")
+
+
+def _build_topic_decoder(param: dict):
+    # Value types fill a topic word on their own, so the common ones are read
+    # straight off the 32 bytes instead of going through an eth_abi stream.
+    type_str = param["type"]
+    if _is_hashed_topic(type_str):
+        return lambda topic: "0x" + topic.hex()
+    if type_str == "address":
+        return lambda topic: checksum_address("0x" + topic[12:].hex())
+    if type_str.startswith("uint"):
+        return lambda topic: int.from_bytes(topic, "big")
+    if type_str.startswith("int"):
+        return lambda topic: int.from_bytes(topic, "big", signed=True)
+    if type_str == "bool":
+        return lambda topic: topic[-1] == 1
+    if type_str.startswith("bytes"):
+        size = int(type_str[5:])
+        return lambda topic: topic[:size]
+
+    decoder = default_codec._registry.get_decoder(type_str)
+    normalize = _build_normalizer(param)
+    if normalize is None:
+        return lambda topic: decoder(ContextFramesBytesIO(topic))
+    return lambda topic: normalize(decoder(ContextFramesBytesIO(topic)))
+
+
+class CompiledEvent:
+    def __init__(self, event_abi: dict):
+        self.abi = event_abi
+        self.name = event_abi["name"]
+        self.signature = abi_to_signature(event_abi)
+        self.topic0 = event_abi_to_log_topic(event_abi)
+        inputs = event_abi.get("inputs", [])
+        self.input_names = [param["name"] for param in inputs]
+        self.indexed = [(param["name"], _build_topic_decoder(param)) for param in inputs if param.get("indexed")]
+        data_params = [param for param in inputs if not param.get("indexed")]
+        self.data_names = [param["name"] for param in data_params]
+        self.data_decoder = TupleDecoder(decoders=[
+            default_codec._registry.get_decoder(type_str)
+            for type_str in get_abi_input_types({"type": "event", "inputs": data_params})])
+        self.data_normalizers = [_build_normalizer(param) for param in data_params]
+
+    def __repr__(self):
+        return f"<Event {self.signature}>"
+
+    def decode(self, topics: list, data: bytes) -> dict:
+        # topics[0] is the event signature; the rest line up with the indexed
+        # parameters. Hashed topics are returned as hex.
+        values = {name: decode(topic) for (name, decode), topic in zip(self.indexed, topics[1:])}
+
+        raw = self.data_decoder(ContextFramesBytesIO(data))
+        for name, normalize, value in zip(self.data_names, self.data_normalizers, raw):
+            values[name] = value if normalize is None else normalize(value)
+        return {name: values[name] for name in self.input_names}
+
+
+class CompiledABI:
+    def __init__(self, abi: list):
+        self.abi = abi
+        self.functions = {}
+        for item in abi:
+            if item.get("type") == "function":
+                function = CompiledFunction(item)
+                self.functions[function.selector] = function
+        self._events = None
+
+    @property
+    def events(self) -> list:
+        # Compiled on first use; calldata decoding never needs them.
+        # Anonymous events have no signature topic and cannot be matched.
+        if self._events is None:
+            self._events = [
+                CompiledEvent(item) for item in self.abi
+                if item.get("type") == "event" and not item.get("anonymous")]
+        return self._events
+
+    def get_function(self, selector: bytes) -> CompiledFunction:
+        function = self.functions.get(bytes(selector[:4]))
+        if function is None:
+            raise ValueError(f"Could not find any function with matching selector 0x{bytes(selector[:4]).hex()}")
+        return function
+
+    def decode(self, calldata):
+        if isinstance(calldata, str):
+            calldata = to_bytes(hexstr=calldata)
+        function = self.get_function(calldata)
+        return (function, function.decode(calldata[4:]))
+
+
+def _remember(abi: list, digest: str):
+    _hashes[id(abi)] = (abi, digest)
+    _hashes.move_to_end(id(abi))
+    while len(_hashes) > COMPILED_ABI_CACHE_SIZE:
+        _hashes.popitem(last=False)
+
+
+def get_compiled_abi(abi: list) -> CompiledABI:
+    # Hashing a large ABI is not free, so remember the digest of ABI objects
+    # we have already seen; the batch paths hand us the same list repeatedly.
+    with _lock:
+        seen = _hashes.get(id(abi))
+    if seen is not None and seen[0] is abi:
+        digest = seen[1]
+    else:
+        digest = abi_hash(abi)
+
+    with _lock:
+        compiled = _compiled.get(digest)
+        if compiled is not None:
+            _compiled.move_to_end(digest)
+            _remember(abi, digest)
+            return compiled
+
+    compiled = CompiledABI(abi)
+
+    with _lock:
+        _compiled[digest] = compiled
+        while len(_compiled) > COMPILED_ABI_CACHE_SIZE:
+            _compiled.popitem(last=False)
+        _remember(abi, digest)
+    return compiled
@@ -1,17 +1,45 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
-from web3 import Web3
 
 
 load_dotenv()
 ETHERSCAN_API_KEY = os.getenv("ETHERSCAN_API_KEY")
+ETHERSCAN_API_URL = os.getenv("ETHERSCAN_API_URL", "https://api.etherscan.io/v2/api")
+# Comma-separated; requests are spread round-robin across the keys.
+ETHERSCAN_API_KEYS = [key.strip() for key in os.getenv("ETHERSCAN_API_KEYS", ETHERSCAN_API_KEY or "").split(",") if key.strip()]
+# Calls per second allowed per key (5 on the free tier, 0 disables the limiter).
+ETHERSCAN_RATE_LIMIT = float(os.getenv("AXE_ETHERSCAN_RATE_LIMIT", 5))
+ETHERSCAN_RETRIES = int(os.getenv("AXE_ETHERSCAN_RETRIES", 5))
+
+AXE_CACHE_DIR = Path(os.getenv("AXE_CACHE_DIR", "~/.axe")).expanduser()
+ABI_CACHE_TTL = int(os.getenv("AXE_ABI_CACHE_TTL", 7 * 24 * 60 * 60))
+ABI_CACHE_MAX_ENTRIES = int(os.getenv("AXE_ABI_CACHE_MAX_ENTRIES", 10000))
+# Contracts Etherscan reports as unverified are not asked about again for this
+# long; they may still get verified later.
+ABI_NEGATIVE_TTL = int(os.getenv("AXE_ABI_NEGATIVE_TTL", 6 * 60 * 60))
+# Proxy -> implementation mappings are re-read once this many blocks old.
+PROXY_CACHE_BLOCKS = int(os.getenv("AXE_PROXY_CACHE_BLOCKS", 7200))
+
+HTTP_POOL_SIZE = int(os.getenv("AXE_HTTP_POOL_SIZE", 32))
+HTTP_TIMEOUT = float(os.getenv("AXE_HTTP_TIMEOUT", 30))
+HTTP_RETRIES = int(os.getenv("AXE_HTTP_RETRIES", 3))
+HTTP_BACKOFF = float(os.getenv("AXE_HTTP_BACKOFF", 0.5))
+# Tracing a large transaction can take the node far longer than a plain call.
+TRACE_TIMEOUT = float(os.getenv("AXE_TRACE_TIMEOUT", 120))
+
+RPC_BATCH_SIZE = int(os.getenv("AXE_RPC_BATCH_SIZE", 100))
+RPC_BATCH_LATENCY = float(os.getenv("AXE_RPC_BATCH_LATENCY", 0.005))
+# Batches in flight at once per RPC endpoint, so one slow batch (a large
+# eth_getLogs range, a block batch) does not hold up every other call.
+RPC_BATCH_CONCURRENCY = int(os.getenv("AXE_RPC_BATCH_CONCURRENCY", 4))
 
 CHAIN_CONFIG = {
     "ethereum": {"chain_id": 1, "rpc_url": os.getenv("ETHEREUM_RPC_URL")},
     "eth-sepolia": {"chain_id": 11155111, "rpc_url": os.getenv("ETH_SEPOLIA_RPC_URL")},
 
-    "op-mainnet": {"chain_id": 42161, "rpc_url": os.getenv("OP_MAINNET_RPC_URL")},
-    "op-sepolia": {"chain_id": 42161, "rpc_url": ("OP_SEPOLIA_RPC_URL")},
+    "op-mainnet": {"chain_id": 10, "rpc_url": os.getenv("OP_MAINNET_RPC_URL")},
+    "op-sepolia": {"chain_id": 11155420, "rpc_url": os.getenv("OP_SEPOLIA_RPC_URL")},
 
     "arbitrum": {"chain_id": 42161, "rpc_url": os.getenv("ARBITRUM_RPC_URL")},
     "arb-sepolia": {"chain_id": 421614, "rpc_url": os.getenv("ARB_SEPOLIA_RPC_URL")},
@@ -26,12 +54,3 @@ CHAIN_CONFIG = {
     "polygon-amoy": {"chain_id": 80002, "rpc_url": os.getenv("POLYGON_AMOY_RPC_URL")}
 }
 
-
-def get_web3(chain: str) -> Web3:
-    chain = chain.lower()
-    if chain not in CHAIN_CONFIG:
-        raise ValueError(f"Unsupported Chain: {chain}")
-    else:
-        web3 = Web3(Web3.HTTPProvider(
-            f"{CHAIN_CONFIG[chain.lower()]['rpc_url']}"))
-        return web3
@@ -0,0 +1,433 @@
+UINT_MAX = {
+    "uint8":  {"dec": str(2**8 - 1), "hex": hex(2**8 - 1)},
+    "uint16": {"dec": str(2**16 - 1), "hex": hex(2**16 - 1)},
+    "uint24": {"dec": str(2**24 - 1), "hex": hex(2**24 - 1)},
+    "uint32": {"dec": str(2**32 - 1), "hex": hex(2**32 - 1)},
+    "uint40": {"dec": str(2**40 - 1), "hex": hex(2**40 - 1)},
+    "uint48": {"dec": str(2**48 - 1), "hex": hex(2**48 - 1)},
+    "uint64": {"dec": str(2**64 - 1), "hex": hex(2**64 - 1)},
+    "uint96": {"dec": str(2**96 - 1), "hex": hex(2**96 - 1)},
+    "uint160": {"dec": str(2**160 - 1), "hex": hex(2**160 - 1)},
+    "uint256": {"dec": str(2**256 - 1), "hex": hex(2**256 - 1)},
+}
+
+ADDRESS = {
+    "Zero Address": {
+        "address": "0x0000000000000000000000000000000000000000",
+        "description": "Default zero address"
+    },
+    "Burn Address": {
+        "address": "0x000000000000000000000000000000000000dEaD",
+        "description": "Used to burn tokens permanently"
+    },
+    "ecrecover (0x01)": {
+        "address": "0x0000000000000000000000000000000000000001",
+        "description": "Elliptic curve digital signature recovery"
+    },
+    "sha256 (0x02)": {
+        "address": "0x0000000000000000000000000000000000000002",
+        "description": "SHA-256 hash function"
+    },
+    "ripemd160 (0x03)": {
+        "address": "0x0000000000000000000000000000000000000003",
+        "description": "RIPEMD-160 hash function"
+    },
+    "identity (0x04)": {
+        "address": "0x0000000000000000000000000000000000000004",
+        "description": "Returns input unmodified"
+    },
+    "modexp (0x05)": {
+        "address": "0x0000000000000000000000000000000000000005",
+        "description": "Modular exponentiation (big integers)"
+    },
+    "bn128Add (0x06)": {
+        "address": "0x0000000000000000000000000000000000000006",
+        "description": "Addition on alt_bn128 elliptic curve"
+    },
+    "bn128Mul (0x07)": {
+        "address": "0x0000000000000000000000000000000000000007",
+        "description": "Multiplication on alt_bn128 elliptic curve"
+    },
+    "bn128Pairing (0x08)": {
+        "address": "0x0000000000000000000000000000000000000008",
+        "description": "Pairing check on alt_bn128 curve"
+    },
+    "blake2f (0x09)": {
+        "address": "0x0000000000000000000000000000000000000009",
+        "description": "BLAKE2b compression function"
+    }
+}
+
+
+BYTES = {
+    "bytes1": {"zero": "0x00", "max": "0xff"},
+    "bytes4": {"zero": "0x" + "00" * 4, "max": "0xffffffff"},
+    "bytes20": {"zero": "0x" + "00" * 20, "max": "0x" + "ff" * 20},
+    "bytes32": {"zero": "0x" + "00" * 32, "max": "0x" + "ff" * 32},
+}
+
+ETH_UNITS = {
+    "wei":    {"wei": f"{1} (1e0)",        "eth": "0.000000000000000001"},
+    "gwei":   {"wei": f"{10**9} (1e9)",    "eth": "0.000000001"},
+    "szabo":  {"wei": f"{10**12} (1e12)",  "eth": "0.000001"},
+    "finney": {"wei": f"{10**15} (1e15)",  "eth": "0.001"},
+    "ether":  {"wei": f"{10**18} (1e18)",  "eth": "1"},
+}
+
+CHAIN_IDS = {
+    "Ethereum Mainnet": "1",
+    "Sepolia Testnet": "11155111",
+    "Holesky Testnet": "17000",
+    "Polygon Mainnet": "137",
+    "Polygon Amoy Testnet": "80002",
+    "Polygon zkEVM": "1101",
+    "Polygon zkEVM Testnet": "1442",
+    "BNB Smart Chain Mainnet": "56",
+    "BNB Smart Chain Testnet": "97",
+    "Arbitrum One": "42161",
+    "Arbitrum Nova": "42170",
+    "Arbitrum Sepolia": "421614",
+    "Optimism": "10",
+    "Optimism Sepolia": "11155420",
+    "Base": "8453",
+    "Base Sepolia": "84532",
+    "Avalanche C-Chain": "43114",
+    "Avalanche Fuji Testnet": "43113",
+    "Fantom Opera": "250",
+    "Fantom Testnet": "4002",
+    "Cronos Mainnet": "25",
+    "Cronos Testnet": "338",
+    "Gnosis": "100",
+    "Gnosis Chiado Testnet": "10200",
+    "Moonbeam": "1284",
+    "Moonriver": "1285",
+    "Moonbase Alpha": "1287",
+    "Celo Mainnet": "42220",
+    "Celo Alfajores Testnet": "44787",
+    "Aurora Mainnet": "1313161554",
+    "Aurora Testnet": "1313161555",
+    "Harmony Mainnet Shard 0": "1666600000",
+    "Linea": "59144",
+    "Linea Goerli": "59140",
+    "Mantle": "5000",
+    "Mantle Testnet": "5001",
+    "Scroll": "534352",
+    "Scroll Sepolia": "534351",
+    "zkSync Era": "324",
+    "zkSync Era Sepolia": "300",
+    "Blast": "81457",
+    "Blast Sepolia": "168587773",
+    "Mode": "34443",
+    "Fraxtal": "252",
+    "Metis Andromeda": "1088",
+    "Kava EVM": "2222",
+    "Hardhat Local": "31337",
+    "Ganache Local": "1337",
+    "Anvil Local": "31337"
+}
+
+
+GAS_CONSTANTS = {
+    "Transaction Costs": [
+        {
+            "name": "TX_BASE_GAS",
+            "value": "21000",
+            "description": "Base gas cost for a standard ETH transfer"
+        }
+    ],
+    "Calldata": [
+        {
+            "name": "GAS_PER_ZERO_BYTE",
+            "value": "4",
+            "description": "Gas per zero byte in calldata"
+        },
+        {
+            "name": "GAS_PER_NON_ZERO_BYTE",
+            "value": "16",
+            "description": "Gas per non-zero byte in calldata"
+        },
+        {
+            "name": "STANDARD_TOKEN_COST",
+            "value": "4",
+            "description": "Gas per calldata token (zero byte = 1 token, non-zero byte = 4), EIP-7623"
+        },
+        {
+            "name": "TOTAL_COST_FLOOR_PER_TOKEN",
+            "value": "10",
+            "description": "Minimum gas per calldata token charged by the EIP-7623 floor"
+        }
+    ],
+    "Account Access": [
+        {
+            "name": "ACCESS_LIST_ADDRESS",
+            "value": "2400",
+            "description": "Gas for an address in the access list"
+        },
+        {
+            "name": "ACCESS_LIST_STORAGE_KEY",
+            "value": "1900",
+            "description": "Gas for a storage key in the access list"
+        }
+    ],
+    "Storage": [
+        {
+            "name": "SLOAD_COLD_GAS",
+            "value": "2100",
+            "description": "Gas cost for reading a cold storage slot"
+        },
+        {
+            "name": "SLOAD_WARM_GAS",
+            "value": "100",
+            "description": "Gas cost for reading a warm storage slot"
+        },
+        {
+            "name": "SSTORE_SET_COLD_GAS",
+            "value": "22100",
+            "description": "Setting storage from zero (cold access)"
+        },
+        {
+            "name": "SSTORE_RESET_COLD_GAS",
+            "value": "5000",
+            "description": "Resetting storage to non-zero (cold access)"
+        },
+        {
+            "name": "SSTORE_CLEAR_REFUND",
+            "value": "4800",
+            "description": "Refund for clearing storage to zero"
+        }
+    ],
+    "Call Operations": [
+        {
+            "name": "CALL_COLD_ACCOUNT_ACCESS",
+            "value": "2600",
+            "description": "Extra gas for calling a cold account"
+        },
+        {
+            "name": "CALL_WARM_STORAGE_READ",
+            "value": "100",
+            "description": "Gas for calling a warm account"
+        },
+        {
+            "name": "CALL_VALUE_TRANSFER",
+            "value": "9000",
+            "description": "Extra gas for a CALL that transfers a non-zero value"
+        }
+    ],
+    "Contract Creation": [
+        {
+            "name": "NEW_CONTRACT_CREATION",
+            "value": "32000",
+            "description": "Gas for creating a new smart contract"
+        },
+        {
+            "name": "INITCODE_WORD",
+            "value": "2",
+            "description": "Gas per word in initcode"
+        }
+    ],
+    "Logging": [
+        {
+            "name": "LOG_TOPIC_GAS",
+            "value": "375",
+            "description": "Gas per topic in a LOG"
+        },
+        {
+            "name": "LOG_DATA_GAS",
+            "value": "8",
+            "description": "Gas per byte of data in a LOG"
+        }
+    ],
+    "Memory": [
+        {
+            "name": "MEMORY_EXPANSION_LINEAR",
+            "value": "3",
+            "description": "Linear gas cost for memory expansion"
+        },
+        {
+            "name": "MEMORY_EXPANSION_QUADRATIC_DIVISOR",
+            "value": "512",
+            "description": "Quadratic cost divisor for memory expansion"
+        },
+        {
+            "name": "COPY_WORD_GAS",
+            "value": "3",
+            "description": "Gas per word copied by *COPY opcodes and MCOPY"
+        }
+    ],
+    "Opcodes": [
+        {"name": "JUMPDEST_GAS", "value": "1",
+            "description": "Gas for JUMPDEST opcode"},
+        {"name": "PUSH_GAS", "value": "3", "description": "Gas for PUSH opcode"},
+        {"name": "DUP_GAS", "value": "3", "description": "Gas for DUP opcode"},
+        {"name": "SWAP_GAS", "value": "3", "description": "Gas for SWAP opcode"},
+        {"name": "ADD_GAS", "value": "3", "description": "Gas for ADD opcode"},
+        {"name": "MUL_GAS", "value": "5", "description": "Gas for MUL opcode"},
+        {"name": "SUB_GAS", "value": "3", "description": "Gas for SUB opcode"},
+        {"name": "DIV_GAS", "value": "5", "description": "Gas for DIV opcode"},
+        {"name": "SDIV_GAS", "value": "5", "description": "Gas for SDIV opcode"},
+        {"name": "EXP_GAS", "value": "10", "description": "Base gas for EXP opcode"},
+        {"name": "EXP_BYTE_GAS", "value": "50",
+            "description": "Gas per byte of exponent in EXP"},
+        {"name": "SHA3", "value": "30", "description": "Base gas cost for SHA3 opcode"},
+        {"name": "SHA3_WORD", "value": "6",
+            "description": "Gas per word hashed with SHA3"}
+    ],
+    "Block/Tx Info": [
+        {"name": "BLOCKHASH_GAS", "value": "20",
+            "description": "Gas for BLOCKHASH opcode"},
+        {"name": "BALANCE_GAS", "value": "700",
+            "description": "Gas for BALANCE opcode"},
+        {"name": "EXTCODEHASH_GAS", "value": "700",
+            "description": "Gas for EXTCODEHASH opcode"},
+        {"name": "EXTCODESIZE_GAS", "value": "700",
+            "description": "Gas for EXTCODESIZE opcode"},
+        {"name": "EXTCODECOPY_GAS", "value": "700",
+            "description": "Gas for EXTCODECOPY opcode"}
+    ],
+    "Selfdestruct": [
+        {
+            "name": "SELFDESTRUCT_GAS",
+            "value": "5000",
+            "description": "Gas for SELFDESTRUCT"
+        }
+    ],
+    "Precompiled Contracts": [
+        {"name": "ECRECOVER_GAS", "value": "3000",
+            "description": "Gas cost for ecrecover precompile"},
+        {"name": "SHA256_GAS", "value": "60",
+            "description": "Base gas for SHA256 precompile"},
+        {"name": "SHA256_WORD", "value": "12",
+            "description": "Gas per word for SHA256 precompile"},
+        {"name": "RIPEMD160_GAS", "value": "600",
+            "description": "Base gas for RIPEMD160 precompile"},
+        {"name": "RIPEMD160_WORD", "value": "120",
+            "description": "Gas per word for RIPEMD160 precompile"},
+        {"name": "IDENTITY_GAS", "value": "15",
+            "description": "Base gas for IDENTITY precompile"},
+        {"name": "IDENTITY_WORD", "value": "3",
+            "description": "Gas per word for IDENTITY precompile"}
+    ]
+}
+
+
+_gas_values = None
+
+
+def gas_constant(name: str) -> int:
+    global _gas_values
+    if _gas_values is None:
+        _gas_values = {
+            entry["name"]: int(entry["value"])
+            for entries in GAS_CONSTANTS.values() for entry in entries}
+    return _gas_values[name]
+
+
+# Reverse indexes over every constant above, built on first use: normalized
+# name or value -> entries for O(1) lookups, sorted name tokens for prefix
+# search, and the token list for fuzzy matching.
+KINDS = ("chain", "address", "opcode", "gas", "uint", "bytes", "unit")
+
+_entries = None
+_by_key = None
+_tokens = None
+_token_keys = None
+_words = None
+
+
+def _normalize(value) -> str:
+    return str(value).strip().lower()
+
+
+def _build_index():
+    global _entries, _by_key, _tokens, _token_keys, _words
+    import re
+    # Imported here: gas_estimator itself reads gas_constant at import time.
+    from src.utils.gas_estimator import OPCODE_NAMES, STATIC_GAS
+
+    entries = []
+
+    def add(kind, name, value, description=None, keys=()):
+        entry = {"kind": kind, "name": name, "value": value}
+        if description:
+            entry["description"] = description
+        entries.append((entry, (name, *keys)))
+
+    for name, chain_id in CHAIN_IDS.items():
+        add("chain", name, chain_id, keys=(chain_id,))
+    for name, details in ADDRESS.items():
+        keys = [details["address"]]
+        number = int(details["address"], 16)
+        if 0 < number < 0x100:
+            # Precompiles are also found by their number ("0x01", "1").
+            keys += [f"0x{number:02x}", hex(number), str(number)]
+        add("address", name, details["address"], details["description"], keys)
+    for code, name in enumerate(OPCODE_NAMES):
+        if name is not None:
+            add("opcode", name, STATIC_GAS[code], f"Opcode 0x{code:02x}, static gas", (f"0x{code:02x}",))
+    for category, items in GAS_CONSTANTS.items():
+        for item in items:
+            add("gas", item["name"], item["value"], f"{category}: {item['description']}")
+    for name, value in UINT_MAX.items():
+        add("uint", name, value["dec"], f"Max value, {value['hex']}", (value["hex"],))
+    for name, value in BYTES.items():
+        add("bytes", name, value["max"], f"Max value; zero value {value['zero']}")
+    for name, value in ETH_UNITS.items():
+        add("unit", name, value["wei"], f"{value['eth']} ETH")
+
+    by_key = {}
+    tokens = set()
+    for n, (entry, keys) in enumerate(entries):
+        for key in keys:
+            bucket = by_key.setdefault(_normalize(key), [])
+            if n not in bucket:
+                bucket.append(n)
+        name = _normalize(entry["name"])
+        tokens.add((name, n))
+        for word in re.split(r"[^0-9a-z]+", name):
+            if word and word != name:
+                tokens.add((word, n))
+
+    _entries = [entry for entry, _ in entries]
+    _by_key = by_key
+    _tokens = sorted(tokens)
+    _token_keys = [token for token, _ in _tokens]
+    _words = list(dict.fromkeys(_token_keys))
+
+
+def _select(ids, kind):
+    return [_entries[n] for n in ids if kind is None or _entries[n]["kind"] == kind]
+
+
+def lookup(query, kind: str = None) -> list:
+    # Exact match on a name or a reverse key: chain id -> chain, address ->
+    # label, opcode name or byte -> static gas, precompile number -> label.
+    if _entries is None:
+        _build_index()
+    return _select(_by_key.get(_normalize(query), ()), kind)
+
+
+def search(query, kind: str = None, limit: int = 10) -> list:
+    # Exact matches first, then names with a word starting with the query.
+    # Close spellings are only tried when neither finds anything.
+    import difflib
+    from bisect import bisect_left
+
+    if _entries is None:
+        _build_index()
+    query = _normalize(query)
+    ids = list(_by_key.get(query, ()))
+
+    start = bisect_left(_token_keys, query)
+    for token, n in _tokens[start:]:
+        if not token.startswith(query):
+            break
+        ids.append(n)
+
+    if not _select(ids, kind):
+        for token in difflib.get_close_matches(query, _words, n=limit, cutoff=0.6):
+            start = bisect_left(_token_keys, token)
+            while start < len(_tokens) and _tokens[start][0] == token:
+                ids.append(_tokens[start][1])
+                start += 1
+
+    return _select(dict.fromkeys(ids), kind)[:limit]
@@ -0,0 +1,162 @@
+import argparse
+import http.client
+import json
+import os
+import socket
+import sys
+
+
+# Deliberately stdlib-only: importing this module must stay cheap, since the
+# whole point is to skip web3's import cost and talk to a warm `axe serve`.
+DEFAULT_SERVER = os.getenv("AXE_SERVER", "http://127.0.0.1:8765")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DecodedFunction:
+    def __init__(self, signature: str):
+        self.signature = signature
+        self.fn_name = signature.split("(", 1)[0]
+
+    def __repr__(self):
+        return f"<Function {self.signature}>"
+
+
+class AxeClient:
+    def __init__(self, server: str = DEFAULT_SERVER, timeout: float = 60):
+        self.server = server
+        self.timeout = timeout
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if self.server.startswith("unix:"):
+                self._conn = UnixHTTPConnection(self.server[len("unix:"):], self.timeout)
+            else:
+                host = self.server.split("://", 1)[-1].rstrip("/")
+                self._conn = http.client.HTTPConnection(host, timeout=self.timeout)
+        return self._conn
+
+    def _post(self, path: str, payload: dict):
+        body = json.dumps(payload)
+        conn = self._connect()
+        try:
+            conn.request("POST", path, body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+        except (OSError, http.client.HTTPException):
+            # The kept-alive connection may have been dropped; retry once.
+            conn.close()
+            conn.request("POST", path, body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+        return response
+
+    def _call(self, path: str, payload: dict):
+        response = self._post(path, payload)
+        data = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(data.get("error", f"HTTP {response.status}"))
+        if "function" in data and "params" in data and "calls" not in data:
+            return (DecodedFunction(data["function"]), data["params"])
+        return data
+
+    def decode_using_transaction_hash(self, tx_hash: str, chain: str, offline: bool = False, recursive: bool = False):
+        return self._call("/decode/tx", {"tx": tx_hash, "chain": chain, "offline": offline, "recursive": recursive})
+
+    def decode_using_abi(self, calldata: str, abi: list, chain: str, recursive: bool = False):
+        return self._call("/decode/abi", {"calldata": calldata, "abi": abi, "chain": chain, "recursive": recursive})
+
+    def decode_using_address(self, calldata: str, address: str, chain: str, offline: bool = False, recursive: bool = False):
+        return self._call("/decode/address", {"calldata": calldata, "address": address, "chain": chain,
+                                              "offline": offline, "recursive": recursive})
+
+    def decode_using_selector(self, calldata: str):
+        return self._call("/decode/selectors", {"calldata": calldata})
+
+    def decode_batch(self, lines, chain: str, workers: int = 8, offline: bool = False):
+        response = self._post("/decode/batch", {"lines": list(lines), "chain": chain, "workers": workers, "offline": offline})
+        if response.status != 200:
+            raise RuntimeError(json.loads(response.read()).get("error", f"HTTP {response.status}"))
+        for line in response:
+            if line.strip():
+                yield json.loads(line)
+
+
+_default_client = None
+
+
+def get_client() -> AxeClient:
+    global _default_client
+    if _default_client is None:
+        _default_client = AxeClient()
+    return _default_client
+
+
+# Module-level functions mirror src.utils.calldata_decoder, so scripts can
+# switch with `import src.utils.decode_client as calldata_decoder`.
+def decode_using_transaction_hash(tx_hash: str, chain: str, offline: bool = False):
+    return get_client().decode_using_transaction_hash(tx_hash, chain, offline)
+
+
+def decode_using_abi(calldata: str, abi: list, chain: str):
+    return get_client().decode_using_abi(calldata, abi, chain)
+
+
+def decode_using_address(calldata: str, address: str, chain: str, offline: bool = False):
+    return get_client().decode_using_address(calldata, address, chain, offline)
+
+
+def decode_using_selector(calldata: str):
+    return get_client().decode_using_selector(calldata)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="axe-client", description="Decode calldata through a running `axe serve`")
+    parser.add_argument("--server", default=DEFAULT_SERVER, help="Server URL or unix:/path/to/socket")
+    parser.add_argument("--tx", help="Transaction hash")
+    parser.add_argument("--abi", help="Contract ABI file")
+    parser.add_argument("--address", help="Contract address")
+    parser.add_argument("--calldata", help="Raw calldata")
+    parser.add_argument("--selectors", action="store_true", help="Decode using the selector index only")
+    parser.add_argument("--chain", default="ethereum", help="Chain name")
+    parser.add_argument("--offline", action="store_true", help="Only use cached ABIs")
+    parser.add_argument("--recursive", action="store_true", help="Decode nested calls as a tree")
+    args = parser.parse_args(argv)
+
+    client = AxeClient(args.server)
+    try:
+        if args.tx:
+            result = client.decode_using_transaction_hash(args.tx, args.chain, args.offline, args.recursive)
+        elif args.abi:
+            with open(args.abi) as f:
+                result = client.decode_using_abi(args.calldata, json.load(f), args.chain, args.recursive)
+        elif args.address:
+            result = client.decode_using_address(args.calldata, args.address, args.chain, args.offline, args.recursive)
+        elif args.selectors:
+            result = client.decode_using_selector(args.calldata)
+        else:
+            for result in client.decode_batch(sys.stdin, args.chain, offline=args.offline):
+                print(json.dumps(result))
+            return 0
+    except (OSError, RuntimeError) as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if isinstance(result, tuple):
+        print(result[0])
+        print(json.dumps(result[1], indent=2))
+    else:
+        print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import json
+import os
+import socketserver
+import stat
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.utils import batch_decoder, calldata_decoder, nested_decoder
+from src.utils.config import CHAIN_CONFIG
+from src.utils.rpc_batcher import get_batch_client
+from src.utils.serialization import json_default
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def _decode_tx(body: dict):
+    if body.get("recursive"):
+        return nested_decoder.decode_transaction_recursive(body["tx"], body["chain"], body.get("offline", False))
+    return calldata_decoder.decode_using_transaction_hash(body["tx"], body["chain"], body.get("offline", False))
+
+
+def _decode_abi(body: dict):
+    if body.get("recursive"):
+        return nested_decoder.decode_recursive(body["calldata"], None, body["chain"], body.get("offline", False), body["abi"])
+    return calldata_decoder.decode_using_abi(body["calldata"], body["abi"], body["chain"])
+
+
+def _decode_address(body: dict):
+    if body.get("recursive"):
+        return nested_decoder.decode_recursive(body["calldata"], body["address"], body["chain"], body.get("offline", False))
+    return calldata_decoder.decode_using_address(body["calldata"], body["address"], body["chain"], body.get("offline", False))
+
+
+def _decode_selectors(body: dict):
+    return calldata_decoder.decode_using_selector(body["calldata"])
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _check_body(body, required_chain: bool = False):
+    # Everything that would make a request fail is checked before a response
+    # is started, so errors get a status code instead of a cut-off stream.
+    if not isinstance(body, dict):
+        raise BadRequest("JSON body must be an object")
+    chain = body.get("chain")
+    if chain is None:
+        if required_chain:
+            raise BadRequest("Missing field: 'chain'")
+        return
+    if not isinstance(chain, str) or chain.lower() not in CHAIN_CONFIG:
+        raise BadRequest(f"Unsupported Chain: {chain}")
+
+
+ROUTES = {
+    "/decode/tx": _decode_tx,
+    "/decode/abi": _decode_abi,
+    "/decode/address": _decode_address,
+    "/decode/selectors": _decode_selectors,
+}
+
+
+class DecodeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle and
+    # delayed ACKs add ~40ms to every keep-alive request.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, default=json_default).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        try:
+            body = self._read_body()
+        except ValueError as e:
+            self._send_json(400, {"error": f"Invalid JSON body! \n{e}"})
+            return
+
+        if self.path == "/decode/batch":
+            self._stream_batch(body)
+            return
+
+        route = ROUTES.get(self.path)
+        if route is None:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            _check_body(body)
+            result = route(body)
+        except BadRequest as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except KeyError as e:
+            self._send_json(400, {"error": f"Missing field: {e}"})
+            return
+        except (RuntimeError, ValueError) as e:
+            self._send_json(422, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"Internal error! \n{type(e).__name__}: {e}"})
+            return
+
+        if isinstance(result, tuple):
+            func_obj, params = result
+            result = {"function": func_obj.signature, "params": params}
+        self._send_json(200, result)
+
+    def _stream_batch(self, body: dict):
+        # Results are streamed as JSON lines in chunked encoding, in input
+        # order, as soon as each one is decoded.
+        try:
+            _check_body(body, required_chain=True)
+            if not isinstance(body.get("lines"), list):
+                raise BadRequest("Missing field: 'lines' (a list of input lines)")
+            # Creating the chain's RPC client fails for chains without an RPC
+            # URL; do it now rather than on the first streamed line.
+            get_batch_client(body["chain"])
+            results = batch_decoder.decode_batch(body["lines"], body["chain"], body.get("workers", 8), body.get("offline", False))
+        except BadRequest as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except (RuntimeError, ValueError) as e:
+            self._send_json(422, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"Internal error! \n{type(e).__name__}: {e}"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for result in results:
+                self._write_chunk(result)
+        except OSError:
+            # The client hung up; there is no one left to tell.
+            return
+        except Exception as e:
+            # The status line is already sent, so the failure becomes the
+            # last record of the stream.
+            self._write_chunk({"error": f"Batch aborted! \n{type(e).__name__}: {e}"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, record):
+        line = (json.dumps(record, default=json_default) + "\n").encode()
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+
+
+class UnixDecodeServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        # A socket left behind by a previous run is replaced; anything else at
+        # the path is not ours to delete.
+        try:
+            mode = os.lstat(self.server_address).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise OSError(f"Cannot listen on {self.server_address}: path exists and is not a socket")
+            os.unlink(self.server_address)
+        super().server_bind()
+
+
+class UnixDecodeRequestHandler(DecodeRequestHandler):
+    disable_nagle_algorithm = False
+
+    # Unix socket peers have no (host, port) address.
+    def address_string(self):
+        return "unix"
+
+
+def make_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, socket_path: str = None):
+    if socket_path:
+        return UnixDecodeServer(socket_path, UnixDecodeRequestHandler)
+    return ThreadingHTTPServer((host, port), DecodeRequestHandler)
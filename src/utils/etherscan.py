@@ -0,0 +1,141 @@
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import Future
+from src.utils.config import (
+    ETHERSCAN_API_KEYS, ETHERSCAN_API_URL, ETHERSCAN_RATE_LIMIT, ETHERSCAN_RETRIES, HTTP_BACKOFF, HTTP_TIMEOUT)
+from src.utils.profiling import span
+from src.utils.providers import get_session
+
+
+class EtherscanError(RuntimeError):
+    pass
+
+
+class NotVerified(EtherscanError):
+    pass
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucket:
+    # Allows `rate` acquisitions per second, with bursts of up to `capacity`.
+    # Etherscan counts calls over sliding one-second windows, so a burst on
+    # top of the steady rate trips the limit; the default allows none.
+    # Callers block (outside the lock) until a token is free.
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_rate_limited(response_data: dict) -> bool:
+    # Etherscan answers HTTP 200 with status "0" and a message such as
+    # "Max calls per sec rate limit reached (5/sec)".
+    return response_data.get("status") == "0" and "rate limit" in str(response_data.get("result", "")).lower()
+
+
+class EtherscanClient:
+    # Every API key gets its own token bucket, and keys are handed out
+    # round-robin, so N keys give N times the per-key rate. Concurrent ABI
+    # lookups for the same contract share a single request.
+    def __init__(self, url: str = ETHERSCAN_API_URL, keys: list = ETHERSCAN_API_KEYS,
+                 rate: float = ETHERSCAN_RATE_LIMIT, retries: int = ETHERSCAN_RETRIES, backoff: float = HTTP_BACKOFF):
+        self.url = url
+        self.keys = [(key, TokenBucket(rate)) for key in (keys or [None])]
+        self.retries = retries
+        self.backoff = backoff
+        self._cycle = itertools.cycle(self.keys)
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def _next_key(self):
+        with self._lock:
+            return next(self._cycle)
+
+    def request(self, chain_id: int, params: dict) -> dict:
+        for attempt in range(self.retries + 1):
+            key, bucket = self._next_key()
+            with span("etherscan.throttle"):
+                bucket.acquire()
+            try:
+                with span(f"etherscan.{params.get('action')}", chain_id=chain_id, attempt=attempt):
+                    response = get_session().get(
+                        self.url, params={"chainid": chain_id, **params, "apikey": key}, timeout=HTTP_TIMEOUT)
+                    if response.status_code == 429:
+                        raise RateLimited(f"HTTP 429: {response.text[:200]}")
+                    response_data = response.json()
+                if is_rate_limited(response_data):
+                    raise RateLimited(response_data["result"])
+                return response_data
+            except RateLimited as e:
+                if attempt == self.retries:
+                    raise EtherscanError(f"Etherscan rate limit reached after {attempt + 1} attempts! \n{e}")
+                time.sleep(self.backoff * 2 ** attempt)
+            except Exception as e:
+                raise EtherscanError(f"Error calling Etherscan! \n{e}")
+
+    def _fetch_abi(self, chain_id: int, address: str) -> list:
+        response_data = self.request(chain_id, {"module": "contract", "action": "getabi", "address": address})
+
+        if response_data['status'] != '1' or not response_data['result']:
+            if "not verified" in str(response_data['result']).lower():
+                raise NotVerified(f"ABI Messsage: {response_data['message']} \nABI Result: {response_data['result']}")
+            raise EtherscanError(f"ABI Messsage: {response_data['message']} \nABI Result: {response_data['result']}")
+
+        if isinstance(response_data['result'], str):
+            with span("abi.json_loads"):
+                return json.loads(response_data['result'])
+        return response_data['result']
+
+    def get_abi(self, chain_id: int, address: str) -> list:
+        key = (chain_id, address.lower())
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if owner:
+            try:
+                future.set_result(self._fetch_abi(chain_id, address))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                # Only in-flight lookups are shared; once answered, callers
+                # go through the ABI cache again.
+                with self._lock:
+                    del self._inflight[key]
+        return future.result()
+
+
+_lock = threading.Lock()
+_client = None
+
+
+def get_etherscan_client() -> EtherscanClient:
+    global _client
+    with _lock:
+        if _client is None:
+            _client = EtherscanClient()
+        return _client
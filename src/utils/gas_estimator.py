@@ -0,0 +1,460 @@
+import itertools
+import json
+import re
+from src.utils import json_stream
+from src.utils.constants import gas_constant
+
+
+MEMORY_LINEAR = gas_constant("MEMORY_EXPANSION_LINEAR")
+MEMORY_DIVISOR = gas_constant("MEMORY_EXPANSION_QUADRATIC_DIVISOR")
+COPY_WORD = gas_constant("COPY_WORD_GAS")
+KECCAK_WORD = gas_constant("SHA3_WORD")
+LOG_TOPIC = gas_constant("LOG_TOPIC_GAS")
+LOG_DATA = gas_constant("LOG_DATA_GAS")
+EXP_BYTE = gas_constant("EXP_BYTE_GAS")
+COLD_SLOAD = gas_constant("SLOAD_COLD_GAS")
+WARM_ACCESS = gas_constant("SLOAD_WARM_GAS")
+COLD_ACCOUNT = gas_constant("CALL_COLD_ACCOUNT_ACCESS")
+CALL_VALUE = gas_constant("CALL_VALUE_TRANSFER")
+SSTORE_SET = gas_constant("SSTORE_SET_COLD_GAS") - COLD_SLOAD
+SSTORE_RESET = gas_constant("SSTORE_RESET_COLD_GAS") - COLD_SLOAD
+INITCODE_WORD = gas_constant("INITCODE_WORD")
+
+# Precompile pricing as (base, per word of input).
+PRECOMPILE_GAS = {
+    1: (gas_constant("ECRECOVER_GAS"), 0),
+    2: (gas_constant("SHA256_GAS"), gas_constant("SHA256_WORD")),
+    3: (gas_constant("RIPEMD160_GAS"), gas_constant("RIPEMD160_WORD")),
+    4: (gas_constant("IDENTITY_GAS"), gas_constant("IDENTITY_WORD")),
+}
+# Precompile addresses are warm from the start of every transaction (Prague).
+PRECOMPILES = range(0x01, 0x12)
+
+CATEGORIES = ("static", "memory", "keccak", "copy", "log", "exp", "cold_access", "warm_access",
+              "storage", "call_value", "create", "precompile")
+
+# Static gas by opcode (Cancun/Prague). Opcodes priced at 0 here are the ones
+# whose whole cost is dynamic (account and storage access).
+OPCODE_NAMES = [None] * 256
+STATIC_GAS = [0] * 256
+
+
+def _define(code: int, name: str, gas: int):
+    OPCODE_NAMES[code] = name
+    STATIC_GAS[code] = gas
+
+
+for _code, _name, _gas in (
+        (0x00, "STOP", 0), (0x01, "ADD", 3), (0x02, "MUL", 5), (0x03, "SUB", 3), (0x04, "DIV", 5),
+        (0x05, "SDIV", 5), (0x06, "MOD", 5), (0x07, "SMOD", 5), (0x08, "ADDMOD", 8), (0x09, "MULMOD", 8),
+        (0x0a, "EXP", gas_constant("EXP_GAS")), (0x0b, "SIGNEXTEND", 5),
+        (0x10, "LT", 3), (0x11, "GT", 3), (0x12, "SLT", 3), (0x13, "SGT", 3), (0x14, "EQ", 3),
+        (0x15, "ISZERO", 3), (0x16, "AND", 3), (0x17, "OR", 3), (0x18, "XOR", 3), (0x19, "NOT", 3),
+        (0x1a, "BYTE", 3), (0x1b, "SHL", 3), (0x1c, "SHR", 3), (0x1d, "SAR", 3),
+        (0x20, "KECCAK256", gas_constant("SHA3")),
+        (0x30, "ADDRESS", 2), (0x31, "BALANCE", 0), (0x32, "ORIGIN", 2), (0x33, "CALLER", 2),
+        (0x34, "CALLVALUE", 2), (0x35, "CALLDATALOAD", 3), (0x36, "CALLDATASIZE", 2), (0x37, "CALLDATACOPY", 3),
+        (0x38, "CODESIZE", 2), (0x39, "CODECOPY", 3), (0x3a, "GASPRICE", 2), (0x3b, "EXTCODESIZE", 0),
+        (0x3c, "EXTCODECOPY", 0), (0x3d, "RETURNDATASIZE", 2), (0x3e, "RETURNDATACOPY", 3), (0x3f, "EXTCODEHASH", 0),
+        (0x40, "BLOCKHASH", gas_constant("BLOCKHASH_GAS")), (0x41, "COINBASE", 2), (0x42, "TIMESTAMP", 2),
+        (0x43, "NUMBER", 2), (0x44, "PREVRANDAO", 2), (0x45, "GASLIMIT", 2), (0x46, "CHAINID", 2),
+        (0x47, "SELFBALANCE", 5), (0x48, "BASEFEE", 2), (0x49, "BLOBHASH", 3), (0x4a, "BLOBBASEFEE", 2),
+        (0x50, "POP", 2), (0x51, "MLOAD", 3), (0x52, "MSTORE", 3), (0x53, "MSTORE8", 3), (0x54, "SLOAD", 0),
+        (0x55, "SSTORE", 0), (0x56, "JUMP", 8), (0x57, "JUMPI", 10), (0x58, "PC", 2), (0x59, "MSIZE", 2),
+        (0x5a, "GAS", 2), (0x5b, "JUMPDEST", gas_constant("JUMPDEST_GAS")), (0x5c, "TLOAD", WARM_ACCESS),
+        (0x5d, "TSTORE", WARM_ACCESS), (0x5e, "MCOPY", 3), (0x5f, "PUSH0", 2),
+        (0xf0, "CREATE", gas_constant("NEW_CONTRACT_CREATION")), (0xf1, "CALL", 0), (0xf2, "CALLCODE", 0),
+        (0xf3, "RETURN", 0), (0xf4, "DELEGATECALL", 0), (0xf5, "CREATE2", gas_constant("NEW_CONTRACT_CREATION")),
+        (0xfa, "STATICCALL", 0), (0xfd, "REVERT", 0), (0xfe, "INVALID", 0),
+        (0xff, "SELFDESTRUCT", gas_constant("SELFDESTRUCT_GAS"))):
+    _define(_code, _name, _gas)
+
+for _n in range(32):
+    _define(0x60 + _n, f"PUSH{_n + 1}", gas_constant("PUSH_GAS"))
+for _n in range(16):
+    _define(0x80 + _n, f"DUP{_n + 1}", gas_constant("DUP_GAS"))
+    _define(0x90 + _n, f"SWAP{_n + 1}", gas_constant("SWAP_GAS"))
+for _n in range(5):
+    _define(0xa0 + _n, f"LOG{_n}", LOG_TOPIC * (_n + 1))
+
+OPCODES = {name: code for code, name in enumerate(OPCODE_NAMES) if name}
+OPCODES.update({"SHA3": 0x20, "DIFFICULTY": 0x44, "SUICIDE": 0xff})
+
+# Opcodes with a dynamic cost component, and the GasEstimator method that
+# computes it from the stack.
+DYNAMIC_HANDLERS = {
+    "MLOAD": "_word_memory", "MSTORE": "_word_memory", "MSTORE8": "_byte_memory",
+    "RETURN": "_return", "REVERT": "_return", "KECCAK256": "_keccak",
+    "CALLDATACOPY": "_copy", "CODECOPY": "_copy", "RETURNDATACOPY": "_copy",
+    "EXTCODECOPY": "_extcodecopy", "MCOPY": "_mcopy",
+    "LOG0": "_log", "LOG1": "_log", "LOG2": "_log", "LOG3": "_log", "LOG4": "_log",
+    "EXP": "_exp", "BALANCE": "_account", "EXTCODESIZE": "_account", "EXTCODEHASH": "_account",
+    "SLOAD": "_sload", "SSTORE": "_sstore", "CALL": "_call", "CALLCODE": "_call",
+    "DELEGATECALL": "_call_without_value", "STATICCALL": "_call_without_value",
+    "CREATE": "_create", "CREATE2": "_create", "SELFDESTRUCT": "_selfdestruct",
+}
+DYNAMIC_OPCODES = {OPCODES[name] for name in DYNAMIC_HANDLERS}
+
+# Opcodes whose reported gasCost includes gas forwarded to a child frame,
+# so a trace's figure is not comparable with ours.
+FORWARDING = {0xf0, 0xf1, 0xf2, 0xf4, 0xf5, 0xfa}
+
+
+def memory_cost(words: int) -> int:
+    return MEMORY_LINEAR * words + words * words // MEMORY_DIVISOR
+
+
+def _words(size: int) -> int:
+    return (size + 31) // 32
+
+
+class GasEstimator:
+    # Replays a trace one step at a time, keeping only what gas depends on:
+    # memory size per call frame, warm accounts and slots, and the storage
+    # values seen so far. Work per step is constant and state grows with the
+    # accounts and slots touched, not with the length of the trace.
+    #
+    # Without chain state some costs are approximations: SSTORE assumes a
+    # slot it has not seen is non-zero, new-account surcharges are not
+    # charged, and warm sets are not rolled back when a frame reverts.
+    def __init__(self, to: str = None, origin: str = None):
+        self.warm_addresses = set(PRECOMPILES)
+        for address in (to, origin):
+            if address:
+                self.warm_addresses.add(int(address, 16))
+        self.warm_slots = set()
+        self.storage = {}
+        self.dirty = set()
+        self.memory_words = [0]
+        self.contexts = [int(to, 16) if to else "root"]
+        self.next_context = None
+        self.pending_sload = None
+        self.creates = 0
+
+        self.totals = dict.fromkeys(CATEGORIES, 0)
+        self.counts = [0] * 256
+        self.gas = [0] * 256
+        self.steps = 0
+        self.steps_without_stack = 0
+        self.peak_memory_words = 0
+        self.trace_gas = 0
+        self.mismatched_steps = 0
+
+        self.handlers = [None] * 256
+        for name, method in DYNAMIC_HANDLERS.items():
+            self.handlers[OPCODES[name]] = getattr(self, method)
+
+
+    def _expand(self, offset: int, size: int) -> int:
+        if size == 0:
+            return 0
+        words = _words(offset + size)
+        current = self.memory_words[-1]
+        if words <= current:
+            return 0
+        self.memory_words[-1] = words
+        if words > self.peak_memory_words:
+            self.peak_memory_words = words
+        cost = memory_cost(words) - memory_cost(current)
+        self.totals["memory"] += cost
+        return cost
+
+    def _access_address(self, address: int) -> int:
+        address &= (1 << 160) - 1
+        if address in self.warm_addresses:
+            self.totals["warm_access"] += WARM_ACCESS
+            return WARM_ACCESS
+        self.warm_addresses.add(address)
+        self.totals["cold_access"] += COLD_ACCOUNT
+        return COLD_ACCOUNT
+
+    def _enter_depth(self, depth: int):
+        while depth > len(self.memory_words):
+            self.memory_words.append(0)
+            self.contexts.append(self.next_context if self.next_context is not None else self.contexts[-1])
+        while depth < len(self.memory_words) and len(self.memory_words) > 1:
+            self.memory_words.pop()
+            self.contexts.pop()
+        self.next_context = None
+
+
+    # Dynamic cost handlers; `a` is the stack with the top item last.
+    def _word_memory(self, code, a):
+        return self._expand(int(a[-1], 16), 32)
+
+    def _byte_memory(self, code, a):
+        return self._expand(int(a[-1], 16), 1)
+
+    def _return(self, code, a):
+        return self._expand(int(a[-1], 16), int(a[-2], 16))
+
+    def _keccak(self, code, a):
+        size = int(a[-2], 16)
+        cost = KECCAK_WORD * _words(size)
+        self.totals["keccak"] += cost
+        return cost + self._expand(int(a[-1], 16), size)
+
+    def _copy(self, code, a):
+        size = int(a[-3], 16)
+        cost = COPY_WORD * _words(size)
+        self.totals["copy"] += cost
+        return cost + self._expand(int(a[-1], 16), size)
+
+    def _extcodecopy(self, code, a):
+        size = int(a[-4], 16)
+        cost = COPY_WORD * _words(size)
+        self.totals["copy"] += cost
+        return cost + self._access_address(int(a[-1], 16)) + self._expand(int(a[-2], 16), size)
+
+    def _mcopy(self, code, a):
+        size = int(a[-3], 16)
+        cost = COPY_WORD * _words(size)
+        self.totals["copy"] += cost
+        return cost + self._expand(max(int(a[-1], 16), int(a[-2], 16)), size)
+
+    def _log(self, code, a):
+        size = int(a[-2], 16)
+        cost = LOG_DATA * size
+        self.totals["log"] += cost
+        return cost + self._expand(int(a[-1], 16), size)
+
+    def _exp(self, code, a):
+        cost = EXP_BYTE * ((int(a[-2], 16).bit_length() + 7) // 8)
+        self.totals["exp"] += cost
+        return cost
+
+    def _account(self, code, a):
+        return self._access_address(int(a[-1], 16))
+
+    def _slot_access(self, key) -> int:
+        if key in self.warm_slots:
+            self.totals["warm_access"] += WARM_ACCESS
+            return WARM_ACCESS
+        self.warm_slots.add(key)
+        self.totals["cold_access"] += COLD_SLOAD
+        return COLD_SLOAD
+
+    def _sload(self, code, a):
+        key = (self.contexts[-1], int(a[-1], 16))
+        # The loaded value is on top of the next step's stack.
+        self.pending_sload = (key, len(self.memory_words))
+        return self._slot_access(key)
+
+    def _sstore(self, code, a):
+        key = (self.contexts[-1], int(a[-1], 16))
+        new = int(a[-2], 16)
+        cold = 0
+        if key not in self.warm_slots:
+            self.warm_slots.add(key)
+            self.totals["cold_access"] += COLD_SLOAD
+            cold = COLD_SLOAD
+
+        current = self.storage.get(key)
+        if key in self.dirty or current == new:
+            cost = WARM_ACCESS
+        elif current == 0:
+            cost = SSTORE_SET
+        else:
+            cost = SSTORE_RESET
+        if current != new:
+            self.dirty.add(key)
+        self.storage[key] = new
+        self.totals["storage"] += cost
+        return cold + cost
+
+    def _precompile(self, address: int, args_size: int) -> int:
+        pricing = PRECOMPILE_GAS.get(address)
+        if pricing is None:
+            return 0
+        cost = pricing[0] + pricing[1] * _words(args_size)
+        self.totals["precompile"] += cost
+        return cost
+
+    def _call(self, code, a):
+        address = int(a[-2], 16) & ((1 << 160) - 1)
+        cost = self._access_address(address)
+        if int(a[-3], 16):
+            self.totals["call_value"] += CALL_VALUE
+            cost += CALL_VALUE
+        args_size = int(a[-5], 16)
+        cost += self._expand(int(a[-4], 16), args_size) + self._expand(int(a[-6], 16), int(a[-7], 16))
+        # CALLCODE runs the callee's code against the caller's storage.
+        self.next_context = address if code == 0xf1 else self.contexts[-1]
+        return cost + self._precompile(address, args_size)
+
+    def _call_without_value(self, code, a):
+        address = int(a[-2], 16) & ((1 << 160) - 1)
+        args_size = int(a[-4], 16)
+        cost = self._access_address(address)
+        cost += self._expand(int(a[-3], 16), args_size) + self._expand(int(a[-5], 16), int(a[-6], 16))
+        self.next_context = address if code == 0xfa else self.contexts[-1]
+        return cost + self._precompile(address, args_size)
+
+    def _create(self, code, a):
+        size = int(a[-3], 16)
+        words = _words(size)
+        cost = INITCODE_WORD * words
+        self.totals["create"] += cost
+        if code == 0xf5:
+            self.totals["keccak"] += KECCAK_WORD * words
+            cost += KECCAK_WORD * words
+        # The new address depends on state we do not have, so give the
+        # frame a storage context of its own.
+        self.creates += 1
+        self.next_context = f"create-{self.creates}"
+        return cost + self._expand(int(a[-2], 16), size)
+
+    def _selfdestruct(self, code, a):
+        address = int(a[-1], 16) & ((1 << 160) - 1)
+        if address in self.warm_addresses:
+            return 0
+        self.warm_addresses.add(address)
+        self.totals["cold_access"] += COLD_ACCOUNT
+        return COLD_ACCOUNT
+
+
+    def step(self, code: int, stack: list = None, depth: int = 1, trace_gas=None) -> int:
+        if depth != len(self.memory_words):
+            self._enter_depth(depth)
+
+        if self.pending_sload is not None:
+            key, sload_depth = self.pending_sload
+            if stack and sload_depth == depth:
+                self.storage.setdefault(key, int(stack[-1], 16))
+            self.pending_sload = None
+
+        gas = STATIC_GAS[code]
+        self.totals["static"] += gas
+        handler = self.handlers[code]
+        if handler is not None:
+            if stack is None:
+                self.steps_without_stack += 1
+            else:
+                gas += handler(code, stack)
+
+        self.steps += 1
+        self.counts[code] += 1
+        self.gas[code] += gas
+        if trace_gas is not None:
+            if trace_gas.__class__ is str:
+                trace_gas = int(trace_gas, 16) if trace_gas.startswith("0x") else int(trace_gas)
+            self.trace_gas += trace_gas
+            if trace_gas != gas and code not in FORWARDING:
+                self.mismatched_steps += 1
+        return gas
+
+    def summary(self, top: int = 20) -> dict:
+        opcodes = sorted(
+            ({"op": OPCODE_NAMES[code] or hex(code), "count": self.counts[code], "gas": self.gas[code]}
+             for code in range(256) if self.counts[code]),
+            key=lambda entry: -entry["gas"])
+        result = {
+            "steps": self.steps,
+            "estimated_gas": sum(self.totals.values()),
+            "breakdown": self.totals,
+            "peak_memory_bytes": self.peak_memory_words * 32,
+            "opcodes": opcodes[:top],
+        }
+        if self.trace_gas:
+            result["trace_gas"] = self.trace_gas
+            result["mismatched_steps"] = self.mismatched_steps
+        if self.steps_without_stack:
+            result["steps_without_stack"] = self.steps_without_stack
+        return result
+
+
+def iter_trace_steps(lines):
+    # Streams EIP-3155 style JSON lines (one step per line, as written by
+    # `evm --json` and most tracers). A geth debug_traceTransaction document
+    # with "structLogs" is also accepted and parsed incrementally, one step
+    # at a time.
+    if hasattr(lines, "readline"):
+        # Only the first line is read whole, and only up to a chunk: a
+        # longer one is a single-line document.
+        first = lines.readline(json_stream.CHUNK_SIZE)
+        while first and not first.strip():
+            first = lines.readline(json_stream.CHUNK_SIZE)
+        rest = json_stream.iter_chunks(lines)
+    else:
+        lines = iter(lines)
+        first = next((line for line in lines if line.strip()), "")
+        rest = lines
+    if not first:
+        return
+
+    try:
+        step = json.loads(first)
+    except ValueError:
+        step = None
+    if isinstance(step, dict) and "op" in step:
+        yield step
+        for line in lines:
+            if line.strip():
+                step = json.loads(line)
+                if "op" in step:
+                    yield step
+        return
+
+    yield from json_stream.items(itertools.chain([first], rest), "structLogs.item", "result.structLogs.item")
+
+
+def estimate_trace(steps, estimator: GasEstimator, on_step=None, top: int = 20):
+    step_gas = estimator.step
+    for n, step in enumerate(steps, 1):
+        op = step["op"]
+        code = OPCODES.get(op) if op.__class__ is str else op
+        if code is None:
+            raise RuntimeError(f"Unknown opcode {op} at step {n}")
+        try:
+            gas = step_gas(code, step.get("stack"), step.get("depth", 1), step.get("gasCost"))
+        except (IndexError, ValueError) as e:
+            raise RuntimeError(f"Error estimating step {n} ({OPCODE_NAMES[code]})! \n{e}")
+        if on_step is not None:
+            on_step(step, gas)
+    return estimator.summary(top)
+
+
+# Accepts "PUSH1 0x80", "0x0000: PUSH1 0x80", "[12] JUMPDEST", "12 SSTORE".
+_DISASSEMBLY_LINE = re.compile(r"^\s*(?:\[?(0x[0-9a-fA-F]+|\d+)\]?:?\s+)?([A-Z][A-Z0-9]*)(?:\s+(0x[0-9a-fA-F]*))?")
+
+BLOCK_ENDS = {"STOP", "JUMP", "JUMPI", "RETURN", "REVERT", "INVALID", "SELFDESTRUCT"}
+
+
+def parse_disassembly(lines):
+    for n, line in enumerate(lines, 1):
+        if not line.strip() or line.lstrip().startswith(("#", "//")):
+            continue
+        match = _DISASSEMBLY_LINE.match(line)
+        if match is None or match.group(2) not in OPCODES:
+            raise RuntimeError(f"Could not parse disassembly on line {n}: {line.strip()}")
+        pc, name, _ = match.groups()
+        yield (int(pc, 0) if pc else None), OPCODES[name]
+
+
+def estimate_disassembly(instructions) -> dict:
+    # Without execution only static gas is known; opcodes with a dynamic
+    # component are listed per basic block so they can be inspected.
+    blocks = []
+    block = None
+    counts = [0] * 256
+    total = 0
+    for pc, code in instructions:
+        name = OPCODE_NAMES[code]
+        if block is None or name == "JUMPDEST":
+            block = {"pc": pc, "static_gas": 0, "instructions": 0, "dynamic": []}
+            blocks.append(block)
+        block["static_gas"] += STATIC_GAS[code]
+        block["instructions"] += 1
+        if code in DYNAMIC_OPCODES:
+            block["dynamic"].append(name)
+        counts[code] += 1
+        total += STATIC_GAS[code]
+        if name in BLOCK_ENDS:
+            block = None
+
+    opcodes = sorted(
+        ({"op": OPCODE_NAMES[code], "count": counts[code], "static_gas": counts[code] * STATIC_GAS[code]}
+         for code in range(256) if counts[code]),
+        key=lambda entry: -entry["static_gas"])
+    return {"instructions": sum(counts), "static_gas": total, "blocks": blocks, "opcodes": opcodes}
+
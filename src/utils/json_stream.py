@@ -0,0 +1,173 @@
+import json
+import re
+
+
+CHUNK_SIZE = 1 << 16
+
+# One token per match: punctuation, a complete string, a number or a literal.
+# A string or literal cut off by the end of the buffer does not match, and a
+# number followed only by number characters up to the end may continue in the
+# next chunk; both mean "read more".
+_TOKEN = re.compile(
+    r'[ \t\n\r]*(?:([{}\[\]:,])|"((?:[^"\\]|\\.)*)"|(-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)|(true|false|null))')
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*\Z")
+_WHITESPACE = " \t\n\r"
+_LITERALS = {"true": True, "false": False, "null": None}
+# What the parser accepts next: a value, an object key, the ':' after a key,
+# or the ',' (or closing bracket) after a value inside a container.
+_VALUE, _KEY, _COLON, _COMMA = range(4)
+
+
+def iter_chunks(file, size: int = CHUNK_SIZE):
+    while True:
+        chunk = file.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _join(prefix: str, key: str) -> str:
+    return f"{prefix}.{key}" if prefix else key
+
+
+def _unexpected(buffer: str, start: int) -> ValueError:
+    return ValueError(f"Unexpected token in JSON input near: {buffer[start:start + 40]!r}")
+
+
+def parse(chunks):
+    # Yields (prefix, event, value) like ijson: prefix is the dotted path of
+    # the value ("result.calls.item"), event one of start_map, map_key,
+    # end_map, start_array, end_array, string, number, boolean or null.
+    # Only the unparsed tail of the input is held in memory.
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    eof = False
+    # [is_map, prefix] per open container.
+    stack = []
+    prefix = ""
+    expect = _VALUE
+    # Right after '{' or '[', where the container may close empty.
+    opened = False
+    done = False
+    token = _TOKEN.match
+    number_tail = _NUMBER_TAIL.match
+
+    while True:
+        match = token(buffer, pos)
+        if match is None or (match.group(3) is not None and not eof and number_tail(buffer, match.end())):
+            if eof:
+                if buffer[pos:].strip(_WHITESPACE):
+                    raise ValueError(f"Invalid JSON near: {buffer[pos:pos + 40]!r}")
+                if stack or not done:
+                    raise ValueError("Unexpected end of JSON input")
+                return
+            # Read at least as much as is already pending, so a value
+            # spanning many chunks is rescanned a logarithmic number of times.
+            rest = buffer[pos:]
+            parts = [rest]
+            pending = 0
+            while pending <= len(rest):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    eof = True
+                    break
+                parts.append(chunk)
+                pending += len(chunk)
+            buffer = "".join(parts)
+            pos = 0
+            continue
+
+        punctuation, string, number, literal = match.groups()
+        pos = match.end()
+        if done:
+            raise ValueError(f"Unexpected data after the JSON document near: {buffer[match.start():match.start() + 40]!r}")
+        empty = opened
+        opened = False
+
+        if punctuation is not None:
+            if punctuation == "{" or punctuation == "[":
+                if expect != _VALUE:
+                    raise _unexpected(buffer, match.start())
+                opened = True
+                if punctuation == "{":
+                    yield prefix, "start_map", None
+                    stack.append([True, prefix])
+                    expect = _KEY
+                else:
+                    yield prefix, "start_array", None
+                    stack.append([False, prefix])
+                    prefix = _join(prefix, "item")
+            elif punctuation == "}" or punctuation == "]":
+                if not stack or stack[-1][0] != (punctuation == "}") or not (expect == _COMMA or empty):
+                    raise _unexpected(buffer, match.start())
+                _, prefix = stack.pop()
+                yield prefix, "end_map" if punctuation == "}" else "end_array", None
+                if stack:
+                    expect = _COMMA
+                    if not stack[-1][0]:
+                        prefix = _join(stack[-1][1], "item")
+                else:
+                    done = True
+            elif punctuation == "," and expect == _COMMA:
+                expect = _KEY if stack[-1][0] else _VALUE
+            elif punctuation == ":" and expect == _COLON:
+                expect = _VALUE
+            else:
+                raise _unexpected(buffer, match.start())
+            continue
+
+        if string is not None and "\\" in string:
+            string = json.loads(f'"{string}"')
+        if string is not None and expect == _KEY:
+            yield stack[-1][1], "map_key", string
+            prefix = _join(stack[-1][1], string)
+            expect = _COLON
+            continue
+        if expect != _VALUE:
+            raise _unexpected(buffer, match.start())
+
+        if string is not None:
+            yield prefix, "string", string
+        elif number is not None:
+            if "." in number or "e" in number or "E" in number:
+                yield prefix, "number", float(number)
+            else:
+                yield prefix, "number", int(number)
+        else:
+            value = _LITERALS[literal]
+            yield prefix, "null" if value is None else "boolean", value
+        if stack:
+            expect = _COMMA
+        else:
+            done = True
+
+
+def build(event: str, value, events):
+    # Assembles the value that starts with (event, value) from the rest of
+    # `events`.
+    if event == "start_map":
+        result = {}
+        for _, event, key in events:
+            if event == "end_map":
+                return result
+            _, event, value = next(events)
+            result[key] = build(event, value, events)
+    if event == "start_array":
+        result = []
+        for _, event, value in events:
+            if event == "end_array":
+                return result
+            result.append(build(event, value, events))
+    return value
+
+
+def items(chunks, *prefixes):
+    # Every value found at one of `prefixes`, assembled one at a time:
+    # items(chunks, "result.item") streams the elements of a JSON-RPC array
+    # result without holding the array.
+    wanted = set(prefixes)
+    events = parse(chunks)
+    for prefix, event, value in events:
+        if prefix in wanted and event not in ("map_key", "end_map", "end_array"):
+            yield build(event, value, events)
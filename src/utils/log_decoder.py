@@ -0,0 +1,185 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import calldata_decoder
+from src.utils.batch_decoder import ABIResolver, TX_HASH_PATTERN
+from src.utils.compiled_abi import checksum_address, get_compiled_abi
+from src.utils.config import RPC_BATCH_SIZE
+from src.utils.profiling import span
+from src.utils.rpc_batcher import get_batch_client
+
+
+DEFAULT_WINDOW = 2000
+MAX_WINDOW = 100_000
+# eth_getLogs windows double while a response holds fewer than half this many
+# logs and halve above it. Ranges the provider refuses (result caps, range
+# limits, timeouts) are split in half and retried.
+TARGET_LOGS = 5000
+
+
+class EventIndex:
+    # topic0 -> event, per number of indexed arguments: ERC-20 and ERC-721
+    # Transfer share a signature and only differ in how many topics they log.
+    # Events from the emitting contract's own ABI take precedence over events
+    # collected from every other ABI.
+    def __init__(self):
+        self.events = {}
+        self.by_address = {}
+
+    def add_abi(self, abi: list, address: str = None):
+        own = self.by_address.setdefault(address.lower(), {}) if address else None
+        for event in get_compiled_abi(abi).events:
+            key = (event.topic0, len(event.indexed))
+            self.events.setdefault(key, event)
+            if own is not None:
+                own.setdefault(key, event)
+
+    def topics(self) -> list:
+        return sorted({"0x" + topic0.hex() for topic0, _ in self.events})
+
+    def lookup(self, topic0: bytes, indexed: int, address: str = None):
+        if address:
+            own = self.by_address.get(address.lower())
+            if own:
+                event = own.get((topic0, indexed))
+                if event is not None:
+                    return event
+        return self.events.get((topic0, indexed))
+
+    def __len__(self):
+        return len(self.events)
+
+
+def decode_log(log: dict, index: EventIndex) -> dict:
+    topics = log["topics"]
+    row = {
+        "block": int(log["blockNumber"], 16),
+        "tx": log["transactionHash"],
+        "log_index": int(log["logIndex"], 16),
+        "address": checksum_address(log["address"]),
+    }
+    if not topics:
+        row["event"] = None
+        row["error"] = "Log has no topics (anonymous event)"
+        return row
+
+    topic_bytes = [bytes.fromhex(topic[2:]) for topic in topics]
+    event = index.lookup(topic_bytes[0], len(topics) - 1, log["address"])
+    if event is None:
+        row["event"] = None
+        row["topic0"] = topics[0]
+        row["error"] = "No event in the loaded ABIs matches topic0"
+        return row
+
+    row["event"] = event.signature
+    try:
+        row["args"] = event.decode(topic_bytes, bytes.fromhex(log["data"][2:]))
+    except Exception as e:
+        row["error"] = f"Error decoding log! {e}"
+    return row
+
+
+def iter_receipts(chain: str, tx_hashes):
+    # Receipt requests are queued a window at a time so the RPC batcher can
+    # coalesce them, and yielded in input order.
+    client = get_batch_client(chain)
+    pending = deque()
+
+    def take():
+        tx_hash, future = pending.popleft()
+        try:
+            receipt = future.result()
+        except Exception as e:
+            raise RuntimeError(f"Error fetching receipt of {tx_hash}! \n{e}")
+        if receipt is None:
+            raise RuntimeError(f"Receipt of {tx_hash} not found")
+        return receipt
+
+    for tx_hash in tx_hashes:
+        tx_hash = tx_hash.strip()
+        if not tx_hash or tx_hash.startswith("#"):
+            continue
+        if not TX_HASH_PATTERN.match(tx_hash):
+            raise RuntimeError(f"Invalid transaction hash: {tx_hash}")
+        pending.append((tx_hash, client.get_transaction_receipt(tx_hash)))
+        if len(pending) >= RPC_BATCH_SIZE:
+            yield take()
+    while pending:
+        yield take()
+
+
+def decode_receipts(chain: str, tx_hashes, index: EventIndex = None, offline: bool = False, workers: int = 8):
+    # Without a fixed index, the ABIs of each transaction's target and of
+    # every contract that emitted a log are fetched (concurrently, once per
+    # address) and added to the index as new addresses show up.
+    chain = chain.lower()
+    resolver = None
+    if index is None:
+        index = EventIndex()
+        resolver = ABIResolver(chain, offline, calldata_decoder.fetch_contract_abi)
+    seen = set()
+
+    def load(address):
+        try:
+            return address, resolver.get(address)
+        except RuntimeError:
+            return address, None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for receipt in iter_receipts(chain, tx_hashes):
+            logs = receipt.get("logs") or []
+            if resolver is not None:
+                addresses = {log["address"].lower() for log in logs}
+                if receipt.get("to"):
+                    addresses.add(receipt["to"].lower())
+                for address, abi in pool.map(load, addresses - seen):
+                    if abi is not None:
+                        index.add_abi(abi, address)
+                seen |= addresses
+            for log in logs:
+                yield decode_log(log, index)
+
+
+def iter_logs(chain: str, start: int, end: int, address: str = None, topics: list = None,
+              window: int = DEFAULT_WINDOW):
+    # The next window is requested before the current one is handed back, so
+    # decoding overlaps with the provider working on the next range.
+    client = get_batch_client(chain)
+    window = max(1, window)
+
+    def request(first, last):
+        log_filter = {"fromBlock": hex(first), "toBlock": hex(last)}
+        if address:
+            log_filter["address"] = address
+        if topics:
+            log_filter["topics"] = topics
+        return first, last, client.get_logs(log_filter)
+
+    if start > end:
+        return
+    pending = request(start, min(end, start + window - 1))
+    while pending is not None:
+        first, last, future = pending
+        try:
+            with span("rpc.get_logs", blocks=last - first + 1):
+                logs = future.result()
+        except Exception as e:
+            if last == first:
+                raise RuntimeError(f"Error fetching logs for block {first}! \n{e}")
+            window = max(1, (last - first + 1) // 2)
+            pending = request(first, first + window - 1)
+            continue
+
+        if len(logs) > TARGET_LOGS:
+            window = max(1, window // 2)
+        elif len(logs) < TARGET_LOGS // 2:
+            window = min(MAX_WINDOW, window * 2)
+        pending = request(last + 1, min(end, last + window)) if last < end else None
+        yield logs
+
+
+def decode_range(chain: str, index: EventIndex, start: int, end: int, address: str = None,
+                 topics: list = None, window: int = DEFAULT_WINDOW):
+    for logs in iter_logs(chain.lower(), start, end, address, topics, window):
+        for log in logs:
+            if not log.get("removed"):
+                yield decode_log(log, index)
@@ -0,0 +1,188 @@
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import calldata_decoder
+from src.utils.batch_decoder import ABIResolver
+from src.utils.compiled_abi import CompiledFunction, checksum_address
+
+
+DEFAULT_MAX_DEPTH = 5
+
+# Address arguments that name the callee of a sibling `bytes` argument, e.g.
+# aggregate3's (target, allowFailure, callData) or Safe's execTransaction(to, value, data, ...).
+TARGET_NAMES = ("target", "to", "_to", "destination", "callee")
+
+
+def _universal_router_command(name: str, inputs: str):
+    params = []
+    for param in inputs.split(","):
+        param_type, param_name = param.split()
+        params.append({"name": param_name, "type": param_type})
+    return CompiledFunction({"type": "function", "name": name, "inputs": params})
+
+
+# Universal Router `execute` inputs are ABI-encoded argument tuples, one per
+# command byte, rather than calldata. The top bit allows the command to
+# revert, the low six bits select it.
+COMMAND_TYPE_MASK = 0x3f
+UNIVERSAL_ROUTER_COMMANDS = {
+    0x00: _universal_router_command("V3_SWAP_EXACT_IN", "address recipient,uint256 amountIn,uint256 amountOutMin,bytes path,bool payerIsUser"),
+    0x01: _universal_router_command("V3_SWAP_EXACT_OUT", "address recipient,uint256 amountOut,uint256 amountInMax,bytes path,bool payerIsUser"),
+    0x02: _universal_router_command("PERMIT2_TRANSFER_FROM", "address token,address recipient,uint160 amount"),
+    0x04: _universal_router_command("SWEEP", "address token,address recipient,uint256 amountMin"),
+    0x05: _universal_router_command("TRANSFER", "address token,address recipient,uint256 value"),
+    0x06: _universal_router_command("PAY_PORTION", "address token,address recipient,uint256 bips"),
+    0x08: _universal_router_command("V2_SWAP_EXACT_IN", "address recipient,uint256 amountIn,uint256 amountOutMin,address[] path,bool payerIsUser"),
+    0x09: _universal_router_command("V2_SWAP_EXACT_OUT", "address recipient,uint256 amountOut,uint256 amountInMax,address[] path,bool payerIsUser"),
+    0x0b: _universal_router_command("WRAP_ETH", "address recipient,uint256 amountMin"),
+    0x0c: _universal_router_command("UNWRAP_WETH", "address recipient,uint256 amountMin"),
+    0x0e: _universal_router_command("BALANCE_CHECK_ERC20", "address owner,address token,uint256 minBalance"),
+    0x21: _universal_router_command("EXECUTE_SUB_PLAN", "bytes commands,bytes[] inputs"),
+}
+EXECUTE_SUB_PLAN = 0x21
+
+
+def _looks_like_calldata(value) -> bool:
+    return isinstance(value, bytes) and len(value) >= 4 and (len(value) - 4) % 32 == 0
+
+
+def _sibling_target(inputs: list, values: dict):
+    addresses = [param["name"] for param in inputs if param["type"] == "address"]
+    for name in TARGET_NAMES:
+        if name in addresses:
+            return values.get(name)
+    if addresses:
+        return values.get(addresses[0])
+    return None
+
+
+def _walk(param: dict, value, target: str):
+    type_str = param["type"]
+    if type_str.endswith("]"):
+        item = dict(param, type=type_str[:type_str.rindex("[")])
+        for entry in value:
+            yield from _walk(item, entry, target)
+    elif type_str == "tuple":
+        yield from _inner_calls(param["components"], value, target)
+    elif type_str == "bytes" and _looks_like_calldata(value):
+        yield {"address": target, "calldata": value}
+
+
+def _inner_calls(inputs: list, values: dict, default_target: str):
+    target = _sibling_target(inputs, values) or default_target
+    for param in inputs:
+        yield from _walk(param, values.get(param["name"]), target)
+
+
+def _multisend_calls(params: dict, address: str):
+    # Safe MultiSend packs each call as
+    # operation (1 byte) | to (20) | value (32) | data length (32) | data.
+    data = params["transactions"]
+    offset = 0
+    while offset + 85 <= len(data):
+        length = int.from_bytes(data[offset + 53:offset + 85], "big")
+        yield {
+            "address": checksum_address("0x" + data[offset + 1:offset + 21].hex()),
+            "operation": data[offset],
+            "value": int.from_bytes(data[offset + 21:offset + 53], "big"),
+            "calldata": data[offset + 85:offset + 85 + length],
+        }
+        offset += 85 + length
+
+
+def _universal_router_calls(params: dict, address: str):
+    for command, inputs in zip(params["commands"], params["inputs"]):
+        decoder = UNIVERSAL_ROUTER_COMMANDS.get(command & COMMAND_TYPE_MASK)
+        node = {"command": f"0x{command:02x}", "allow_revert": bool(command & 0x80)}
+        if decoder is None:
+            node["input"] = inputs
+        else:
+            try:
+                node["function"] = decoder.fn_name
+                node["params"] = decoder.decode(inputs)
+                if command & COMMAND_TYPE_MASK == EXECUTE_SUB_PLAN:
+                    node["calls"] = list(_universal_router_calls(node["params"], address))
+            except Exception as e:
+                node["error"] = f"Error decoding command input! \n{e}"
+        yield node
+
+
+SPECIAL_FUNCTIONS = {
+    "multiSend(bytes)": _multisend_calls,
+    "execute(bytes,bytes[])": _universal_router_calls,
+    "execute(bytes,bytes[],uint256)": _universal_router_calls,
+}
+
+
+def _decode_node(node: dict, chain: str, get_abi, offline: bool = False):
+    calldata = node.pop("calldata")
+    if not calldata:
+        node["function"] = None
+        node["calls"] = []
+        return
+
+    node["calldata"] = calldata if isinstance(calldata, str) else "0x" + bytes(calldata).hex()
+    try:
+        func_obj, params = calldata_decoder.decode_with_fallback(
+            calldata, node["address"], chain, get_abi, offline=offline)
+    except RuntimeError as e:
+        node["error"] = str(e)
+        node["calls"] = []
+        return
+
+    node["function"] = func_obj.signature
+    node["params"] = params
+
+    special = SPECIAL_FUNCTIONS.get(func_obj.signature)
+    if special is not None:
+        inner = special(params, node["address"])
+    else:
+        inner = _inner_calls(func_obj.abi.get("inputs", []), params, node["address"])
+    node["calls"] = list(inner)
+
+
+def decode_recursive(calldata, address: str, chain: str, offline: bool = False, abi: list = None,
+                     max_depth: int = DEFAULT_MAX_DEPTH, workers: int = 8):
+    chain = chain.lower() if chain else None
+    resolver = ABIResolver(chain, offline)
+    root_address = address.lower() if address else None
+
+    def get_abi(target):
+        if abi is not None and (target is None or target.lower() == root_address):
+            return abi
+        if target is None:
+            raise RuntimeError("Unknown call target")
+        return resolver.get(target)
+
+    def prefetch(target):
+        try:
+            get_abi(target)
+        except RuntimeError:
+            pass
+
+    root = {"address": address, "calldata": calldata}
+    level = [root]
+    # Walk the call tree breadth first: every inner target discovered on one
+    # level has its ABI fetched concurrently before that level is decoded.
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for depth in range(max_depth + 1):
+            targets = {node["address"].lower(): node["address"] for node in level
+                       if node.get("calldata") and node["address"]}
+            list(pool.map(prefetch, targets.values()))
+
+            next_level = []
+            for node in level:
+                if "calldata" not in node:
+                    continue
+                _decode_node(node, chain, get_abi, offline)
+                if depth < max_depth:
+                    next_level.extend(node["calls"])
+            if not next_level:
+                break
+            level = next_level
+    return root
+
+
+def decode_transaction_recursive(tx_hash: str, chain: str, offline: bool = False,
+                                 max_depth: int = DEFAULT_MAX_DEPTH, workers: int = 8, tx=None):
+    if tx is None:
+        tx = calldata_decoder.fetch_transaction(tx_hash, chain)
+    return decode_recursive(tx["input"], tx["to"], chain, offline, max_depth=max_depth, workers=workers)
@@ -0,0 +1,121 @@
+import json
+import sys
+from src.utils.serialization import json_default
+
+
+FORMATS = ("json", "jsonl", "msgpack")
+
+_format = None
+_orjson = None
+_msgpack = None
+
+
+def set_format(output_format: str):
+    global _format, _orjson, _msgpack
+    if output_format not in FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format} (expected one of {', '.join(FORMATS)})")
+
+    # orjson is optional; without it the stdlib encoder is used.
+    try:
+        import orjson
+        _orjson = orjson
+    except ImportError:
+        _orjson = None
+
+    if output_format == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            raise ValueError("msgpack output needs the msgpack package (pip install 'axe[fast]')")
+        _msgpack = msgpack
+    _format = output_format
+
+
+def get_format():
+    return _format
+
+
+def structured() -> bool:
+    return _format is not None
+
+
+def _dumps_json(value) -> bytes:
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(value, default=json_default)
+        except TypeError:
+            # orjson refuses integers wider than 64 bits, which uint256
+            # values routinely are; the stdlib encoder keeps them exact.
+            pass
+    return json.dumps(value, default=json_default, separators=(",", ":")).encode()
+
+
+def _msgpack_safe(value):
+    if isinstance(value, int) and not -(1 << 63) <= value < (1 << 64):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _msgpack_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_msgpack_safe(item) for item in value]
+    if isinstance(value, set):
+        return [_msgpack_safe(item) for item in sorted(value)]
+    return value
+
+
+def _dumps_msgpack(value) -> bytes:
+    # Bytes stay binary. Integers beyond 64 bits have no msgpack type, so
+    # records containing them are re-encoded with those values as decimal
+    # strings.
+    try:
+        return _msgpack.packb(value, default=_msgpack_safe)
+    except (OverflowError, TypeError):
+        return _msgpack.packb(_msgpack_safe(value))
+
+
+def _write(data: bytes):
+    sys.stdout.buffer.write(data)
+
+
+def emit(value):
+    sys.stdout.flush()
+    if _format == "msgpack":
+        _write(_dumps_msgpack(value))
+    else:
+        _write(_dumps_json(value) + b"\n")
+    sys.stdout.buffer.flush()
+
+
+class RowWriter:
+    # Rows are written as soon as they are produced: one JSON document per
+    # line for jsonl, concatenated objects for msgpack, and an incrementally
+    # written array for json (closed by close()).
+    def __init__(self):
+        sys.stdout.flush()
+        self.out = sys.stdout.buffer
+        self.rows = 0
+
+    def write(self, row):
+        if _format == "msgpack":
+            self.out.write(_dumps_msgpack(row))
+        elif _format == "jsonl":
+            self.out.write(_dumps_json(row) + b"\n")
+        else:
+            self.out.write((b"[" if not self.rows else b",\n") + _dumps_json(row))
+        self.rows += 1
+
+    def flush(self):
+        self.out.flush()
+
+    def close(self):
+        if _format == "json":
+            self.out.write(b"]\n" if self.rows else b"[]\n")
+        self.out.flush()
+
+
+def emit_rows(rows):
+    writer = RowWriter()
+    try:
+        for row in rows:
+            writer.write(row)
+    finally:
+        writer.close()
@@ -0,0 +1,271 @@
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+EXPORT_FORMATS = ("json", "otlp")
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+_spans = []
+_http = []
+_exporters = []
+_ids = itertools.count(1)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key, value):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attributes", "span_id", "parent_id", "thread", "start_ns", "start_wall_ns", "end_ns", "error")
+
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent_id = stack[-1].span_id if stack else None
+        self.span_id = next(_ids)
+        self.thread = threading.get_ident()
+        self.error = None
+        stack.append(self)
+        self.start_wall_ns = time.time_ns()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        _local.stack.pop()
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        with _lock:
+            _spans.append(self)
+        return False
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **attributes):
+    # With profiling off this hands back a shared no-op object, so the
+    # instrumented hot paths pay for a function call and nothing else.
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, attributes)
+
+
+def add_exporter(exporter):
+    # Exporters are called with the finished span records when the process
+    # reports, e.g. to forward them to a tracing backend.
+    _exporters.append(exporter)
+
+
+def record_http(method: str, url: str, status, sent: int, received: int, elapsed: float):
+    # Returns the record, so bytes read later can still be added to it.
+    if not _enabled:
+        return None
+    record = [method, urlsplit(url).netloc, status, sent, received, elapsed]
+    with _lock:
+        _http.append(record)
+    return record
+
+
+def _count_received(stream, record):
+    def counting(*args, **kwargs):
+        for chunk in stream(*args, **kwargs):
+            with _lock:
+                record[4] += len(chunk)
+            yield chunk
+    return counting
+
+
+def _response_hook(response, *args, **kwargs):
+    # The body is counted as the caller reads it: reading it here would load
+    # stream=True responses (traces) whole.
+    if not _enabled:
+        return response
+    body = response.request.body or b""
+    record = record_http(
+        response.request.method, response.url, response.status_code,
+        len(body.encode() if isinstance(body, str) else body), 0, response.elapsed.total_seconds())
+    if hasattr(response.raw, "stream"):
+        response.raw.stream = _count_received(response.raw.stream, record)
+    return response
+
+
+def instrument_session(session):
+    session.hooks["response"].append(_response_hook)
+    return session
+
+
+def aiohttp_trace_config():
+    from aiohttp import TraceConfig
+
+    async def on_request_start(session, context, params):
+        context.start = time.perf_counter()
+
+    async def on_request_end(session, context, params):
+        response = params.response
+        record_http(
+            params.method, str(params.url), response.status, 0,
+            response.content_length or 0, time.perf_counter() - context.start)
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+def records() -> list:
+    # Start times are wall-clock (for correlation with other traces),
+    # durations come from the monotonic perf counter.
+    with _lock:
+        spans = list(_spans)
+    return [
+        {
+            "name": s.name,
+            "span_id": s.span_id,
+            "parent_id": s.parent_id,
+            "thread": s.thread,
+            "start_unix_ns": s.start_wall_ns,
+            "duration_ns": s.duration_ns,
+            "attributes": s.attributes,
+            "error": s.error,
+        }
+        for s in spans
+    ]
+
+
+def summary() -> dict:
+    stages = {}
+    with _lock:
+        spans = list(_spans)
+        http = list(_http)
+    for s in spans:
+        stage = stages.setdefault(s.name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+        ms = s.duration_ns / 1e6
+        stage["calls"] += 1
+        stage["total_ms"] += ms
+        stage["max_ms"] = max(stage["max_ms"], ms)
+        stage["errors"] += s.error is not None
+    for stage in stages.values():
+        stage["mean_ms"] = stage["total_ms"] / stage["calls"]
+
+    hosts = {}
+    for method, host, status, sent, received, elapsed in http:
+        entry = hosts.setdefault(host, {"requests": 0, "bytes_sent": 0, "bytes_received": 0, "total_ms": 0.0, "statuses": {}})
+        entry["requests"] += 1
+        entry["bytes_sent"] += sent
+        entry["bytes_received"] += received
+        entry["total_ms"] += elapsed * 1000
+        entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+
+    return {
+        "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["total_ms"])),
+        "http": {
+            "requests": len(http),
+            "bytes_sent": sum(item[3] for item in http),
+            "bytes_received": sum(item[4] for item in http),
+            "hosts": hosts,
+        },
+    }
+
+
+def otlp_document(service_name: str = "axe") -> dict:
+    # OTLP/JSON (the body of an OTLP/HTTP traces export). A process is one
+    # trace, ids are zero-padded hex as the format requires.
+    trace_id = f"{os.getpid():016x}{time.time_ns() & ((1 << 64) - 1):016x}"
+    spans = []
+    for record in records():
+        span_doc = {
+            "traceId": trace_id,
+            "spanId": f"{record['span_id']:016x}",
+            "name": record["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(record["start_unix_ns"]),
+            "endTimeUnixNano": str(record["start_unix_ns"] + record["duration_ns"]),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in {**record["attributes"], "thread.id": record["thread"]}.items()
+            ],
+            "status": {"code": 2, "message": record["error"]} if record["error"] else {"code": 1},
+        }
+        if record["parent_id"] is not None:
+            span_doc["parentSpanId"] = f"{record['parent_id']:016x}"
+        spans.append(span_doc)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+            "scopeSpans": [{"scope": {"name": "axe.profiling"}, "spans": spans}],
+        }]
+    }
+
+
+def export(path: str, export_format: str = "json"):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported profile export format: {export_format} (expected one of {', '.join(EXPORT_FORMATS)})")
+    document = otlp_document() if export_format == "otlp" else {"spans": records(), "summary": summary()}
+    with open(path, "w") as f:
+        json.dump(document, f)
+
+
+def format_summary(data: dict) -> str:
+    lines = [f"{'stage':<32} {'calls':>7} {'total ms':>11} {'mean ms':>9} {'max ms':>9}"]
+    for name, stage in data["stages"].items():
+        lines.append(
+            f"{name:<32} {stage['calls']:>7} {stage['total_ms']:>11.2f} {stage['mean_ms']:>9.3f} {stage['max_ms']:>9.3f}"
+            + (f"  ({stage['errors']} failed)" if stage["errors"] else ""))
+    http = data["http"]
+    lines.append("")
+    lines.append(f"HTTP: {http['requests']} requests, {http['bytes_sent']:,} bytes sent, {http['bytes_received']:,} bytes received")
+    for host, entry in http["hosts"].items():
+        statuses = ", ".join(f"{status}: {count}" for status, count in entry["statuses"].items())
+        lines.append(
+            f"  {host:<30} {entry['requests']:>7} req {entry['bytes_received']:>12,} B in  "
+            f"{entry['total_ms']:>10.1f} ms  [{statuses}]")
+    return "\n".join(lines)
+
+
+def report(export_path: str = None, export_format: str = "json"):
+    # The breakdown goes to stderr so it never mixes with command output.
+    if not _enabled:
+        return
+    sys.stderr.write(format_summary(summary()) + "\n")
+    if export_path:
+        export(export_path, export_format)
+    if _exporters:
+        spans = records()
+        for exporter in _exporters:
+            exporter(spans)
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import weakref
+import requests
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web3 import AsyncWeb3, Web3
+from web3._utils.http_session_manager import HTTPSessionManager
+from web3.providers.rpc.utils import ExceptionRetryConfiguration
+from src.utils import profiling
+from src.utils.config import CHAIN_CONFIG, HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_session = None
+_web3 = {}
+_async_web3 = weakref.WeakKeyDictionary()
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "POST"}),
+                raise_on_status=False)
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = profiling.instrument_session(session)
+        return _session
+
+
+class PooledSessionManager(HTTPSessionManager):
+    # web3 caches one requests.Session per thread and endpoint. Hand every
+    # thread the shared pooled session instead so connections are reused
+    # across the whole process.
+    def cache_and_return_session(self, endpoint_uri, session=None, request_timeout=None):
+        return get_session()
+
+
+def get_rpc_url(chain: str) -> str:
+    chain = chain.lower()
+    if chain not in CHAIN_CONFIG:
+        raise ValueError(f"Unsupported Chain: {chain}")
+    return f"{CHAIN_CONFIG[chain]['rpc_url']}"
+
+
+def get_web3(chain: str) -> Web3:
+    chain = chain.lower()
+    rpc_url = get_rpc_url(chain)
+
+    with profiling.span("get_web3", chain=chain), _lock:
+        web3 = _web3.get(chain)
+        if web3 is None:
+            # Retries and backoff are handled by the pooled session's adapter.
+            provider = Web3.HTTPProvider(
+                rpc_url,
+                request_kwargs={"timeout": HTTP_TIMEOUT},
+                exception_retry_configuration=None)
+            provider._request_session_manager = PooledSessionManager()
+            web3 = Web3(provider)
+            _web3[chain] = web3
+        return web3
+
+
+async def get_async_web3(chain: str) -> AsyncWeb3:
+    chain = chain.lower()
+    rpc_url = get_rpc_url(chain)
+
+    # aiohttp sessions are bound to the event loop that created them, so
+    # async providers are cached per loop.
+    loop = asyncio.get_running_loop()
+    providers = _async_web3.setdefault(loop, {})
+    web3 = providers.get(chain)
+    if web3 is None:
+        provider = AsyncWeb3.AsyncHTTPProvider(
+            rpc_url,
+            request_kwargs={"timeout": ClientTimeout(total=HTTP_TIMEOUT)},
+            exception_retry_configuration=ExceptionRetryConfiguration(
+                errors=(ClientError, TimeoutError),
+                retries=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF))
+        trace_configs = [profiling.aiohttp_trace_config()] if profiling.enabled() else None
+        await provider.cache_async_session(
+            ClientSession(connector=TCPConnector(limit=HTTP_POOL_SIZE), trace_configs=trace_configs))
+        web3 = AsyncWeb3(provider)
+        providers[chain] = web3
+    return web3
+
+
+async def close_async_web3():
+    # Closes the aiohttp sessions of the providers created on the running
+    # loop; call before the loop shuts down.
+    providers = _async_web3.pop(asyncio.get_running_loop(), {})
+    for web3 in providers.values():
+        await web3.provider.disconnect()
@@ -0,0 +1,189 @@
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from eth_utils import to_checksum_address
+from src.utils.config import AXE_CACHE_DIR, CHAIN_CONFIG, PROXY_CACHE_BLOCKS
+from src.utils.profiling import span
+from src.utils.rpc_batcher import get_batch_client
+
+
+# Checked in order; the first non-zero slot wins.
+IMPLEMENTATION_SLOTS = (
+    # bytes32(uint256(keccak256("eip1967.proxy.implementation")) - 1)
+    ("eip1967", "0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc"),
+    # keccak256("PROXIABLE")
+    ("eip1822", "0xc5f16f0fcc639fa48a6947836d9850f504798523bf8c9a3a87d5876cf622bcf7"),
+    # keccak256("org.zeppelinos.proxy.implementation"), pre-1967 OpenZeppelin proxies
+    ("zeppelinos", "0x7050c9e0f4ca769c69bd3a8ef740bc37934f8e2c036e5a723fd8ee048ed3f8c3"),
+)
+# bytes32(uint256(keccak256("eip1967.proxy.beacon")) - 1)
+BEACON_SLOT = "0xa3f0ad74e5423aebfd80d3ef4346578335a9a72aeaee59ff6cb3582b35133d50"
+IMPLEMENTATION_SELECTOR = "0x5c60da1b"
+
+# Roughly one slot: batch decodes share a head block instead of asking for it
+# per contract.
+HEAD_BLOCK_TTL = 12.0
+
+# How nodes without archive state answer a read at an old block.
+_NO_STATE = re.compile(r"missing trie node|header not found|historical state|state.*(not available|unavailable|pruned)|archive",
+                       re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS proxies (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    implementation TEXT,
+    kind TEXT,
+    block INTEGER NOT NULL,
+    PRIMARY KEY (chain_id, address)
+);
+"""
+
+
+class ProxyCache:
+    # Non-proxies are stored too (with a NULL implementation), so ordinary
+    # contracts are not probed again on every decode.
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def get(self, chain_id: int, address: str):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT implementation, kind, block FROM proxies WHERE chain_id = ? AND address = ?",
+                (chain_id, address.lower())).fetchone()
+
+    def put(self, chain_id: int, address: str, implementation: str, kind: str, block: int):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO proxies (chain_id, address, implementation, kind, block) VALUES (?, ?, ?, ?, ?)",
+                (chain_id, address.lower(), implementation, kind, block))
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM proxies")
+            conn.commit()
+
+
+proxy_cache = ProxyCache(AXE_CACHE_DIR / "proxies.sqlite")
+
+_lock = threading.Lock()
+_head_blocks = {}
+# Chains whose node turned out to have no archive state; their proxies are
+# read at the head from then on.
+_no_archive = set()
+
+
+def _word_address(word):
+    if not word or len(word) <= 2:
+        return None
+    value = int(word[:66], 16)
+    if value == 0 or value >> 160:
+        return None
+    return to_checksum_address(f"0x{value:040x}")
+
+
+def head_block(chain: str) -> int:
+    now = time.monotonic()
+    with _lock:
+        cached = _head_blocks.get(chain)
+    if cached is not None and now - cached[1] < HEAD_BLOCK_TTL:
+        return cached[0]
+    try:
+        block = int(get_batch_client(chain).block_number().result(), 16)
+    except Exception as e:
+        raise RuntimeError(f"Error fetching the latest block! \n{e}")
+    with _lock:
+        _head_blocks[chain] = (block, now)
+    return block
+
+
+def read_implementation(chain: str, address: str, block: int = None):
+    # Reads the slots at `block`, or at the head when it is None, in which
+    # case the head block number goes out in the same batched RPC round.
+    # Beacon proxies need a second round to ask the beacon for its
+    # implementation.
+    client = get_batch_client(chain)
+    tag = "latest" if block is None else hex(block)
+    with span("proxy.read_slots", address=address):
+        head = client.block_number() if block is None else None
+        slots = [(kind, client.get_storage_at(address, slot, tag)) for kind, slot in IMPLEMENTATION_SLOTS]
+        beacon = client.get_storage_at(address, BEACON_SLOT, tag)
+        try:
+            if head is not None:
+                block = int(head.result(), 16)
+            words = [(kind, future.result()) for kind, future in slots]
+            beacon = _word_address(beacon.result())
+        except Exception as e:
+            raise RuntimeError(f"Error reading proxy slots of {address}! \n{e}")
+
+    if head is not None:
+        with _lock:
+            _head_blocks[chain] = (block, time.monotonic())
+
+    for kind, word in words:
+        implementation = _word_address(word)
+        if implementation is not None:
+            return implementation, kind, block
+
+    if beacon is not None:
+        with span("proxy.beacon_call", beacon=beacon):
+            try:
+                result = client.call(beacon, IMPLEMENTATION_SELECTOR, tag).result()
+            except Exception as e:
+                raise RuntimeError(f"Error calling implementation() on beacon {beacon}! \n{e}")
+        implementation = _word_address(result)
+        if implementation is not None:
+            return implementation, "beacon", block
+
+    return None, None, block
+
+
+def resolve_implementation(address: str, chain: str, block: int = None, offline: bool = False):
+    # `block` is the block the caller is decoding at (e.g. the transaction's);
+    # without one the chain head is used. The slots are read at that block, so
+    # calls made before an upgrade resolve to the implementation of the time.
+    # A cached mapping is reused for blocks within PROXY_CACHE_BLOCKS of the
+    # block it was read at, before or after.
+    chain = chain.lower()
+    chain_id = CHAIN_CONFIG[chain]['chain_id']
+    if isinstance(block, str):
+        block = int(block, 16)
+    if chain in _no_archive:
+        block = None
+
+    cached = proxy_cache.get(chain_id, address)
+    if cached is not None and offline:
+        return cached[0], cached[1]
+    if offline:
+        raise RuntimeError(f"Proxy implementation of {address} on {chain} is not cached and offline mode is enabled")
+
+    if cached is not None:
+        current = block if block is not None else head_block(chain)
+        if abs(current - cached[2]) < PROXY_CACHE_BLOCKS:
+            return cached[0], cached[1]
+
+    try:
+        implementation, kind, read_at = read_implementation(chain, address, block)
+    except RuntimeError as e:
+        if block is None or not _NO_STATE.search(str(e)):
+            raise
+        # Not an archive node: the current implementation is the best guess.
+        with _lock:
+            _no_archive.add(chain)
+        implementation, kind, read_at = read_implementation(chain, address)
+    proxy_cache.put(chain_id, address, implementation, kind, read_at)
+    return implementation, kind
@@ -0,0 +1,198 @@
+import itertools
+import re
+import threading
+import time
+from concurrent.futures import Future
+from src.utils.config import HTTP_TIMEOUT, RPC_BATCH_CONCURRENCY, RPC_BATCH_SIZE, RPC_BATCH_LATENCY
+from src.utils.profiling import span
+from src.utils.providers import get_rpc_url, get_session
+
+
+class RPCError(RuntimeError):
+    pass
+
+
+class BatchRejected(Exception):
+    pass
+
+
+# Error messages providers use when a batch is over their size limit.
+_BATCH_LIMIT = re.compile(r"batch.*(limit|large|exceed|max|too many)|(limit|exceed|max|too many).*batch", re.IGNORECASE)
+# After this many full batches at a learned limit, the limit is doubled again
+# (up to max_batch_size), so a limit learned from a misread error recovers.
+RECOVER_AFTER = 32
+
+
+def is_batch_limit_error(message: str) -> bool:
+    return bool(message) and _BATCH_LIMIT.search(message) is not None
+
+
+class BatchingRPCClient:
+    # Coalesces JSON-RPC calls made from any thread into batch requests. A
+    # batch is sent once it reaches the batch limit or once its oldest call
+    # has waited flush_latency seconds. Batches the provider refuses as too
+    # large (HTTP 413 or a batch-limit error) are split in half and retried,
+    # and the smaller size is used for later batches until it recovers. Other
+    # failures, 5xx included, go through the session's retries and then fail
+    # the calls. Up to `concurrency` sender threads take batches off the
+    # queue, so that many batches can be in flight at once.
+    def __init__(self, url: str, max_batch_size: int = RPC_BATCH_SIZE, flush_latency: float = RPC_BATCH_LATENCY,
+                 concurrency: int = RPC_BATCH_CONCURRENCY):
+        self.url = url
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_limit = self.max_batch_size
+        self._full_batches = 0
+        self.flush_latency = flush_latency
+        self._ids = itertools.count(1)
+        self._pending = []
+        self._first_pending_at = None
+        self._condition = threading.Condition()
+        self._threads = [threading.Thread(target=self._run, name=f"rpc-batcher-{n}", daemon=True)
+                         for n in range(max(1, concurrency))]
+        for thread in self._threads:
+            thread.start()
+
+    def request(self, method: str, params: list) -> Future:
+        future = Future()
+        with self._condition:
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending.append(({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}, future))
+            self._condition.notify()
+        return future
+
+    def get_transaction(self, tx_hash: str) -> Future:
+        return self.request("eth_getTransactionByHash", [tx_hash])
+
+    def get_code(self, address: str, block: str = "latest") -> Future:
+        return self.request("eth_getCode", [address, block])
+
+    def get_block_by_number(self, number: int, full_transactions: bool = True) -> Future:
+        return self.request("eth_getBlockByNumber", [hex(number), full_transactions])
+
+    def get_storage_at(self, address: str, slot: str, block: str = "latest") -> Future:
+        return self.request("eth_getStorageAt", [address, slot, block])
+
+    def call(self, to: str, data: str, block: str = "latest") -> Future:
+        return self.request("eth_call", [{"to": to, "data": data}, block])
+
+    def get_transaction_receipt(self, tx_hash: str) -> Future:
+        return self.request("eth_getTransactionReceipt", [tx_hash])
+
+    def get_logs(self, log_filter: dict) -> Future:
+        return self.request("eth_getLogs", [log_filter])
+
+    def block_number(self) -> Future:
+        return self.request("eth_blockNumber", [])
+
+    def _take_batch(self):
+        with self._condition:
+            while True:
+                if self._pending:
+                    if len(self._pending) >= self.batch_limit:
+                        break
+                    remaining = self._first_pending_at + self.flush_latency - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                else:
+                    self._condition.wait()
+
+            batch = self._pending[:self.batch_limit]
+            self._pending = self._pending[self.batch_limit:]
+            if self._pending:
+                self._first_pending_at = time.monotonic()
+                # Another sender may be idle; let it pick up the rest.
+                self._condition.notify()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                self._send(batch)
+            except Exception as e:
+                self._fail(batch, e)
+
+    def _fail(self, batch, error: Exception):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _post(self, payload):
+        with span("rpc.batch", size=len(payload) if isinstance(payload, list) else 1):
+            response = get_session().post(self.url, json=payload, timeout=HTTP_TIMEOUT)
+        batch = isinstance(payload, list)
+        if batch and (response.status_code == 413 or
+                      (response.status_code == 400 and is_batch_limit_error(response.text))):
+            raise BatchRejected(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
+            raise RPCError(f"HTTP {response.status_code} from the RPC endpoint! \n{response.text[:200]}")
+        data = response.json()
+        # Providers that cap batch size typically answer with a single error
+        # object instead of an array.
+        if batch and not isinstance(data, list):
+            error = data.get("error") if isinstance(data, dict) else None
+            message = error.get("message", str(error)) if isinstance(error, dict) else str(error or data)
+            if is_batch_limit_error(message):
+                raise BatchRejected(message)
+            raise RPCError(f"Batch request failed! \n{message}")
+        return data
+
+    def _send(self, batch):
+        if len(batch) == 1:
+            request, future = batch[0]
+            try:
+                response = self._post(request)
+            except BatchRejected as e:
+                raise RPCError(f"Error calling {request['method']}! \n{e}")
+            self._resolve({request["id"]: future}, [response])
+            return
+
+        try:
+            responses = self._post([request for request, _ in batch])
+        except BatchRejected:
+            half = len(batch) // 2
+            with self._condition:
+                self.batch_limit = min(self.batch_limit, half)
+                self._full_batches = 0
+            for part in (batch[:half], batch[half:]):
+                try:
+                    self._send(part)
+                except Exception as e:
+                    self._fail(part, e)
+            return
+
+        with self._condition:
+            if len(batch) >= self.batch_limit and self.batch_limit < self.max_batch_size:
+                self._full_batches += 1
+                if self._full_batches >= RECOVER_AFTER:
+                    self.batch_limit = min(self.max_batch_size, self.batch_limit * 2)
+                    self._full_batches = 0
+        self._resolve({request["id"]: future for request, future in batch}, responses)
+
+    def _resolve(self, futures: dict, responses: list):
+        for response in responses:
+            future = futures.pop(response.get("id"), None)
+            if future is None:
+                continue
+            if "error" in response:
+                future.set_exception(RPCError(response["error"].get("message", str(response["error"]))))
+            else:
+                future.set_result(response.get("result"))
+        for future in futures.values():
+            future.set_exception(RPCError("No response for request in batch"))
+
+
+_lock = threading.Lock()
+_clients = {}
+
+
+def get_batch_client(chain: str) -> BatchingRPCClient:
+    chain = chain.lower()
+    with _lock:
+        client = _clients.get(chain)
+        if client is None:
+            client = BatchingRPCClient(get_rpc_url(chain))
+            _clients[chain] = client
+        return client
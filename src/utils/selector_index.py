@@ -0,0 +1,111 @@
+import json
+import sqlite3
+import threading
+from eth_abi import abi as eth_abi
+from eth_utils import to_bytes
+from eth_utils.abi import abi_to_signature, function_abi_to_4byte_selector
+from src.utils.abi_cache import abi_hash
+from src.utils.compiled_abi import CompiledFunction
+from src.utils.config import AXE_CACHE_DIR
+
+
+# Selectors are stored as 32-bit integers so the primary key stays compact
+# and a lookup is a single B-tree probe. `seen` counts how many distinct ABIs
+# declared a signature and is used to rank colliding candidates.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    selector INTEGER NOT NULL,
+    signature TEXT NOT NULL,
+    abi TEXT NOT NULL,
+    seen INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (selector, signature)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS indexed_abis (
+    abi_hash TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+class IndexedFunction:
+    def __init__(self, signature: str, abi: dict, seen: int):
+        self.signature = signature
+        self.abi = abi
+        self.seen = seen
+        self.fn_name = abi.get("name")
+
+    def __repr__(self):
+        return f"<Function {self.signature}>"
+
+
+class SelectorIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def add_abi(self, abi: list) -> int:
+        digest = abi_hash(abi)
+        functions = [item for item in abi if item.get("type") == "function"]
+
+        with self._lock:
+            conn = self._connect()
+            if conn.execute("SELECT 1 FROM indexed_abis WHERE abi_hash = ?", (digest,)).fetchone():
+                return 0
+
+            rows = []
+            for fn_abi in functions:
+                fragment = {"type": "function", "name": fn_abi["name"], "inputs": fn_abi.get("inputs", [])}
+                selector = int.from_bytes(function_abi_to_4byte_selector(fragment), "big")
+                rows.append((selector, abi_to_signature(fragment), json.dumps(fragment, separators=(",", ":"))))
+
+            conn.executemany(
+                "INSERT INTO signatures (selector, signature, abi) VALUES (?, ?, ?) "
+                "ON CONFLICT (selector, signature) DO UPDATE SET seen = seen + 1",
+                rows)
+            conn.execute("INSERT INTO indexed_abis (abi_hash) VALUES (?)", (digest,))
+            conn.commit()
+        return len(rows)
+
+    def lookup(self, selector: bytes):
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT signature, abi, seen FROM signatures WHERE selector = ? ORDER BY seen DESC",
+                (int.from_bytes(selector[:4], "big"),)).fetchall()
+        return [IndexedFunction(signature, json.loads(fragment), seen) for signature, fragment, seen in rows]
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM signatures")
+            conn.execute("DELETE FROM indexed_abis")
+            conn.commit()
+
+    def decode(self, calldata: str):
+        data = to_bytes(hexstr=calldata)
+        args = data[4:]
+
+        ranked = []
+        for candidate in self.lookup(data[:4]):
+            try:
+                function = CompiledFunction(candidate.abi)
+                raw = function.decode_raw(args)
+                params = function.normalize(raw)
+            except Exception:
+                continue
+            # A candidate whose re-encoding reproduces the calldata byte for
+            # byte is a far stronger match than one that merely decodes.
+            exact = eth_abi.encode(function.input_types, raw) == args
+            ranked.append((not exact, -candidate.seen, candidate, params))
+
+        ranked.sort(key=lambda entry: entry[:2])
+        return [(candidate, params) for _, _, candidate, params in ranked]
+
+
+selector_index = SelectorIndex(AXE_CACHE_DIR / "selectors.sqlite")
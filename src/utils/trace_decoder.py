@@ -0,0 +1,180 @@
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import calldata_decoder, json_stream
+from src.utils.batch_decoder import ABIResolver, TX_HASH_PATTERN
+from src.utils.config import TRACE_TIMEOUT
+from src.utils.profiling import span
+from src.utils.providers import get_session, get_web3
+
+
+TRACERS = ("call", "parity")
+ENVELOPE_KEYS = ("jsonrpc", "id", "result", "error")
+# Precompiles live at the lowest addresses; there is no ABI to decode them with.
+PRECOMPILE_LIMIT = 0x100
+CREATE_TYPES = ("CREATE", "CREATE2", "create")
+FRAME_FIELDS = frozenset(("type", "from", "to", "value", "gas", "gasUsed", "input", "error", "revertReason"))
+
+
+def stream_trace(chain: str, tx_hash: str, tracer: str = "call"):
+    # The response is read in chunks and handed to the streaming parser, so a
+    # multi-megabyte trace is never held whole.
+    if not TX_HASH_PATTERN.match(tx_hash):
+        raise RuntimeError(f"Invalid transaction hash: {tx_hash}")
+    if tracer == "call":
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "debug_traceTransaction",
+                   "params": [tx_hash, {"tracer": "callTracer"}]}
+    else:
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "trace_transaction", "params": [tx_hash]}
+
+    url = get_web3(chain).provider.endpoint_uri
+    try:
+        with span("rpc.trace", method=payload["method"]):
+            response = get_session().post(url, json=payload, stream=True, timeout=TRACE_TIMEOUT)
+            response.raise_for_status()
+    except Exception as e:
+        raise RuntimeError(f"Error tracing transaction! \n{e}")
+
+    response.encoding = "utf-8"
+    try:
+        yield from response.iter_content(json_stream.CHUNK_SIZE, decode_unicode=True)
+    finally:
+        response.close()
+
+
+def _check_response(prefix: str, event: str, value, events):
+    if prefix == "result" and event == "null":
+        raise RuntimeError("Error tracing transaction! \nThe node returned no trace (unknown transaction?)")
+    if prefix == "error" and event in ("start_map", "string"):
+        error = json_stream.build(event, value, events)
+        message = error.get("message", error) if isinstance(error, dict) else error
+        raise RuntimeError(f"Error tracing transaction! \n{message}")
+
+
+def iter_call_frames(chunks):
+    # Frames of a callTracer result (a JSON-RPC response or the bare result)
+    # are yielded as they close, children before their parent, with their
+    # position as a trace address; sorting by trace address gives the
+    # pre-order trace_transaction uses. Geth writes type and value after the
+    # nested calls, so a frame is only complete when it closes, and yielding
+    # in pre-order would hold the whole trace until the root closed. Only
+    # the scalar fields decode_frame reads are kept for the frames on the
+    # current path; nested calls, outputs and logs are never assembled.
+    events = json_stream.parse(chunks)
+    head = list(itertools.islice(events, 2))
+    envelope = len(head) == 2 and head[1][1] == "map_key" and head[1][2] in ENVELOPE_KEYS
+    root = "result" if envelope else ""
+    events = itertools.chain(head, events)
+
+    stack = []
+    for prefix, event, value in events:
+        if envelope:
+            _check_response(prefix, event, value, events)
+
+        if event == "start_map" and (prefix == root or prefix.endswith(".calls.item") or prefix == "calls.item"):
+            if stack:
+                parent = stack[-1]
+                address = parent[2] + [parent[3]]
+                parent[3] += 1
+            else:
+                address = []
+            # [prefix, fields, trace address, children seen]
+            stack.append([prefix, {"depth": len(stack), "trace_address": address}, address, 0])
+        elif not stack:
+            continue
+        elif event == "end_map" and prefix == stack[-1][0]:
+            yield stack.pop()[1]
+        elif event in ("string", "number", "boolean", "null"):
+            parent, _, key = prefix.rpartition(".")
+            if parent == stack[-1][0] and key in FRAME_FIELDS:
+                stack[-1][1][key] = value
+
+
+def iter_parity_frames(chunks):
+    # trace_transaction returns a flat, pre-ordered list; entries are
+    # assembled one at a time.
+    events = json_stream.parse(chunks)
+    for prefix, event, value in events:
+        _check_response(prefix, event, value, events)
+        if prefix in ("result.item", "item") and event == "start_map":
+            trace = json_stream.build(event, value, events)
+            action = trace.get("action") or {}
+            result = trace.get("result") or {}
+            address = trace.get("traceAddress") or []
+            yield {
+                "type": action.get("callType") or trace.get("type"),
+                "from": action.get("from"),
+                "to": action.get("to") or result.get("address"),
+                "value": action.get("value"),
+                "gas": action.get("gas"),
+                "gasUsed": result.get("gasUsed"),
+                "input": action.get("input") or action.get("init"),
+                "error": trace.get("error"),
+                "depth": len(address),
+                "trace_address": address,
+            }
+
+
+def _quantity(value):
+    if isinstance(value, str):
+        return int(value, 16) if value.startswith("0x") else int(value)
+    return value
+
+
+def decode_frame(frame: dict, chain: str, resolver: ABIResolver) -> dict:
+    to = frame.get("to")
+    calldata = frame.get("input") or "0x"
+    row = {
+        "depth": frame["depth"],
+        "trace_address": frame["trace_address"],
+        "type": frame.get("type"),
+        "from": frame.get("from"),
+        "to": to,
+        "value": _quantity(frame.get("value")) or 0,
+        "gas": _quantity(frame.get("gas")),
+        "gas_used": _quantity(frame.get("gasUsed")),
+        "function": None,
+    }
+    if frame.get("error"):
+        row["error"] = frame["error"]
+        if frame.get("revertReason"):
+            row["revert_reason"] = frame["revertReason"]
+
+    if len(calldata) < 10 or not to or frame.get("type") in CREATE_TYPES or int(to, 16) < PRECOMPILE_LIMIT:
+        return row
+
+    row["selector"] = calldata[:10]
+    try:
+        func_obj, params = calldata_decoder.decode_with_fallback(
+            calldata, to, chain, resolver.get, offline=resolver.offline)
+    except RuntimeError as e:
+        row["decode_error"] = str(e)
+        return row
+    row["function"] = func_obj.signature
+    row["args"] = params
+    return row
+
+
+def decode_trace(chunks, chain: str, tracer: str = "call", offline: bool = False, workers: int = 8):
+    # Frames are decoded on a pool (ABI fetches are single-flight per
+    # address) and yielded in trace order; at most a few frames per worker
+    # are in flight.
+    chain = chain.lower()
+    if tracer not in TRACERS:
+        raise RuntimeError(f"Unsupported tracer: {tracer} (expected one of {', '.join(TRACERS)})")
+    frames = iter_call_frames(chunks) if tracer == "call" else iter_parity_frames(chunks)
+    resolver = ABIResolver(chain, offline, calldata_decoder.fetch_contract_abi)
+    window = max(1, workers) * 4
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = deque()
+        try:
+            for frame in frames:
+                pending.append(pool.submit(decode_frame, frame, chain, resolver))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_node import FakeNode  # noqa: E402
+
+# src.utils.config reads the environment at import time, so the fake node and
+# a throwaway cache directory are set up before any test imports src.
+NODE = FakeNode().start()
+CACHE_DIR = tempfile.TemporaryDirectory(prefix="axe-tests-")
+os.environ["ETHEREUM_RPC_URL"] = NODE.url
+os.environ["ETHERSCAN_API_URL"] = f"{NODE.url}/api"
+os.environ["ETHERSCAN_API_KEYS"] = "test-key"
+os.environ["AXE_ETHERSCAN_RATE_LIMIT"] = "0"
+os.environ["AXE_CACHE_DIR"] = CACHE_DIR.name
+os.environ["AXE_HTTP_BACKOFF"] = "0"
+
+
+@pytest.fixture
+def node():
+    NODE.reset_counters()
+    return NODE
+
+
+def pytest_sessionfinish(session, exitstatus):
+    NODE.stop()
+    CACHE_DIR.cleanup()
@@ -0,0 +1,38 @@
+from src.utils import calldata_decoder
+from src.utils.abi_cache import abi_cache
+from fake_node import load_fixtures
+
+UNVERIFIED = "0x00000000000000000000000000000000DeaDBeef"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+
+def calldata_to(address):
+    return next(tx["input"] for tx in load_fixtures()["transactions"] if tx["to"] == address)
+
+
+def test_repeat_decodes_of_an_unverified_contract_fetch_once(node):
+    abi_cache.clear()
+    calldata = calldata_to(UNVERIFIED)
+    for _ in range(3):
+        # Falls back to the selector index (or fails) without asking again.
+        try:
+            calldata_decoder.decode_using_address(calldata, UNVERIFIED, "ethereum")
+        except RuntimeError:
+            pass
+    assert node.counters["abi_fetches"] == 1
+
+
+def test_repeat_decodes_of_a_verified_contract_fetch_once(node):
+    abi_cache.clear()
+    calldata = calldata_to(USDC)
+    for _ in range(3):
+        func_obj, _ = calldata_decoder.decode_using_address(calldata, USDC, "ethereum")
+    assert node.counters["abi_fetches"] == 1
+
+
+def test_unverified_entries_expire(node, monkeypatch):
+    abi_cache.clear()
+    abi_cache.put_unverified(1, UNVERIFIED, "not verified")
+    assert abi_cache.get_unverified(1, UNVERIFIED) == "not verified"
+    monkeypatch.setattr(abi_cache, "negative_ttl", -1)
+    assert abi_cache.get_unverified(1, UNVERIFIED) is None
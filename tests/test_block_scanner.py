@@ -0,0 +1,84 @@
+import pytest
+from fake_node import load_fixtures
+from src.utils import block_scanner, calldata_decoder
+from src.utils.batch_decoder import ABIResolver
+from src.utils.config import PROXY_CACHE_BLOCKS
+from src.utils.proxy_resolver import IMPLEMENTATION_SLOTS, proxy_cache
+from src.utils.selector_index import selector_index
+
+PROXY = "0x7Fc66500c84A76Ad7e9c93437bFc5Ac33E2DDaE9"
+IMPLEMENTATION = "0x5d4aa78b08bc7c530e21bf7447988b1be7991322"
+UNKNOWN = "0x00000000000000000000000000000000000b10c5"
+
+
+def calls(address):
+    tx = next(tx for tx in load_fixtures()["transactions"] if tx["to"] == PROXY)
+    return [(20_000_000, dict(tx, to=address, hash="0x" + "ab" * 32, value="0x0"))]
+
+
+def test_proxy_calls_use_the_implementation_abi(node):
+    fetched = []
+
+    def fetch(address, chain, offline):
+        fetched.append(address.lower())
+        return calldata_decoder.fetch_abi(address, chain, offline)
+
+    # The scan-time ABI lacks the function, as when the proxy was upgraded
+    # during the scanned range.
+    resolver = ABIResolver("ethereum", False, fetch)
+    [row] = block_scanner.decode_calls(calls(PROXY), PROXY, "ethereum", [], resolver)
+    assert "error" not in row
+    assert row["function"].startswith("transfer(")
+    assert fetched == [IMPLEMENTATION]
+
+
+def test_offline_scan_makes_no_requests(node):
+    resolver = ABIResolver("ethereum", True)
+    [row] = block_scanner.decode_calls(calls(UNKNOWN), UNKNOWN, "ethereum", [], resolver)
+    assert row["function"].startswith("transfer(")
+    assert node.counters["rpc_calls"] == 0
+    assert node.counters["abi_fetches"] == 0
+
+
+UNVERIFIED = "0x00000000000000000000000000000000DeaDBeef"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+FIRST_BLOCK = 20_000_000
+
+
+@pytest.fixture
+def indexed():
+    selector_index.add_abi(load_fixtures()["abis"][USDC.lower()])
+
+
+@pytest.mark.parametrize("offline", [False, True])
+def test_scan_of_an_unverified_contract_uses_the_selector_index(node, indexed, offline):
+    batches = list(block_scanner.scan(UNVERIFIED, "ethereum", FIRST_BLOCK - 1, FIRST_BLOCK + 1, 2, offline))
+    rows = [row for _, batch in batches for row in batch]
+    assert [last for last, _ in batches] == [FIRST_BLOCK, FIRST_BLOCK + 1]
+    assert rows and all(row["function"] == "transferFrom(address,address,uint256)" for row in rows)
+    assert {row["block"] for row in rows} == {FIRST_BLOCK, FIRST_BLOCK + 1}
+
+
+def test_scan_decodes_with_the_implementation_of_each_block(node, monkeypatch):
+    # The proxy pointed at USDC's code until an upgrade between the two
+    # scanned blocks.
+    slot = int(IMPLEMENTATION_SLOTS[0][1], 16)
+    later = FIRST_BLOCK + PROXY_CACHE_BLOCKS + 100
+    node.storage_history[PROXY.lower()] = (FIRST_BLOCK + 1, {slot: "0x" + USDC[2:].lower().rjust(64, "0")})
+    fetched = []
+    original = calldata_decoder.fetch_abi
+
+    def fetch_abi(address, chain, offline=False):
+        fetched.append(address.lower())
+        return original(address, chain, offline)
+
+    monkeypatch.setattr(calldata_decoder, "fetch_abi", fetch_abi)
+    proxy_cache.clear()
+    try:
+        for block in (FIRST_BLOCK, later):
+            rows = [row for _, batch in block_scanner.scan(PROXY, "ethereum", block, block) for row in batch]
+            assert rows and all("error" not in row for row in rows)
+    finally:
+        node.storage_history.clear()
+        proxy_cache.clear()
+    assert fetched == [PROXY.lower(), USDC.lower(), PROXY.lower(), IMPLEMENTATION]
@@ -0,0 +1,17 @@
+from src.utils import bytecode
+
+COUNTERFACTUAL = "0x00000000000000000000000000000000c0ffee00"
+RUNTIME = "0x6080604052600080fd"
+
+
+def test_empty_code_is_not_cached(node):
+    assert bytecode.fetch_code(COUNTERFACTUAL, "ethereum") == b""
+    assert bytecode.code_cache.get(1, COUNTERFACTUAL) is None
+
+    # Deployed later: the next lookup sees the code and caches it.
+    node.code[COUNTERFACTUAL.lower()] = RUNTIME
+    try:
+        assert bytecode.fetch_code(COUNTERFACTUAL, "ethereum") == bytes.fromhex(RUNTIME[2:])
+    finally:
+        del node.code[COUNTERFACTUAL.lower()]
+    assert bytecode.fetch_code(COUNTERFACTUAL, "ethereum", offline=True) == bytes.fromhex(RUNTIME[2:])
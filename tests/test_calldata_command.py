@@ -0,0 +1,48 @@
+import json
+import pytest
+from typer.testing import CliRunner
+from fake_node import load_fixtures
+from src.cli import app
+from src.utils.selector_index import selector_index
+
+FIXTURES = load_fixtures()
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+TRANSFER = next(tx["input"] for tx in FIXTURES["transactions"] if tx["input"].startswith("0xa9059cbb"))
+
+
+@pytest.fixture(autouse=True)
+def indexed():
+    selector_index.add_abi(FIXTURES["abis"][USDC.lower()])
+
+
+def decode(*args):
+    return CliRunner().invoke(app, ["-O", "json", "calldata", "decode", "--calldata", TRANSFER, *args])
+
+
+def test_selectors_need_no_chain(node):
+    result = decode("--selectors")
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["function"] == "transfer(address,uint256)"
+    assert node.counters["rpc_calls"] == 0
+
+
+def test_abi_file_needs_no_chain(node, tmp_path):
+    abi_file = tmp_path / "usdc.json"
+    abi_file.write_text(json.dumps(FIXTURES["abis"][USDC.lower()]))
+    result = decode("--abi", str(abi_file))
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["function"] == "transfer(address,uint256)"
+
+
+def test_offline_address_without_chain_uses_the_selector_index(node):
+    result = decode("--address", USDC, "--offline")
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["function"] == "transfer(address,uint256)"
+    assert node.counters == dict(node.counters, rpc_calls=0, abi_fetches=0)
+
+
+def test_address_lookup_requires_a_chain(node):
+    result = decode("--address", USDC)
+    assert result.exit_code == 2
+    assert "--chain" in result.output
+    assert node.counters["abi_fetches"] == 0
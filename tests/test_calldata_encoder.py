@@ -0,0 +1,34 @@
+import pytest
+from eth_abi import encode
+from src.utils.calldata_encoder import CalldataEncoder, parse_signature
+
+ADDRESS = "0x00000000000000000000000000000000000000aa"
+
+
+@pytest.mark.parametrize("signature, expected", [
+    ("transfer(address,uint256)", ["address", "uint256"]),
+    ("transfer(address to, uint256 amount)", ["address", "uint256"]),
+    (" transfer ( address  to ,uint amount ) ", ["address", "uint256"]),
+    ("f(uint[] memory amounts, bytes calldata data)", ["uint256[]", "bytes"]),
+    ("f((address token, uint24 fee)[2] legs, int deadline)", ["(address,uint24)[2]", "int256"]),
+    ("f((uint,(bool,string)) nested)", ["(uint256,(bool,string))"]),
+    ("f(uint8,int256,bytes1,bytes32)", ["uint8", "int256", "bytes1", "bytes32"]),
+    ("f()", []),
+])
+def test_parse_signature(signature, expected):
+    assert parse_signature(signature)[1] == expected
+
+
+@pytest.mark.parametrize("signature", [
+    "f(uint7)", "f(uint264)", "f(int0)", "f(bytes0)", "f(bytes33)", "f(foo)",
+    "f(uint 256)", "f(uint256[x])", "f(address a b c)", "f(uint256,)", "f(,uint256)", "f(uint256", "(uint256)",
+])
+def test_parse_signature_rejects_invalid_types(signature):
+    with pytest.raises(ValueError):
+        parse_signature(signature)
+
+
+def test_named_parameters_keep_the_selector():
+    named = CalldataEncoder.from_signature("transfer(address to, uint256 amount)")
+    assert named.signature == "transfer(address,uint256)"
+    assert named.encode([ADDRESS, 5]) == bytes.fromhex("a9059cbb") + encode(["address", "uint256"], [ADDRESS, 5])
@@ -0,0 +1,73 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.utils.decode_server import make_server
+from fake_node import tx_hash
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = make_server("127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+def test_batch_with_unknown_chain_is_rejected_before_streaming(server):
+    status, body = post(f"{server}/decode/batch", {"lines": [tx_hash(0)], "chain": "nowhere"})
+    assert status == 400
+    assert json.loads(body)["error"] == "Unsupported Chain: nowhere"
+
+
+def test_non_object_body_is_rejected(server):
+    for path in ("/decode/batch", "/decode/address"):
+        status, body = post(f"{server}{path}", [1, 2])
+        assert status == 400
+        assert json.loads(body)["error"] == "JSON body must be an object"
+
+
+def test_batch_requires_lines(server):
+    status, body = post(f"{server}/decode/batch", {"chain": "ethereum"})
+    assert status == 400
+    assert "lines" in json.loads(body)["error"]
+
+
+def test_unknown_chain_is_not_reported_as_missing_field(server):
+    status, body = post(f"{server}/decode/address", {"calldata": "0x", "address": "0x" + "00" * 20, "chain": "nowhere"})
+    assert status == 400
+    assert json.loads(body)["error"] == "Unsupported Chain: nowhere"
+
+
+def test_batch_streams_results(server):
+    status, body = post(f"{server}/decode/batch", {"lines": [tx_hash(0), tx_hash(1)], "chain": "ethereum"})
+    assert status == 200
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert [row["input"] for row in rows] == [tx_hash(0), tx_hash(1)]
+    assert all("function" in row for row in rows)
+
+
+def test_socket_path_only_replaces_stale_sockets(tmp_path):
+    notes = tmp_path / "notes.txt"
+    notes.write_text("keep me")
+    with pytest.raises(OSError, match="not a socket"):
+        make_server(socket_path=str(notes))
+    assert notes.read_text() == "keep me"
+
+    path = str(tmp_path / "axe.sock")
+    make_server(socket_path=path).server_close()
+    # The stale socket of a previous run is replaced.
+    make_server(socket_path=path).server_close()
@@ -0,0 +1,29 @@
+import json
+import pytest
+from src.utils import json_stream
+
+
+def parse(text, size=None):
+    size = size or len(text) or 1
+    return list(json_stream.parse(text[n:n + size] for n in range(0, len(text), size)))
+
+
+@pytest.mark.parametrize("text", [
+    '{"a": [1, 2.5, {"b": null}], "c": {}, "d": [], "e": "x\\"y"}',
+    '[true, false, [[]], {"k": [{}]}]',
+    '-12',
+])
+def test_chunked_parse_round_trips(text):
+    for size in (1, 3, len(text)):
+        events = iter(parse(text, size))
+        _, event, value = next(events)
+        assert json_stream.build(event, value, events) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", [
+    "[1 2]", '{"a" 1}', "[1,,2]", '{"a":1,}', "[1,]", "[,1]", '{,"a":1}', '{"a":1 "b":2}',
+    '{"a":}', '{1:2}', '["a":1]', '{"a"}', "[1]]", "{]", "1 2", "",
+])
+def test_malformed_input_is_rejected(text):
+    with pytest.raises(ValueError):
+        parse(text)
@@ -0,0 +1,28 @@
+from eth_abi import encode
+from eth_hash.auto import keccak
+from src.utils import nested_decoder
+
+ROUTER = "0x3fC91A3afd70395Cd496C647d5a6CC9D4B2b7FAD"
+RECIPIENT = "0x0000000000000000000000000000000000000002"
+EXECUTE_ABI = [{"type": "function", "name": "execute", "stateMutability": "payable", "outputs": [],
+                "inputs": [{"name": "commands", "type": "bytes"}, {"name": "inputs", "type": "bytes[]"}]}]
+
+
+def execute(commands: bytes, inputs: list) -> str:
+    return "0x" + (keccak(b"execute(bytes,bytes[])")[:4] + encode(["bytes", "bytes[]"], [commands, inputs])).hex()
+
+
+def test_universal_router_commands_above_0x1f():
+    wrap = encode(["address", "uint256"], [RECIPIENT, 10 ** 18])
+    unwrap = encode(["address", "uint256"], [RECIPIENT, 0])
+    sub_plan = encode(["bytes", "bytes[]"], [bytes([0x0b, 0x0c]), [wrap, unwrap]])
+    # EXECUTE_SUB_PLAN (0x21) with the allow-revert bit set, then UNWRAP_WETH.
+    calldata = execute(bytes([0xa1, 0x0c]), [sub_plan, unwrap])
+
+    root = nested_decoder.decode_recursive(calldata, ROUTER, "ethereum", offline=True, abi=EXECUTE_ABI)
+    plan, last = root["calls"]
+    assert plan["command"] == "0xa1" and plan["allow_revert"]
+    assert plan["function"] == "EXECUTE_SUB_PLAN"
+    assert [call["function"] for call in plan["calls"]] == ["WRAP_ETH", "UNWRAP_WETH"]
+    assert plan["calls"][0]["params"]["amountMin"] == 10 ** 18
+    assert last["function"] == "UNWRAP_WETH" and not last["allow_revert"]
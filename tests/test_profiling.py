@@ -0,0 +1,21 @@
+import requests
+from fake_node import tx_hash
+from src.utils import profiling
+
+
+def test_streamed_bodies_are_counted_as_they_are_read(node, monkeypatch):
+    monkeypatch.setattr(profiling, "_enabled", True)
+    monkeypatch.setattr(profiling, "_http", [])
+    session = profiling.instrument_session(requests.Session())
+    payload = {"jsonrpc": "2.0", "id": 1, "method": "debug_traceTransaction", "params": [tx_hash(1)]}
+
+    response = session.post(node.url, json=payload, stream=True)
+    # The hook left the body on the wire.
+    assert not response._content_consumed
+    assert profiling.summary()["http"]["bytes_received"] == 0
+    size = sum(len(chunk) for chunk in response.iter_content(256))
+    assert size > 256
+    assert profiling.summary()["http"]["bytes_received"] == size
+
+    assert len(session.post(node.url, json=payload).content) == size
+    assert profiling.summary()["http"]["bytes_received"] == 2 * size
@@ -0,0 +1,41 @@
+import pytest
+from src.utils import proxy_resolver
+from src.utils.proxy_resolver import proxy_cache, resolve_implementation
+
+PROXY = "0x7fc66500c84a76ad7e9c93437bfc5ac33e2ddae9"
+CURRENT = "0x5D4Aa78B08Bc7C530e21bf7447988b1Be7991322"
+PREVIOUS = "0x00000000000000000000000000000000000bEEf1"
+EIP1967_SLOT = int(proxy_resolver.IMPLEMENTATION_SLOTS[0][1], 16)
+UPGRADE_BLOCK = 19_000_000
+
+
+@pytest.fixture
+def upgraded(node):
+    proxy_cache.clear()
+    node.storage_history[PROXY] = (UPGRADE_BLOCK, {EIP1967_SLOT: "0x" + PREVIOUS[2:].lower().rjust(64, "0")})
+    yield node
+    node.storage_history.clear()
+    node.archive_from = None
+    proxy_resolver._no_archive.clear()
+    proxy_cache.clear()
+
+
+def test_slots_are_read_at_the_decode_block(upgraded):
+    # Head first, so a mapping read at the head is cached.
+    assert resolve_implementation(PROXY, "ethereum")[0] == CURRENT
+    assert resolve_implementation(PROXY, "ethereum", UPGRADE_BLOCK - 100)[0] == PREVIOUS
+    # Within PROXY_CACHE_BLOCKS of that read, before or after it.
+    calls = upgraded.counters["rpc_calls"]
+    assert resolve_implementation(PROXY, "ethereum", hex(UPGRADE_BLOCK - 50))[0] == PREVIOUS
+    assert upgraded.counters["rpc_calls"] == calls
+    assert resolve_implementation(PROXY, "ethereum", UPGRADE_BLOCK + 10_000)[0] == CURRENT
+
+
+def test_nodes_without_archive_state_fall_back_to_the_head(upgraded):
+    upgraded.archive_from = 19_900_000
+    assert resolve_implementation(PROXY, "ethereum", UPGRADE_BLOCK - 100)[0] == CURRENT
+    # Known now: the next old block is read at the head straight away.
+    proxy_cache.clear()
+    calls = upgraded.counters["rpc_calls"]
+    assert resolve_implementation(PROXY, "ethereum", UPGRADE_BLOCK - 200)[0] == CURRENT
+    assert upgraded.counters["rpc_calls"] - calls == len(proxy_resolver.IMPLEMENTATION_SLOTS) + 2
@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from concurrent.futures import wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils.config import HTTP_RETRIES
+from src.utils.rpc_batcher import RECOVER_AFTER, BatchingRPCClient, RPCError
+
+
+class Node:
+    # Answers eth_blockNumber; rejects batches over `limit` with 413, or
+    # fails every request with `status` when it is set. Batches with an
+    # eth_getLogs call take `slow` seconds.
+    def __init__(self):
+        self.limit = None
+        self.status = None
+        self.slow = 0
+        self.posts = []
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.posts.append(len(payload) if isinstance(payload, list) else 1)
+                if node.status is not None:
+                    return self.reply(node.status, {"error": "unavailable"})
+                if isinstance(payload, list) and node.limit is not None and len(payload) > node.limit:
+                    return self.reply(413, {"error": "too large"})
+                requests = payload if isinstance(payload, list) else [payload]
+                if any(request["method"] == "eth_getLogs" for request in requests):
+                    time.sleep(node.slow)
+                responses = [{"jsonrpc": "2.0", "id": request["id"], "result": "0x1"} for request in requests]
+                self.reply(200, responses if isinstance(payload, list) else responses[0])
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+
+@pytest.fixture
+def rpc_node():
+    node = Node()
+    yield node
+    node.server.shutdown()
+    node.server.server_close()
+
+
+def send(client, count):
+    # Queue `count` calls at once so they go out as full batches.
+    with client._condition:
+        futures = [client.request("eth_blockNumber", []) for _ in range(count)]
+    wait(futures)
+    return futures
+
+
+def test_server_errors_are_retried_not_split(rpc_node):
+    rpc_node.status = 503
+    client = BatchingRPCClient(rpc_node.url, max_batch_size=8, flush_latency=0.01)
+    futures = send(client, 8)
+    assert all(isinstance(future.exception(), RPCError) for future in futures)
+    # One batch, retried by the session; never split into smaller posts.
+    assert rpc_node.posts == [8] * (HTTP_RETRIES + 1)
+    assert client.batch_limit == 8
+
+
+def test_oversized_batches_are_split_and_the_limit_recovers(rpc_node):
+    rpc_node.limit = 4
+    client = BatchingRPCClient(rpc_node.url, max_batch_size=8, flush_latency=0.01)
+    assert all(future.result() == "0x1" for future in send(client, 8))
+    assert rpc_node.posts == [8, 4, 4]
+    assert client.batch_limit == 4
+
+    rpc_node.limit = None
+    for _ in range(RECOVER_AFTER):
+        send(client, 4)
+    assert client.batch_limit == 8
+
+
+def test_a_slow_batch_does_not_hold_up_other_calls(rpc_node):
+    rpc_node.slow = 1.0
+    client = BatchingRPCClient(rpc_node.url, max_batch_size=8, flush_latency=0.01)
+    slow = client.get_logs({})
+    while not rpc_node.posts:
+        time.sleep(0.005)
+    assert client.block_number().result(timeout=0.5) == "0x1"
+    assert not slow.done()
+    assert slow.result() == "0x1"
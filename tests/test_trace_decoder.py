@@ -0,0 +1,46 @@
+import json
+from fake_node import tx_hash
+from src.utils import trace_decoder
+
+
+def traces(node, depth, width):
+    saved = node.trace_depth, node.trace_width
+    node.trace_depth, node.trace_width = depth, width
+    try:
+        call = json.dumps({"jsonrpc": "2.0", "id": 1, "result": node.call_trace(tx_hash(1))})
+        parity = json.dumps({"jsonrpc": "2.0", "id": 1, "result": node.parity_trace(tx_hash(1))})
+    finally:
+        node.trace_depth, node.trace_width = saved
+    return call, parity
+
+
+def test_call_frames_match_parity_frames(node):
+    call, parity = traces(node, 3, 2)
+    # Small chunks, so frames close across many reads.
+    call_frames = list(trace_decoder.iter_call_frames(call[n:n + 7] for n in range(0, len(call), 7)))
+    parity_frames = list(trace_decoder.iter_parity_frames([parity]))
+    assert len(call_frames) == 22
+    # Children close before their parent; sorting restores the call order.
+    assert call_frames[-1]["trace_address"] == []
+    call_frames.sort(key=lambda frame: frame["trace_address"])
+    assert [frame["trace_address"] for frame in call_frames] == [frame["trace_address"] for frame in parity_frames]
+    # Fields written after the nested calls still reach their frame.
+    assert [frame["type"] for frame in call_frames] == [frame["type"].upper() for frame in parity_frames]
+    assert all("value" in frame for frame in call_frames if frame["type"] == "CALL")
+    assert [frame["depth"] for frame in call_frames] == [len(frame["trace_address"]) for frame in call_frames]
+
+
+def test_call_frames_stream_before_the_input_ends(node):
+    call, _ = traces(node, 4, 3)
+    chunks = [call[n:n + 256] for n in range(0, len(call), 256)]
+    read = []
+
+    def source():
+        for chunk in chunks:
+            read.append(chunk)
+            yield chunk
+
+    frames = trace_decoder.iter_call_frames(source())
+    next(frames)
+    assert len(read) < len(chunks) // 4
+    assert sum(1 for _ in frames) > 100